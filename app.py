@@ -1,48 +1,68 @@
-from flask import Flask, request, jsonify
+import time
+_IMPORT_START = time.perf_counter()
+
+from flask import Blueprint, Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from datetime import datetime
 import json
 import uuid
-import time
-import random
 import threading
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
-# LangGraph imports
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_upstage import ChatUpstage
-from langchain_community.chat_message_histories import ChatMessageHistory
-from langgraph.graph import StateGraph, START, END
+# LangChain/LangGraph(langchain_upstage → openai 등)는 import 비용이 커서 처음 쓰는 함수 안에서 import
 from typing import TypedDict, List, Dict, Any, Annotated, Optional
 
 import os
 from dotenv import load_dotenv
 
+# .env 파일 로드 (utils 모듈의 환경 변수 설정보다 먼저)
+load_dotenv()
+
 # 시스템 프롬프트 import
 from utils.system_prompt import SYSTEM_PROMPT
 from utils.analysis_prompt import ANALYSIS_PROMPT
+from utils.stage_timings import StageTimings
+from utils.structured_analysis import (ANALYSIS_RESPONSE_FORMAT, STRUCTURED_ANALYSIS, STRUCTURED_ANALYSIS_PROMPT,
+                                       STRUCTURED_MAX_TOKENS, parse_structured_analysis, record_structured_result,
+                                       structured_analysis_stats)
+from utils.llm_client import (LLM_API_BASE, LLM_MAX_RETRIES, async_pool_generation, get_async_http_client,
+                              get_http_client, http_pool_stats, warm_up_http_pool)
 
-# 명언 검색 시스템
+# 명언 검색 시스템 (faiss/sentence_transformers/torch는 검색 엔진 로드 시점에 import)
 try:
-    from utils.quote_retriever import find_similar_quote_cosine_silent
+    from utils.quote_filters import QuoteFilterIndex
+    from utils.model_registry import DEFAULT_TIER, built_tiers, get_tier
+    from utils.quote_retriever import EMBEDDING_AVAILABLE as EMBEDDING_LIBS_AVAILABLE
+    from utils.quote_retriever import (SEARCH_MODE, get_quote_retriever, route_quote_retriever, search_batch,
+                                       tier_stats)
     print("✅ 명언 검색 시스템 로드 완료")
     QUOTE_RETRIEVER_AVAILABLE = True
 except ImportError as e:
     print(f"⚠️ 명언 검색 시스템 로드 실패: {e}")
     QUOTE_RETRIEVER_AVAILABLE = False
+    EMBEDDING_LIBS_AVAILABLE = False
 
-# 임베딩 기반 검색을 위한 imports (조건부)
-import pandas as pd
-import numpy as np
-
-# .env 파일 로드
-load_dotenv()
+# 임베딩 중심점 폴백 (FAISS 없이 동작하므로 검색 시스템과 별도로 로드)
+try:
+    from utils.quote_fallback import find_centroid_fallback_quotes, warm_up_centroid_fallback
+    CENTROID_FALLBACK_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ 중심점 폴백 로드 실패: {e}")
+    CENTROID_FALLBACK_AVAILABLE = False
 
 # === 상수 정의 ===
 TURN_THRESHOLD = 20
+BATCH_SEARCH_MAX_ANALYSES = 10000  # 일괄 검색 요청당 최대 분석 수
+BATCH_SEARCH_CHUNK_SIZE = 64  # 한 번에 임베딩/검색하는 분석 수 (청크마다 결과를 스트리밍)
+BATCH_SEARCH_MAX_TOP_K = 50
 EMBEDDING_AVAILABLE = False
 EMBEDDING_LOADING = False
-EMBEDDING_LIBS_AVAILABLE = True
+FALLBACK_MODE = False  # 검색 엔진 없이 기본/중심점 폴백 명언만 사용 (라이브러리/모델/인덱스 없음 또는 로드 반복 실패)
+WARMUP_ENABLED = os.getenv("QUOTE_WARMUP", "1") != "0"  # 서버 시작 시 검색 엔진 백그라운드 워밍업
+WARMUP_RETRY_SECONDS = 30  # 워밍업 실패 시 재시도 간격
+WARMUP_MAX_ATTEMPTS = int(os.getenv("QUOTE_WARMUP_MAX_ATTEMPTS", "5"))  # 이 횟수만큼 실패하면 폴백 모드로 전환
+RETRIEVAL_WORKERS = int(os.getenv("QUOTE_RETRIEVAL_WORKERS", "4"))  # 비동기 경로에서 명언 검색(CPU)을 실행하는 스레드 수
 
 # === 기본 명언 데이터 ===
 FALLBACK_QUOTES = {
@@ -63,20 +83,32 @@ FALLBACK_QUOTES = {
     ]
 }
 
-print("🔧 임베딩 시스템 강제 활성화")
+api = Blueprint('api', __name__)
 
-try:
-    import faiss
-    from sentence_transformers import SentenceTransformer
-    print("✅ 임베딩 라이브러리 로드 완료")
-except ImportError as e:
-    print(f"⚠️ 임베딩 라이브러리 로드 실패: {e}")
-    print("🔄 런타임에 다시 시도할 예정")
+# 시작 단계별 소요 시간 (ms, /api/health 노출용)
+startup_timings = {'import_ms': None, 'create_app_ms': None, 'graph_compile_ms': None, 'llm_warmup_ms': None,
+                   'warmup_ms': None}
 
-app = Flask(__name__)
-CORS(app)
+# /api/chat/stream 지연 시간 (요청 → 첫 이벤트 / 첫 토큰 / 완료, /api/health 노출용)
+stream_timings = StageTimings()
+
+# 스트리밍 중 stage 이벤트로 알리는 그래프 노드 (노드 이름 → 단계 이름)
+STREAM_STAGES = {
+    "analyze_chat_history": "analysis",
+    "generate_advice": "advice",
+    "retrieve_quotes": "retrieval",
+    "present_quote": "quote_presentation",
+    "process_quote_selection": "quote_selection",
+}
+
+# 분석 턴의 분기별 소요 시간 (조언 생성 / 명언 검색 / 임계 경로, /api/health 노출용)
+branch_timings = StageTimings()
 
 # === LangGraph State 정의 ===
+def merge_timings(current: Dict[str, float] | None, update: Dict[str, float] | None) -> Dict[str, float]:
+    """병렬 분기가 같은 단계에서 각자 기록한 소요 시간을 합침 (LangGraph 리듀서)"""
+    return {**(current or {}), **(update or {})}
+
 class ChatbotState(TypedDict):
     # 사용자 정보
     user_id: Annotated[str, "User ID"]
@@ -86,7 +118,7 @@ class ChatbotState(TypedDict):
     user_message: Annotated[str, "User Message"]
     chatbot_message: Annotated[str, "Chatbot Message"]
     timestamp: Annotated[str, "Timestamp of the conversation"]
-    chat_history: Annotated[ChatMessageHistory, "chat history of user and ai"]
+    chat_history: Annotated[Any, "chat history of user and ai (ChatMessageHistory)"]
     status: Annotated[str, "Status of the conversation"]
     
     # 대화 분석 정보
@@ -96,29 +128,109 @@ class ChatbotState(TypedDict):
     author: Annotated[str, "Author of the quote"]
     keywords: Annotated[List[str], "Keywords of the conversation"]
     advice: Annotated[str, "Advice for the conversation"]
+    advice_ready: Annotated[bool, "Whether advice/keywords came with the analysis (structured response)"]
     
     # 명언 선택 기능을 위한 필드들
     candidate_quotes: Annotated[List[Dict], "List of candidate quotes with similarity scores"]
     current_quote_index: Annotated[int, "Current quote index being presented"]
     quote_selection_complete: Annotated[bool, "Whether quote selection is complete"]
     quote_selection_mode: Annotated[bool, "Whether in quote selection mode"]
+    
+    # 분석 턴 분기별 소요 시간 (ms, 병렬 분기가 함께 기록하므로 리듀서로 병합)
+    branch_timings: Annotated[Dict[str, float], merge_timings]
 
 # === 유틸리티 클래스 ===
 class LLMChainBuilder:
-    """LLM 체인 생성을 위한 통합 클래스"""
+    """
+    LLM 체인 생성을 위한 통합 클래스
+    
+    LLM 클라이언트와 체인은 프로세스당 한 번만 만들어 모든 요청(스레드)이 공유하며,
+    LLM은 keep-alive 연결 풀을 가진 공유 HTTP 클라이언트로 API를 호출합니다.
+    비동기 클라이언트가 닫히면(ASGI lifespan 종료) 다음 사용 시 LLM과 체인을 새 클라이언트로 다시 만듭니다.
+    """
+    
+    _llm = None
+    _llm_pool_generation = None  # LLM이 물고 있는 비동기 클라이언트의 세대 번호
+    _chains = {}
+    _lock = threading.Lock()
     
     @staticmethod
     def _init_llm():
+        from langchain_upstage import ChatUpstage
+        
         return ChatUpstage(
             model="solar-pro",
             temperature=0.7,
             max_tokens=300,
+            base_url=LLM_API_BASE,
+            http_client=get_http_client(),
+            http_async_client=get_async_http_client(),
+            max_retries=LLM_MAX_RETRIES,
         )
     
     @classmethod
-    def build_chat_chain(cls):
+    def _current_llm_locked(cls):
+        """현재 비동기 클라이언트 세대의 LLM (cls._lock을 잡은 상태에서 호출, 다시 만들면 체인도 비움)"""
+        generation = async_pool_generation()
+        if cls._llm is None or cls._llm_pool_generation != generation:
+            cls._chains = {}
+            cls._llm = cls._init_llm()
+            cls._llm_pool_generation = generation
+        return cls._llm
+    
+    @classmethod
+    def get_llm(cls):
+        """공유 LLM 클라이언트 (최초 호출 시 또는 비동기 클라이언트가 닫힌 뒤 생성, 다시 만들면 체인도 비움)"""
+        if cls._llm is None or cls._llm_pool_generation != async_pool_generation():
+            with cls._lock:
+                return cls._current_llm_locked()
+        return cls._llm
+    
+    @classmethod
+    def get_chain(cls, name: str):
+        """
+        이름(chat, analysis, advice, structured)으로 공유 체인을 반환합니다. (최초 호출 시 생성)
+        
+        Raises:
+            ValueError: 알 수 없는 체인 이름인 경우
+        """
+        builders = {
+            'chat': cls.build_chat_chain,
+            'analysis': cls.build_analysis_chain,
+            'advice': cls.build_advice_chain,
+            'structured': cls.build_structured_analysis_chain,
+        }
+        if name not in builders:
+            raise ValueError(f"알 수 없는 체인: {name}")
+        cls.get_llm()  # 비동기 클라이언트가 닫혔으면 LLM을 다시 만들고 체인을 비움
+        chain = cls._chains.get(name)
+        if chain is None:
+            with cls._lock:
+                # 락 밖에서 확인한 뒤 세대가 바뀌었을 수 있으므로 락 안에서 다시 확인한 LLM으로 생성
+                llm = cls._current_llm_locked()
+                chain = cls._chains.get(name)
+                if chain is None:
+                    chain = cls._chains[name] = builders[name](llm)
+        return chain
+    
+    @classmethod
+    def warm_up(cls) -> int:
+        """
+        모든 체인을 미리 만들고 API 서버와의 연결을 풀에 열어 둡니다.
+        
+        Returns:
+            int: 미리 연 연결 수
+        """
+        for name in ('chat', 'analysis', 'advice') + (('structured',) if STRUCTURED_ANALYSIS else ()):
+            cls.get_chain(name)
+        return warm_up_http_pool()
+    
+    @classmethod
+    def build_chat_chain(cls, llm=None):
         """일반 채팅용 체인"""
-        llm = cls._init_llm()
+        from langchain_core.prompts import ChatPromptTemplate
+        
+        llm = llm or cls.get_llm()
         prompt = ChatPromptTemplate.from_messages([
             ("system", SYSTEM_PROMPT),
             ("user", "{user_input}")
@@ -126,9 +238,11 @@ class LLMChainBuilder:
         return prompt | llm
     
     @classmethod
-    def build_analysis_chain(cls):
+    def build_analysis_chain(cls, llm=None):
         """대화 분석용 체인"""
-        llm = cls._init_llm()
+        from langchain_core.prompts import ChatPromptTemplate
+        
+        llm = llm or cls.get_llm()
         prompt = ChatPromptTemplate.from_messages([
             ("system", ANALYSIS_PROMPT),
             ("user", "다음 대화 히스토리를 분석하라. \\n\\n{chat_history}")
@@ -136,14 +250,28 @@ class LLMChainBuilder:
         return prompt | llm
     
     @classmethod
-    def build_advice_chain(cls):
+    def build_advice_chain(cls, llm=None):
         """조언 및 키워드 생성용 체인"""
-        llm = cls._init_llm()
+        from langchain_core.prompts import ChatPromptTemplate
+        
+        llm = llm or cls.get_llm()
         prompt = ChatPromptTemplate.from_messages([
             ("system", ANALYSIS_PROMPT + "\n\n분석 결과를 바탕으로 다음 두 가지를 제공해줘요.:\n1. 사용자에게 적절한 조언을 해줘요. 사용자에게는 '당신, 그대'라는 2인칭 표현을 사용해요. (최대 세 문장이며 80자 이내로, 문학적이고 감성적인 어투를 사용하여 친절하게 제공해줘요.)\n2. 대화 내용의 키워드 (최대 5개, 쉼표로 구분. 각 키워드의 글자 수는 최대 4자 이내이다. 5자 초과는 금지이다.)\n\n형식:\n조언: [조언 내용]\n키워드: [키워드1, 키워드2, 키워드3]"),
             ("user", "{chat_history}")
         ])
         return prompt | llm
+    
+    @classmethod
+    def build_structured_analysis_chain(cls, llm=None):
+        """대화 분석 + 조언 + 키워드를 JSON 스키마 응답 하나로 받는 체인 (LLM_STRUCTURED_ANALYSIS=1)"""
+        from langchain_core.prompts import ChatPromptTemplate
+        
+        llm = llm or cls.get_llm()
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", STRUCTURED_ANALYSIS_PROMPT),
+            ("user", "다음 대화 히스토리를 분석하라. \\n\\n{chat_history}")
+        ])
+        return prompt | llm.bind(response_format=ANALYSIS_RESPONSE_FORMAT, max_tokens=STRUCTURED_MAX_TOKENS)
 
 class QuoteManager:
     """명언 관련 기능을 담당하는 클래스"""
@@ -157,7 +285,13 @@ class QuoteManager:
     
     @staticmethod
     def select_fallback_quotes(analysis_text: str) -> List[Dict]:
-        """분석 내용에 따라 적절한 fallback 명언 선택"""
+        """분석 내용에 따라 적절한 fallback 명언 선택 (중심점 폴백 → 키워드 기반 기본 명언)"""
+        if CENTROID_FALLBACK_AVAILABLE:
+            quotes = find_centroid_fallback_quotes(analysis_text, top_k=3)
+            if quotes:
+                print(f"🧭 중심점 폴백 명언 사용: {len(quotes)}개")
+                return quotes
+
         analysis_lower = analysis_text.lower()
         
         if any(word in analysis_lower for word in ['성공', '도전', '목표', '노력']):
@@ -168,32 +302,16 @@ class QuoteManager:
             return FALLBACK_QUOTES['general']
     
     @staticmethod
-    def search_quotes(chat_analysis: str) -> List[Dict]:
-        """명언 검색 (벡터 검색 또는 fallback)"""
-        fallback_quotes = QuoteManager.select_fallback_quotes(chat_analysis)
-        
+    def search_quotes(chat_analysis: str, keywords: Optional[List[str]] = None) -> List[Dict]:
+        """명언 검색 (BM25 + 벡터 하이브리드 검색, 벡터 검색 또는 fallback)"""
         try:
-            if QUOTE_RETRIEVER_AVAILABLE:
-                import warnings
-                import sys
-                from io import StringIO
-                
-                # 모든 출력과 경고 억제
-                old_stdout = sys.stdout
-                old_stderr = sys.stderr
-                
-                try:
-                    with warnings.catch_warnings():
-                        warnings.simplefilter("ignore")
-                        sys.stdout = StringIO()
-                        sys.stderr = StringIO()
-                        
-                        quotes = find_similar_quote_cosine_silent(chat_analysis, top_k=3)
-                        
-                finally:
-                    # 출력 복원
-                    sys.stdout = old_stdout
-                    sys.stderr = old_stderr
+            if QUOTE_RETRIEVER_AVAILABLE and not FALLBACK_MODE:
+                # 프로세스 상주 검색 엔진 사용 (모델/인덱스/데이터셋은 최초 1회만 로드, 분석 언어에 맞는 모델 티어)
+                retriever = route_quote_retriever(chat_analysis)
+                if SEARCH_MODE == "hybrid":
+                    quotes = retriever.search_hybrid(chat_analysis, top_k=3, keywords=keywords)
+                else:
+                    quotes = retriever.search(chat_analysis, top_k=3)
                 
                 # 검색 결과 검증
                 if quotes and len(quotes) > 0 and all('quote' in q and 'author' in q for q in quotes):
@@ -201,15 +319,15 @@ class QuoteManager:
                     return quotes
                 else:
                     print("⚠️ 명언 검색 결과가 올바르지 않아 기본 명언을 사용합니다.")
-                    return fallback_quotes
+                    return QuoteManager.select_fallback_quotes(chat_analysis)
             else:
                 print("⚠️ quote_retriever 사용 불가 - 기본 명언 사용")
-                return fallback_quotes
+                return QuoteManager.select_fallback_quotes(chat_analysis)
 
         except Exception as e:
             print(f"⚠️ 명언 검색 중 오류 발생: {e}")
             print("기본 명언을 사용합니다.")
-            return fallback_quotes
+            return QuoteManager.select_fallback_quotes(chat_analysis)
     
     @staticmethod
     def format_quote_message(quote_data: Dict, current_index: int) -> str:
@@ -267,7 +385,11 @@ def validate_user_input(state: ChatbotState) -> ChatbotState:
         "status": "validated"
     }
 
-def chatbot(state: ChatbotState) -> ChatbotState:
+def _chat_input(state: ChatbotState) -> dict:
+    """채팅 체인 입력 (최근 대화 + 사용자 메시지)"""
+    from langchain_community.chat_message_histories import ChatMessageHistory
+    from langchain_core.messages import HumanMessage
+    
     # Initialize chat history if empty
     chat_history = state["chat_history"]
     if not chat_history:
@@ -281,11 +403,11 @@ def chatbot(state: ChatbotState) -> ChatbotState:
             for msg in chat_history.messages[-6:]  # 최근 6개 메시지만 사용
         ])
         
-    chain = LLMChainBuilder.build_chat_chain()
-    response = chain.invoke({
+    return {
         "user_input": f"{formatted_history}\n\nUser: {state['user_message']}" if formatted_history else state["user_message"]
-    })
+    }
 
+def _chat_result(state: ChatbotState, response) -> ChatbotState:
     return {
         **state,
         "chatbot_message": str(response.content),
@@ -293,7 +415,17 @@ def chatbot(state: ChatbotState) -> ChatbotState:
         "status": "completed"
     }
 
+def chatbot(state: ChatbotState) -> ChatbotState:
+    response = LLMChainBuilder.get_chain('chat').invoke(_chat_input(state))
+    return _chat_result(state, response)
+
+async def achatbot(state: ChatbotState) -> ChatbotState:
+    response = await LLMChainBuilder.get_chain('chat').ainvoke(_chat_input(state))
+    return _chat_result(state, response)
+
 def save_history(state: ChatbotState) -> ChatbotState:
+    from langchain_core.messages import AIMessage, HumanMessage
+    
     chat_history = state["chat_history"]
 
     chat_history.add_messages([
@@ -306,7 +438,7 @@ def save_history(state: ChatbotState) -> ChatbotState:
         "chat_history": chat_history 
     }
 
-def analyze_chat_history(state: ChatbotState) -> ChatbotState:
+def _check_analysis_turn(state: ChatbotState) -> None:
     chat_history = state["chat_history"]
 
     # 사용자가 종료 명령어를 입력했는지 확인
@@ -316,36 +448,135 @@ def analyze_chat_history(state: ChatbotState) -> ChatbotState:
     # 대화 턴 수가 TURN_THRESHOLD 이상이거나 종료 명령어가 입력된 경우에만 분석을 진행
     if len(chat_history.messages) < TURN_THRESHOLD and not is_quit_command:
         raise ValueError(f"Chat history must be at least {TURN_THRESHOLD} messages")
-    
-    # 분석 체인을 생성하고 실행한다.
-    analysis_chain = LLMChainBuilder.build_analysis_chain()
-    analysis_response = analysis_chain.invoke({
-        "chat_history": str(chat_history)
-    })
-    chat_analysis = analysis_response.content
+
+def _structured_analysis_result(state: ChatbotState, response) -> ChatbotState:
+    """구조화 응답을 파싱해 분석/조언/키워드를 채운 상태 (실패 시 ValueError)"""
+    chat_analysis, advice, keywords = parse_structured_analysis(str(response.content))
+    record_structured_result(True)
     return {
         **state,
-        "chat_analysis": str(chat_analysis)
+        "chat_analysis": chat_analysis,
+        "advice": advice,
+        "keywords": keywords,
+        "advice_ready": True
     }
 
-def generate_advice(state: ChatbotState) -> ChatbotState:
-    """대화 분석을 바탕으로 사용자에 적합한 조언을 생성한다."""
-    chain = LLMChainBuilder.build_advice_chain()
+def _analysis_result(state: ChatbotState, response) -> ChatbotState:
+    return {
+        **state,
+        "chat_analysis": str(response.content),
+        "advice_ready": False
+    }
+
+def analyze_chat_history(state: ChatbotState) -> ChatbotState:
+    _check_analysis_turn(state)
+    inputs = {"chat_history": str(state["chat_history"])}
+    
+    # 구조화 모드: 분석/조언/키워드를 한 번의 호출로 받고, 실패하면 기존 두 번 호출 경로로 폴백한다.
+    if STRUCTURED_ANALYSIS:
+        try:
+            return _structured_analysis_result(state, LLMChainBuilder.get_chain('structured').invoke(inputs))
+        except Exception as e:
+            record_structured_result(False, str(e))
+            print(f"⚠️ 구조화 분석 실패 - 분석/조언 체인으로 폴백합니다: {e}")
+    
+    # 분석 체인(프로세스 공유)을 실행한다.
+    return _analysis_result(state, LLMChainBuilder.get_chain('analysis').invoke(inputs))
+
+async def aanalyze_chat_history(state: ChatbotState) -> ChatbotState:
+    _check_analysis_turn(state)
+    inputs = {"chat_history": str(state["chat_history"])}
+    
+    if STRUCTURED_ANALYSIS:
+        try:
+            return _structured_analysis_result(state, await LLMChainBuilder.get_chain('structured').ainvoke(inputs))
+        except Exception as e:
+            record_structured_result(False, str(e))
+            print(f"⚠️ 구조화 분석 실패 - 분석/조언 체인으로 폴백합니다: {e}")
+    
+    return _analysis_result(state, await LLMChainBuilder.get_chain('analysis').ainvoke(inputs))
+
+def generate_advice(state: ChatbotState) -> dict:
+    """
+    대화 분석을 바탕으로 사용자에 적합한 조언과 키워드를 생성한다.
+    
+    명언 검색(retrieve_quotes)과 병렬로 실행되므로 자신이 만든 필드만 반환한다.
+    구조화 분석으로 조언과 키워드를 이미 받았다면 LLM을 다시 호출하지 않는다.
+    """
+    if state.get("advice_ready"):
+        return {"branch_timings": {"advice_ms": 0.0}}
+    
+    start_time = time.perf_counter()
+    result = LLMChainBuilder.get_chain('advice').invoke({"chat_history": state["chat_analysis"]})
+    return _advice_result(result, start_time)
 
-    chat_analysis = state["chat_analysis"]
-    result = chain.invoke({"chat_history": chat_analysis})
+async def agenerate_advice(state: ChatbotState) -> dict:
+    if state.get("advice_ready"):
+        return {"branch_timings": {"advice_ms": 0.0}}
     
+    start_time = time.perf_counter()
+    result = await LLMChainBuilder.get_chain('advice').ainvoke({"chat_history": state["chat_analysis"]})
+    return _advice_result(result, start_time)
+
+def _advice_result(result, start_time: float) -> dict:
     # 응답 텍스트 파싱
     advice, keywords = ConversationHelper.parse_advice_response(str(result.content))
     
-    # 명언 검색
-    retrieved_quotes = QuoteManager.search_quotes(chat_analysis)
-
-    return {**state,
-        "retrieved_quotes_and_authors": retrieved_quotes,
+    return {
         "advice": advice,
         "keywords": keywords,
+        "branch_timings": {"advice_ms": round((time.perf_counter() - start_time) * 1000, 1)}
+    }
+
+def retrieve_quotes(state: ChatbotState) -> dict:
+    """
+    대화 분석과 가장 잘 맞는 명언 후보를 검색한다.
+    
+    조언 생성(generate_advice)과 병렬로 실행되므로, 구조화 응답으로 분석과 함께 키워드를 받은 경우(advice_ready)에만
+    키워드를 하이브리드 검색에 함께 넘기고 그렇지 않으면 분석 텍스트만으로 검색한다. 자신이 만든 필드만 반환한다.
+    """
+    start_time = time.perf_counter()
+    retrieved_quotes = QuoteManager.search_quotes(state["chat_analysis"], _retrieval_keywords(state))
+    return _retrieval_result(retrieved_quotes, start_time)
+
+async def aretrieve_quotes(state: ChatbotState) -> dict:
+    """
+    비동기 경로의 명언 검색 - 임베딩/FAISS 검색은 CPU 작업이므로 이벤트 루프를 막지 않도록
+    크기가 제한된 검색 전용 스레드 풀에서 실행한다. (동시 검색 수 = QUOTE_RETRIEVAL_WORKERS)
+    """
+    start_time = time.perf_counter()
+    retrieved_quotes = await asyncio.get_running_loop().run_in_executor(
+        get_retrieval_executor(), QuoteManager.search_quotes, state["chat_analysis"], _retrieval_keywords(state))
+    return _retrieval_result(retrieved_quotes, start_time)
+
+def _retrieval_keywords(state: ChatbotState) -> Optional[List[str]]:
+    """분기 시작 전에 이미 있는 키워드 (구조화 응답) - 조언 분기의 키워드는 아직 없으므로 None"""
+    if not state.get("advice_ready"):
+        return None
+    return state.get("keywords") or None
+
+def _retrieval_result(retrieved_quotes: List[Dict], start_time: float) -> dict:
+    return {
+        "retrieved_quotes_and_authors": retrieved_quotes,
         "candidate_quotes": retrieved_quotes,
+        "branch_timings": {"retrieval_ms": round((time.perf_counter() - start_time) * 1000, 1)}
+    }
+
+def join_advice_and_quotes(state: ChatbotState) -> ChatbotState:
+    """조언/명언 검색 분기가 모두 끝나면 명언 선택 모드로 진입하고 분기별 소요 시간을 기록한다."""
+    timings = state.get("branch_timings") or {}
+    if "advice_ms" in timings and "retrieval_ms" in timings:
+        critical_path = max(timings["advice_ms"], timings["retrieval_ms"])
+        branch_timings.record({
+            "advice_ms": timings["advice_ms"],
+            "retrieval_ms": timings["retrieval_ms"],
+            "critical_path_ms": critical_path,
+            "saved_ms": min(timings["advice_ms"], timings["retrieval_ms"]),  # 순차 실행 대비 절약 시간
+        })
+        print(f"⏱️ 분석 턴 분기: 조언 {timings['advice_ms']}ms / 명언 검색 {timings['retrieval_ms']}ms "
+              f"→ 임계 경로 {critical_path}ms")
+    
+    return {**state,
         "current_quote_index": 0,
         "quote_selection_complete": False,
         "quote_selection_mode": True,  # 명언 선택 모드 활성화
@@ -483,70 +714,128 @@ def is_quote_selection_input(state: ChatbotState) -> str:
     # 명언 선택 모드면 선택 처리
     return "quote_selection"
 
+_retrieval_executor = None
+_retrieval_executor_lock = threading.Lock()
+
+def get_retrieval_executor() -> ThreadPoolExecutor:
+    """비동기 경로의 명언 검색 전용 스레드 풀 (최초 호출 시 생성)"""
+    global _retrieval_executor
+    
+    if _retrieval_executor is None:
+        with _retrieval_executor_lock:
+            if _retrieval_executor is None:
+                _retrieval_executor = ThreadPoolExecutor(max_workers=RETRIEVAL_WORKERS,
+                                                         thread_name_prefix="quote-retrieval")
+    return _retrieval_executor
+
+def _node(func, afunc=None):
+    """
+    동기(invoke)/비동기(ainvoke) 실행을 모두 지원하는 그래프 노드
+    
+    afunc가 없으면 ainvoke에서도 func를 이벤트 루프에서 바로 실행합니다.
+    (I/O 없는 가벼운 노드가 스레드 풀을 거치지 않도록)
+    """
+    from langchain_core.runnables import RunnableLambda
+    
+    if afunc is None:
+        async def afunc(state: ChatbotState):
+            return func(state)
+    return RunnableLambda(func, afunc=afunc, name=func.__name__)
+
 # === LangGraph 워크플로우 구성 ===
-workflow = StateGraph(ChatbotState)
-
-# 노드 추가
-workflow.add_node("validate_user_input", validate_user_input)
-workflow.add_node("chatbot", chatbot)
-workflow.add_node("save_history", save_history)
-workflow.add_node("analyze_chat_history", analyze_chat_history)
-workflow.add_node("generate_advice", generate_advice)
-workflow.add_node("present_quote", present_quote)
-workflow.add_node("process_quote_selection", process_quote_selection)
-
-# 기본 엣지 연결
-workflow.add_edge(START, "validate_user_input")
-
-# 명언 선택 모드 확인 분기
-workflow.add_conditional_edges(
-    "validate_user_input",
-    is_quote_selection_input,
-    path_map={
-        "regular_chat": "chatbot",
-        "quote_selection": "process_quote_selection"
-    }
-)
+def build_graph():
+    """
+    LangGraph 워크플로우를 구성하고 컴파일
+    
+    같은 그래프를 동기(Flask, graph.invoke)와 비동기(ASGI, graph.ainvoke) 경로에서 함께 사용하며,
+    LLM 노드는 비동기 경로에서 await로 호출하고 명언 검색은 검색 전용 스레드 풀에서 실행합니다.
+    """
+    from langgraph.graph import StateGraph, START, END
+    
+    workflow = StateGraph(ChatbotState)
 
-workflow.add_edge("chatbot", "save_history")
+    # 노드 추가
+    workflow.add_node("validate_user_input", _node(validate_user_input))
+    workflow.add_node("chatbot", _node(chatbot, achatbot))
+    workflow.add_node("save_history", _node(save_history))
+    workflow.add_node("analyze_chat_history", _node(analyze_chat_history, aanalyze_chat_history))
+    workflow.add_node("generate_advice", _node(generate_advice, agenerate_advice))
+    workflow.add_node("retrieve_quotes", _node(retrieve_quotes, aretrieve_quotes))
+    workflow.add_node("join_advice_and_quotes", _node(join_advice_and_quotes))
+    workflow.add_node("present_quote", _node(present_quote))
+    workflow.add_node("process_quote_selection", _node(process_quote_selection))
 
-# 분석 시점 결정 분기
-workflow.add_conditional_edges(
-    "save_history",
-    should_analyze_chat_history,
-    path_map={
-        f"messages >= {TURN_THRESHOLD}": "analyze_chat_history",
-        f"messages < {TURN_THRESHOLD}": END
-    }
-)
-
-# 분석 → 조언 생성 → 명언 제시
-workflow.add_edge("analyze_chat_history", "generate_advice")
-
-# generate_advice 이후 명언 선택 모드 진입
-workflow.add_conditional_edges(
-    "generate_advice",
-    should_continue_quote_selection,
-    path_map={
-        "continue_quote_selection": "present_quote",  # 명언 제시
-        "quote_selection_complete": END  # 선택 완료
-    }
-)
+    # 기본 엣지 연결
+    workflow.add_edge(START, "validate_user_input")
 
-workflow.add_edge("present_quote", END)  # 명언 제시 후 사용자 입력 대기
+    # 명언 선택 모드 확인 분기
+    workflow.add_conditional_edges(
+        "validate_user_input",
+        is_quote_selection_input,
+        path_map={
+            "regular_chat": "chatbot",
+            "quote_selection": "process_quote_selection"
+        }
+    )
 
-# process_quote_selection에서 다음 명언으로 이동하는 경우 처리
-workflow.add_conditional_edges(
-    "process_quote_selection",
-    should_continue_quote_selection,
-    path_map={
-        "continue_quote_selection": "present_quote",  # 다음 명언 제시로 이동
-        "quote_selection_complete": END  # 선택 완료 - 워크플로우 종료
-    }
-)
+    workflow.add_edge("chatbot", "save_history")
+
+    # 분석 시점 결정 분기
+    workflow.add_conditional_edges(
+        "save_history",
+        should_analyze_chat_history,
+        path_map={
+            f"messages >= {TURN_THRESHOLD}": "analyze_chat_history",
+            f"messages < {TURN_THRESHOLD}": END
+        }
+    )
+
+    # 분석 → (조언 생성 ∥ 명언 검색) → 합류 → 명언 제시
+    # 두 분기는 분석 결과에만 의존하므로 병렬로 실행해 임계 경로를 max(LLM, 검색)로 줄임
+    workflow.add_edge("analyze_chat_history", "generate_advice")
+    workflow.add_edge("analyze_chat_history", "retrieve_quotes")
+    workflow.add_edge(["generate_advice", "retrieve_quotes"], "join_advice_and_quotes")
+
+    # 합류 이후 명언 선택 모드 진입
+    workflow.add_conditional_edges(
+        "join_advice_and_quotes",
+        should_continue_quote_selection,
+        path_map={
+            "continue_quote_selection": "present_quote",  # 명언 제시
+            "quote_selection_complete": END  # 선택 완료
+        }
+    )
+
+    workflow.add_edge("present_quote", END)  # 명언 제시 후 사용자 입력 대기
+
+    # process_quote_selection에서 다음 명언으로 이동하는 경우 처리
+    workflow.add_conditional_edges(
+        "process_quote_selection",
+        should_continue_quote_selection,
+        path_map={
+            "continue_quote_selection": "present_quote",  # 다음 명언 제시로 이동
+            "quote_selection_complete": END  # 선택 완료 - 워크플로우 종료
+        }
+    )
 
 # 그래프 컴파일
-graph = workflow.compile()
+    return workflow.compile()
+
+_graph = None
+_graph_lock = threading.Lock()
+
+def get_graph():
+    """컴파일된 그래프를 반환 (최초 호출 시 한 번만 컴파일)"""
+    global _graph
+    
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                start_time = time.perf_counter()
+                _graph = build_graph()
+                startup_timings['graph_compile_ms'] = round((time.perf_counter() - start_time) * 1000, 1)
+                print(f"🧩 LangGraph 컴파일 완료 ({startup_timings['graph_compile_ms']}ms)")
+    return _graph
 
 # === 통합된 챗봇 클래스 ===
 class EnhancedSolarChatbot:
@@ -556,6 +845,8 @@ class EnhancedSolarChatbot:
     
     def _init_state(self):
         """상태 초기화"""
+        from langchain_community.chat_message_histories import ChatMessageHistory
+        
         self.state = {
             "user_id": "",
             "thread_num": "",
@@ -573,45 +864,95 @@ class EnhancedSolarChatbot:
             "quote_selection_mode": False,
             "chat_analysis": "",
             "keywords": [],
-            "advice": ""
+            "advice": "",
+            "advice_ready": False,
+            "branch_timings": {}
         }
     
     def run_chatbot_once(self, user_input, user_id, thread_num):
         """단일 턴 대화 실행 - 완전히 LangGraph로 통합"""
+        self._begin_turn(user_input, user_id, thread_num)
+        try:
+            # LangGraph로 모든 로직 처리
+            return self._finish_turn(get_graph().invoke(self.state))
+        except Exception as e:
+            return self._error_state(e)
+    
+    async def arun_chatbot_once(self, user_input, user_id, thread_num):
+        """단일 턴 대화 실행 (비동기 경로) - LLM 호출을 await하므로 응답을 기다리는 동안 스레드를 점유하지 않음"""
+        self._begin_turn(user_input, user_id, thread_num)
+        try:
+            return self._finish_turn(await get_graph().ainvoke(self.state))
+        except Exception as e:
+            return self._error_state(e)
+    
+    def _begin_turn(self, user_input, user_id, thread_num):
         # 상태 업데이트
         self.state["user_message"] = user_input
         self.state["user_id"] = user_id
         self.state["thread_num"] = thread_num
-
-        try:
-            print(f"🔄 LangGraph 실행 시작 - User: {user_input[:30]}...")
-            print(f"📊 현재 상태: quote_selection_mode={self.state.get('quote_selection_mode')}, candidate_quotes={len(self.state.get('candidate_quotes', []))}")
-            
-            # LangGraph로 모든 로직 처리
-            result = graph.invoke(self.state)
-            self.state.update(result)
-            
-            print(f"✅ LangGraph 실행 완료")
-            print(f"📊 결과 상태: quote_selection_mode={self.state.get('quote_selection_mode')}, quote_selection_complete={self.state.get('quote_selection_complete')}")
-            print(f"💬 응답: {self.state.get('chatbot_message', '')[:100]}...")
+        
+        print(f"🔄 LangGraph 실행 시작 - User: {user_input[:30]}...")
+        print(f"📊 현재 상태: quote_selection_mode={self.state.get('quote_selection_mode')}, candidate_quotes={len(self.state.get('candidate_quotes', []))}")
+    
+    def _finish_turn(self, result):
+        self.state.update(result)
+        
+        print(f"✅ LangGraph 실행 완료")
+        print(f"📊 결과 상태: quote_selection_mode={self.state.get('quote_selection_mode')}, quote_selection_complete={self.state.get('quote_selection_complete')}")
+        print(f"💬 응답: {self.state.get('chatbot_message', '')[:100]}...")
+        
+        # 디버그 정보 출력
+        if self.state.get('quote_selection_complete'):
+            print(f"✅ 명언 선택 완료: {self.state['quote'][:50]}...")
+        elif self.state.get('quote_selection_mode'):
+            print(f"🔄 명언 선택 모드 활성 - 인덱스: {self.state.get('current_quote_index', 0)}")
+        elif self.state.get('advice'):
+            print(f"🎉 대화 분석 완료 - 명언 선택 시작")
             
-            # 디버그 정보 출력
-            if self.state.get('quote_selection_complete'):
-                print(f"✅ 명언 선택 완료: {self.state['quote'][:50]}...")
-            elif self.state.get('quote_selection_mode'):
-                print(f"🔄 명언 선택 모드 활성 - 인덱스: {self.state.get('current_quote_index', 0)}")
-            elif self.state.get('advice'):
-                print(f"🎉 대화 분석 완료 - 명언 선택 시작")
-                
-            return self.state
-                
+        return self.state
+    
+    def _error_state(self, error):
+        print(f"❌ 챗봇 실행 오류: {error}")
+        return {
+            **self.state,
+            "chatbot_message": "죄송해요, 지금 대화하는데 문제가 생겼어요. 잠시 후 다시 시도해주시겠어요?",
+            "status": "error"
+        }
+    
+    def stream_chatbot_once(self, user_input, user_id, thread_num):
+        """
+        단일 턴 대화를 실행하면서 진행 이벤트를 생성 (SSE 스트리밍용)
+        
+        chatbot 노드의 LLM 토큰은 생성되는 즉시, 분석/명언 단계는 시작과 완료 시점에 전달하며,
+        그래프가 끝나면 run_chatbot_once와 같이 self.state를 최종 상태로 갱신합니다.
+        
+        Yields:
+            tuple[str, Any]: ("content", 토큰 문자열), ("stage", {"stage": 단계, "status": "started" | "completed"}),
+                             ("error", 사용자에게 보여 줄 오류 메시지)
+        """
+        self._begin_turn(user_input, user_id, thread_num)
+        
+        final_state = None
+        try:
+            for mode, payload in get_graph().stream(self.state, stream_mode=["messages", "tasks", "values"]):
+                if mode == "messages":
+                    chunk, metadata = payload
+                    # 분석/조언 체인의 토큰은 사용자 응답이 아니므로 제외
+                    if metadata.get("langgraph_node") == "chatbot" and chunk.content:
+                        yield "content", chunk.content
+                elif mode == "tasks":
+                    stage = STREAM_STAGES.get(payload["name"])
+                    if stage:
+                        yield "stage", {"stage": stage, "status": "started" if "input" in payload else "completed"}
+                else:
+                    final_state = payload
         except Exception as e:
-            print(f"❌ 챗봇 실행 오류: {e}")
-            return {
-                **self.state,
-                "chatbot_message": "죄송해요, 지금 대화하는데 문제가 생겼어요. 잠시 후 다시 시도해주시겠어요?",
-                "status": "error"
-            }
+            print(f"❌ 챗봇 스트리밍 오류: {e}")
+            yield "error", "죄송해요, 지금 대화하는데 문제가 생겼어요. 잠시 후 다시 시도해주시겠어요?"
+            return
+        
+        self._finish_turn(final_state)
     
     def get_conversation_summary(self):
         """대화 요약 정보 반환"""
@@ -646,8 +987,219 @@ def get_chatbot_instance(user_id, thread_num):
     
     return chatbot_sessions[session_key]['chatbot']
 
+# === 임베딩 시스템 백그라운드 워밍업 ===
+warmup_status = {'started_at': None, 'finished_at': None, 'seconds': None, 'attempts': 0, 'error': None,
+                 'fallback_mode': False, 'centroid_fallback': None, 'tiers': {}}
+_warmup_thread = None
+_warmup_lock = threading.Lock()
+
+def fallback_reason() -> Optional[str]:
+    """검색 엔진을 로드할 수 없는 배포이면 그 사유 (로드할 수 있으면 None)"""
+    if not QUOTE_RETRIEVER_AVAILABLE:
+        return "명언 검색 시스템 import 실패"
+    if not EMBEDDING_LIBS_AVAILABLE:
+        return "임베딩 라이브러리 없음 (faiss, sentence_transformers)"
+    if not get_tier(DEFAULT_TIER).is_built():
+        return f"{DEFAULT_TIER} 티어의 로컬 모델 또는 인덱스 없음"
+    return None
+
+def enter_fallback_mode(reason: str):
+    """검색 엔진 로드를 포기하고 폴백 명언만으로 준비 완료 상태가 됨"""
+    global EMBEDDING_LOADING, FALLBACK_MODE
+    
+    FALLBACK_MODE = True
+    EMBEDDING_LOADING = False
+    warmup_status.update({'finished_at': datetime.now().isoformat(), 'fallback_mode': True, 'error': reason})
+    print(f"⚠️ 명언 검색 엔진 없이 폴백 명언 모드로 동작합니다: {reason}")
+    
+    # 중심점 폴백 모델은 첫 요청이 아니라 여기(워밍업 스레드)에서 로드 (준비 상태에는 영향 없음)
+    if CENTROID_FALLBACK_AVAILABLE:
+        warmup_status['centroid_fallback'] = warm_up_centroid_fallback()
+
+def warm_up_embedding_system():
+    """
+    기본 티어 검색 엔진을 로드하고 더미 쿼리를 실행한 뒤 준비 상태 플래그를 갱신
+    
+    라이브러리/모델/인덱스가 없는 배포는 바로, 로드가 WARMUP_MAX_ATTEMPTS번 실패하면 그 시점에
+    폴백 모드로 전환해 준비 완료로 보고합니다.
+    """
+    global EMBEDDING_LOADING, EMBEDDING_AVAILABLE
+    
+    # 채팅 경로(LangChain import + 그래프 컴파일)도 첫 요청 전에 준비
+    try:
+        get_graph()
+    except Exception as e:
+        print(f"⚠️ LangGraph 사전 컴파일 실패: {e} (첫 요청에서 다시 시도)")
+    
+    warmup_status['started_at'] = datetime.now().isoformat()
+    reason = fallback_reason()
+    if reason:
+        enter_fallback_mode(reason)
+        return
+    EMBEDDING_LOADING = True
+    while True:
+        warmup_status['attempts'] += 1
+        try:
+            seconds = get_quote_retriever().warm_up()
+            break
+        except Exception as e:
+            warmup_status['error'] = str(e)
+            if warmup_status['attempts'] >= WARMUP_MAX_ATTEMPTS:
+                enter_fallback_mode(f"워밍업 {warmup_status['attempts']}회 실패: {e}")
+                return
+            print(f"⚠️ 임베딩 시스템 워밍업 실패: {e} ({WARMUP_RETRY_SECONDS}초 후 재시도)")
+            time.sleep(WARMUP_RETRY_SECONDS)
+    
+    EMBEDDING_AVAILABLE = True
+    EMBEDDING_LOADING = False
+    warmup_status.update({'finished_at': datetime.now().isoformat(), 'seconds': round(seconds, 3), 'error': None})
+    startup_timings['warmup_ms'] = round((time.perf_counter() - _IMPORT_START) * 1000, 1)
+    print(f"🔥 임베딩 시스템 워밍업 완료 ({seconds:.1f}초) - 명언 검색 준비됨")
+    
+    # 인덱스가 빌드된 나머지 티어도 미리 로드 (준비 상태에는 영향 없음, 라우팅용 빌드 티어 캐시도 여기서 채움)
+    default_retriever = get_quote_retriever()
+    for tier in built_tiers():
+        if get_quote_retriever(tier) is default_retriever:
+            continue
+        try:
+            warmup_status['tiers'][tier] = round(get_quote_retriever(tier).warm_up(), 3)
+        except Exception as e:
+            warmup_status['tiers'][tier] = str(e)
+            print(f"⚠️ {tier} 티어 워밍업 실패: {e}")
+
+def warm_up_llm_pool():
+    """공유 LLM 체인을 만들고 API 서버 연결을 풀에 미리 열어 둠 (실패해도 첫 요청에서 연결)"""
+    try:
+        start_time = time.perf_counter()
+        connections = LLMChainBuilder.warm_up()
+        startup_timings['llm_warmup_ms'] = round((time.perf_counter() - start_time) * 1000, 1)
+        print(f"🔌 LLM 연결 풀 워밍업 완료 (연결 {connections}개)")
+    except Exception as e:
+        print(f"⚠️ LLM 연결 풀 워밍업 실패: {e}")
+
+def start_embedding_warmup():
+    """
+    워밍업 스레드를 한 번만 시작 (검색 시스템을 쓸 수 없으면 그래프만 준비하고 기본 명언 모드로 동작)
+    
+    LLM 연결 풀은 네트워크 지연이 검색 엔진 준비를 늦추지 않도록 별도 스레드에서 워밍업합니다.
+    """
+    global _warmup_thread
+    
+    if not WARMUP_ENABLED:
+        return
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=warm_up_embedding_system, name="embedding-warmup", daemon=True)
+            _warmup_thread.start()
+            threading.Thread(target=warm_up_llm_pool, name="llm-warmup", daemon=True).start()
+
+def is_retrieval_ready() -> bool:
+    """
+    트래픽을 받아도 되는지 여부
+    
+    그래프가 컴파일되고, 검색 엔진이 준비됐거나 폴백 명언 모드(검색 시스템 없음/로드 실패)일 때 준비 완료.
+    워밍업을 끈 경우(QUOTE_WARMUP=0)에는 첫 요청에서 로드하므로 항상 준비 완료로 봅니다.
+    """
+    if not WARMUP_ENABLED:
+        return True
+    return _graph is not None and (EMBEDDING_AVAILABLE or FALLBACK_MODE or not QUOTE_RETRIEVER_AVAILABLE)
+
+def build_chat_response(chatbot, result_state: dict, user_id: str, thread_num: str) -> dict:
+    """
+    한 턴의 그래프 결과로 채팅 API 응답 본문을 구성 (/api/chat/send 응답, /api/chat/stream 완료 이벤트)
+    
+    Args:
+        chatbot: 세션의 EnhancedSolarChatbot
+        result_state: 그래프 실행 결과 상태
+        user_id: 사용자 ID
+        thread_num: 대화 스레드 번호
+    
+    Returns:
+        dict: 응답 본문 (명언 선택/완료 턴이면 quote 포함)
+    """
+    ai_response = result_state.get('chatbot_message', '응답을 생성할 수 없습니다.')
+    
+    # 응답 데이터 구성
+    response_data = {
+        'userId': user_id,
+        'threadNum': thread_num,
+        'timestamp': result_state.get('timestamp', datetime.now().isoformat()),
+        'status': result_state.get('status', 'completed'),
+        'content': ai_response,
+        'quote': None,
+        'quote_selection': {
+            'active': False,
+            'current_index': 0,
+            'total_count': 0,
+            'quote_id': None,
+            'changed': False
+        },
+        'model': 'Solar Pro + LangGraph',
+        'embedding_system': 'Enhanced FAISS',
+        'conversation_summary': chatbot.get_conversation_summary()
+    }
+    
+    # 명언 선택 모드인 경우
+    if result_state.get('quote_selection_mode') and result_state.get('candidate_quotes'):
+        current_index = result_state.get('current_quote_index', 0)
+        candidate_quotes = result_state.get('candidate_quotes', [])
+        current_quote = candidate_quotes[current_index] if candidate_quotes else None
+        
+        if current_quote:
+            response_data['quote'] = {
+                'id': str(uuid.uuid4()),
+                'text': current_quote.get('quote', ''),
+                'author': QuoteManager.clean_author(current_quote.get('author', '')),
+                'advice': result_state.get('advice', ''),
+                'keywords': result_state.get('keywords', []),
+                'method': 'langgraph_enhanced_selection'
+            }
+            
+            response_data['quote_selection'] = {
+                'active': True,
+                'current_index': current_index,
+                'total_count': len(candidate_quotes),
+                'quote_id': str(uuid.uuid4()),
+                'changed': True
+            }
+            print(f"🔄 명언 선택 모드 활성 - 인덱스: {current_index}/{len(candidate_quotes)}")
+            print(f"📝 응답 내용: {result_state.get('chatbot_message', '')[:100]}...")
+    
+    # 명언 선택이 완료된 경우
+    elif result_state.get('quote_selection_complete') and result_state.get('quote'):
+        response_data['quote'] = {
+            'id': str(uuid.uuid4()),
+            'text': result_state['quote'],
+            'author': QuoteManager.clean_author(result_state['author']),
+            'advice': result_state.get('advice', ''),
+            'keywords': result_state.get('keywords', []),
+            'method': 'langgraph_enhanced_selection'
+        }
+        response_data['quote_selection'] = {
+            'active': False,
+            'current_index': 0,
+            'total_count': 0,
+            'quote_id': str(uuid.uuid4()),
+            'changed': False
+        }
+        print(f"📜 최종 명언 선택 완료: {result_state['quote'][:50]}... - {QuoteManager.clean_author(result_state['author'])}")
+        print(f"🎯 조언: {result_state.get('advice', '')}")
+        print(f"🔑 키워드: {result_state.get('keywords', [])}")
+        print(f"📝 완료 응답 내용: {result_state.get('chatbot_message', '')[:100]}...")
+    
+    # TURN_THRESHOLD 턴 분석 완료 시 추가 정보
+    chat_history = result_state.get('chat_history')
+    if chat_history is not None and len(chat_history.messages) >= TURN_THRESHOLD:
+        if result_state.get('advice'):
+            response_data['analysis_complete'] = True
+            response_data['advice'] = result_state.get('advice', '')
+            response_data['keywords'] = result_state.get('keywords', [])
+            print(f"🎉 대화 분석 완료 - 조언: {result_state.get('advice', '')}")
+    
+    return response_data
+
 # === API 엔드포인트들 ===
-@app.route('/api/health', methods=['GET'])
+@api.route('/api/health', methods=['GET'])
 def health_check():
     """서버 상태 확인"""
     global EMBEDDING_LOADING, EMBEDDING_AVAILABLE
@@ -672,10 +1224,38 @@ def health_check():
         'embedding_available': EMBEDDING_AVAILABLE,
         'embedding_loading': EMBEDDING_LOADING,
         'quote_retriever_available': QUOTE_RETRIEVER_AVAILABLE,
+        'warmup': warmup_status,
+        'startup': startup_timings,
+        'graph_ready': _graph is not None,
+        'llm_pool': http_pool_stats(),
+        'branch_timings': branch_timings.stats(),
+        'structured_analysis': structured_analysis_stats(),
+        'stream_timings': stream_timings.stats(),
+        'quote_retriever': get_quote_retriever().stats() if QUOTE_RETRIEVER_AVAILABLE else None,
+        'model_tiers': tier_stats() if QUOTE_RETRIEVER_AVAILABLE else None,
         'message': message
     })
 
-@app.route('/api/chat/send', methods=['POST'])
+@api.route('/api/health/live', methods=['GET'])
+def liveness_check():
+    """프로세스 생존 확인 (의존성 상태와 무관하게 항상 200)"""
+    return jsonify({'status': 'alive', 'timestamp': datetime.now().isoformat()})
+
+@api.route('/api/health/ready', methods=['GET'])
+def readiness_check():
+    """트래픽 수신 가능 여부 (명언 검색 엔진 워밍업이 끝나기 전에는 503)"""
+    ready = is_retrieval_ready()
+    return jsonify({
+        'status': 'ready' if ready else 'not_ready',
+        'timestamp': datetime.now().isoformat(),
+        'embedding_available': EMBEDDING_AVAILABLE,
+        'embedding_loading': EMBEDDING_LOADING,
+        'graph_ready': _graph is not None,
+        'fallback_mode': FALLBACK_MODE,
+        'warmup_error': warmup_status['error']
+    }), 200 if ready else 503
+
+@api.route('/api/chat/send', methods=['POST'])
 def send_message():
     """메시지 전송 API - LangGraph 기반 Enhanced Solar 챗봇 사용"""
     try:
@@ -702,82 +1282,7 @@ def send_message():
         ai_response = result_state.get('chatbot_message', '응답을 생성할 수 없습니다.')
         print(f"✨ Enhanced Solar API 응답: {ai_response}")
         
-        # 응답 데이터 구성
-        response_data = {
-            'userId': user_id,
-            'threadNum': thread_num,
-            'timestamp': result_state.get('timestamp', datetime.now().isoformat()),
-            'status': result_state.get('status', 'completed'),
-            'content': ai_response,
-            'quote': None,
-            'quote_selection': {
-                'active': False,
-                'current_index': 0,
-                'total_count': 0,
-                'quote_id': None,
-                'changed': False
-            },
-            'model': 'Solar Pro + LangGraph',
-            'embedding_system': 'Enhanced FAISS',
-            'conversation_summary': chatbot.get_conversation_summary()
-        }
-        
-        # 명언 선택 모드인 경우
-        if result_state.get('quote_selection_mode') and result_state.get('candidate_quotes'):
-            current_index = result_state.get('current_quote_index', 0)
-            candidate_quotes = result_state.get('candidate_quotes', [])
-            current_quote = candidate_quotes[current_index] if candidate_quotes else None
-            
-            if current_quote:
-                response_data['quote'] = {
-                    'id': str(uuid.uuid4()),
-                    'text': current_quote.get('quote', ''),
-                    'author': QuoteManager.clean_author(current_quote.get('author', '')),
-                    'advice': result_state.get('advice', ''),
-                    'keywords': result_state.get('keywords', []),
-                    'method': 'langgraph_enhanced_selection'
-                }
-                
-                response_data['quote_selection'] = {
-                    'active': True,
-                    'current_index': current_index,
-                    'total_count': len(candidate_quotes),
-                    'quote_id': str(uuid.uuid4()),
-                    'changed': True
-                }
-                print(f"🔄 명언 선택 모드 활성 - 인덱스: {current_index}/{len(candidate_quotes)}")
-                print(f"📝 응답 내용: {result_state.get('chatbot_message', '')[:100]}...")
-        
-        # 명언 선택이 완료된 경우
-        elif result_state.get('quote_selection_complete') and result_state.get('quote'):
-            response_data['quote'] = {
-                'id': str(uuid.uuid4()),
-                'text': result_state['quote'],
-                'author': QuoteManager.clean_author(result_state['author']),
-                'advice': result_state.get('advice', ''),
-                'keywords': result_state.get('keywords', []),
-                'method': 'langgraph_enhanced_selection'
-            }
-            response_data['quote_selection'] = {
-                'active': False,
-                'current_index': 0,
-                'total_count': 0,
-                'quote_id': str(uuid.uuid4()),
-                'changed': False
-            }
-            print(f"📜 최종 명언 선택 완료: {result_state['quote'][:50]}... - {QuoteManager.clean_author(result_state['author'])}")
-            print(f"🎯 조언: {result_state.get('advice', '')}")
-            print(f"🔑 키워드: {result_state.get('keywords', [])}")
-            print(f"📝 완료 응답 내용: {result_state.get('chatbot_message', '')[:100]}...")
-        
-        # TURN_THRESHOLD 턴 분석 완료 시 추가 정보
-        if len(result_state.get('chat_history', ChatMessageHistory()).messages) >= TURN_THRESHOLD:
-            if result_state.get('advice'):
-                response_data['analysis_complete'] = True
-                response_data['advice'] = result_state.get('advice', '')
-                response_data['keywords'] = result_state.get('keywords', [])
-                print(f"🎉 대화 분석 완료 - 조언: {result_state.get('advice', '')}")
-        
+        response_data = build_chat_response(chatbot, result_state, user_id, thread_num)
         return jsonify(response_data)
         
     except Exception as e:
@@ -789,7 +1294,50 @@ def send_message():
             'model': 'Solar Pro + LangGraph'
         }), 500
 
-@app.route('/api/chat/status', methods=['GET'])
+@api.route('/api/chat/stream', methods=['GET'])
+def stream_message():
+    """메시지 스트리밍 API (Server-Sent Events) - 챗봇 응답 토큰과 분석/명언 단계 이벤트를 실시간 전송"""
+    user_id = request.args.get('userId')
+    thread_num = request.args.get('threadNum')
+    content = request.args.get('content')
+    
+    # 필수 파라미터 확인
+    for field, value in (('userId', user_id), ('threadNum', thread_num), ('content', content)):
+        if not value:
+            return jsonify({'error': f'Missing required parameter: {field}'}), 400
+    
+    print(f"🤖 Enhanced Solar 스트리밍 호출 - User: {user_id}, Message: {content}")
+    chatbot = get_chatbot_instance(user_id, thread_num)
+    request_start = time.perf_counter()
+    
+    def sse(event_type: str, data) -> str:
+        event = {'type': event_type, 'data': data, 'timestamp': datetime.now().isoformat()}
+        return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+    
+    def generate():
+        timings = {}
+        for event_type, data in chatbot.stream_chatbot_once(content, user_id, thread_num):
+            elapsed_ms = round((time.perf_counter() - request_start) * 1000, 1)
+            timings.setdefault('ttfb_ms', elapsed_ms)
+            if event_type == 'content':
+                timings.setdefault('first_token_ms', elapsed_ms)
+            yield sse(event_type, data)
+            if event_type == 'error':
+                return
+        
+        # 명언 제시/선택 턴은 최종 메시지가 스트리밍된 채팅 응답과 다르므로 완료 이벤트의 content로 교체
+        response_data = build_chat_response(chatbot, chatbot.state, user_id, thread_num)
+        if response_data['quote']:
+            yield sse('quote', response_data['quote'])
+        yield sse('complete', response_data)
+        timings['total_ms'] = round((time.perf_counter() - request_start) * 1000, 1)
+        stream_timings.record(timings)
+        print(f"✨ 스트리밍 완료 - 첫 토큰 {timings.get('first_token_ms')}ms / 전체 {timings['total_ms']}ms")
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@api.route('/api/chat/status', methods=['GET'])
 def get_status():
     """상태 확인 API (폴링용)"""
     try:
@@ -832,6 +1380,98 @@ def get_status():
             'model': 'Solar Pro + LangGraph'
         }), 500
 
+@api.route('/api/quotes/search:batch', methods=['POST'])
+def search_quotes_batch():
+    """명언 일괄 검색 API - 백필/오프라인 재추천용, 결과를 NDJSON으로 스트리밍"""
+    data = request.get_json(silent=True) or {}
+    analyses = data.get('analyses')
+    top_k = data.get('topK', 3)
+    filters = data.get('filters')
+    tier = data.get('tier')
+    language = data.get('language')
+    latency_budget_ms = data.get('latencyBudgetMs')
+    
+    if not isinstance(analyses, list) or not analyses or not all(isinstance(a, str) for a in analyses):
+        return jsonify({'error': 'analyses must be a non-empty list of strings'}), 400
+    if len(analyses) > BATCH_SEARCH_MAX_ANALYSES:
+        return jsonify({'error': f'analyses cannot contain more than {BATCH_SEARCH_MAX_ANALYSES} items'}), 400
+    if not isinstance(top_k, int) or not 1 <= top_k <= BATCH_SEARCH_MAX_TOP_K:
+        return jsonify({'error': f'topK must be an integer between 1 and {BATCH_SEARCH_MAX_TOP_K}'}), 400
+    if not QUOTE_RETRIEVER_AVAILABLE:
+        return jsonify({'error': 'quote retriever is not available'}), 503
+    if filters is not None:
+        try:
+            QuoteFilterIndex.normalize_filters(filters)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    if tier is not None:
+        try:
+            get_tier(tier)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    if language is not None and not isinstance(language, str):
+        return jsonify({'error': 'language must be a string'}), 400
+    if latency_budget_ms is not None and (isinstance(latency_budget_ms, bool)
+                                          or not isinstance(latency_budget_ms, (int, float)) or latency_budget_ms <= 0):
+        return jsonify({'error': 'latencyBudgetMs must be a positive number'}), 400
+    
+    print(f"📦 명언 일괄 검색 요청: {len(analyses)}개, topK={top_k}, filters={filters}, "
+          f"tier={tier}, language={language}, latencyBudgetMs={latency_budget_ms}")
+    
+    def generate():
+        for chunk_start in range(0, len(analyses), BATCH_SEARCH_CHUNK_SIZE):
+            chunk = analyses[chunk_start:chunk_start + BATCH_SEARCH_CHUNK_SIZE]
+            try:
+                results = search_batch(chunk, top_k=top_k, filters=filters, tier=tier,
+                                       language=language, latency_budget_ms=latency_budget_ms)
+                lines = [{'index': chunk_start + offset, 'quotes': quotes} for offset, quotes in enumerate(results)]
+            except Exception as e:
+                print(f"⚠️ 명언 일괄 검색 오류 (index {chunk_start}~): {e}")
+                lines = [{'index': chunk_start + offset, 'error': str(e)} for offset in range(len(chunk))]
+            
+            for line in lines:
+                yield json.dumps(line, ensure_ascii=False) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+# === 애플리케이션 팩토리 ===
+def create_app() -> Flask:
+    """
+    Flask 앱을 생성하고 백그라운드 워밍업을 시작
+    
+    무거운 구성 요소(LangChain/LangGraph, 임베딩 모델, FAISS 인덱스)는 워밍업 스레드가 준비하므로
+    앱은 바로 요청을 받을 수 있고, /api/health/ready는 준비가 끝난 뒤 200을 반환합니다.
+    (gunicorn: gunicorn "app:create_app()", 기존 gunicorn app:app / flask run도 지원)
+    """
+    start_time = time.perf_counter()
+    app = Flask(__name__)
+    CORS(app)
+    app.register_blueprint(api)
+    start_embedding_warmup()
+    startup_timings['create_app_ms'] = round((time.perf_counter() - start_time) * 1000, 1)
+    return app
+
+_default_app = None
+_default_app_lock = threading.Lock()
+
+def __getattr__(name):
+    """
+    기존 진입점 호환 (gunicorn app:app, flask run) - 모듈 속성 app은 처음 접근할 때 create_app()으로 한 번만 생성
+    
+    app을 import만 하는 코드(테스트, asgi.py, 벤치마크)는 워밍업을 시작하지 않습니다.
+    """
+    global _default_app
+    
+    if name != 'app':
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _default_app is None:
+        with _default_app_lock:
+            if _default_app is None:
+                _default_app = create_app()
+    return _default_app
+
+startup_timings['import_ms'] = round((time.perf_counter() - _IMPORT_START) * 1000, 1)
+
 if __name__ == '__main__':
     print("🚀 Enhanced Solar API + LangGraph 서버 시작 중...")
     print("📡 포트: 3001")
@@ -843,4 +1483,6 @@ if __name__ == '__main__':
     print("🌐 CORS 활성화됨")
     print("✨ LangGraph 기반 개인화된 명언 추천 시스템!")
     
+    app = create_app()
+    print(f"⏱️ 시작 시간: import {startup_timings['import_ms']}ms + 앱 생성 {startup_timings['create_app_ms']}ms")
     app.run(host='0.0.0.0', port=3001, debug=False, use_reloader=False)
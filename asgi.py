@@ -0,0 +1,83 @@
+"""
+ASGI 서버 진입점 (비동기 요청 경로)
+
+Flask 모드(app.py)는 /api/chat/send가 graph.invoke로 Solar 응답을 기다리는 동안 워커 스레드를 붙잡고 있어
+동시 세션 수가 스레드 수로 제한됩니다. 이 모드는 /api/chat/send를 asyncio 코루틴으로 처리해
+graph.ainvoke로 LLM 호출을 await하고(공유 httpx.AsyncClient), CPU 작업인 명언 검색은
+크기가 제한된 검색 전용 스레드 풀(QUOTE_RETRIEVAL_WORKERS)에서 실행합니다.
+
+나머지 API(헬스체크, 상태 조회, 스트리밍, 일괄 검색)는 기존 Flask 앱을 그대로 마운트해 제공합니다.
+
+사용법 (프로젝트 루트에서):
+    uvicorn asgi:create_asgi_app --factory --host 0.0.0.0 --port 3001
+"""
+
+import contextlib
+from datetime import datetime
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+
+from app import build_chat_response, create_app, get_chatbot_instance
+from utils.llm_client import LLM_WARMUP_CONNECTIONS, aclose_http_pool, awarm_up_http_pool
+
+
+async def send_message(request: Request) -> JSONResponse:
+    """메시지 전송 API (비동기) - 응답 본문은 Flask 모드의 /api/chat/send와 동일"""
+    try:
+        data = await request.json()
+
+        # 필수 필드 확인
+        for field in ('userId', 'threadNum', 'content'):
+            if field not in data:
+                return JSONResponse({'error': f'Missing required field: {field}'}, status_code=400)
+
+        user_id = data['userId']
+        thread_num = data['threadNum']
+        content = data['content']
+
+        chatbot = get_chatbot_instance(user_id, thread_num)
+        result_state = await chatbot.arun_chatbot_once(content, user_id, thread_num)
+        return JSONResponse(build_chat_response(chatbot, result_state, user_id, thread_num))
+
+    except Exception as e:
+        print(f"❌ 에러 발생: {e}")
+        return JSONResponse({
+            'error': str(e),
+            'status': 'error',
+            'timestamp': datetime.now().isoformat(),
+            'model': 'Solar Pro + LangGraph'
+        }, status_code=500)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # 비동기 클라이언트 연결은 이 이벤트 루프에 묶이므로 서버 루프에서 워밍업
+    try:
+        connections = await awarm_up_http_pool(LLM_WARMUP_CONNECTIONS)
+        print(f"🔌 비동기 LLM 연결 풀 워밍업 완료 (연결 {connections}개)")
+    except Exception as e:
+        print(f"⚠️ 비동기 LLM 연결 풀 워밍업 실패: {e}")
+    yield
+    await aclose_http_pool()
+
+
+def create_asgi_app() -> Starlette:
+    """
+    비동기 /api/chat/send와 나머지 Flask API를 함께 제공하는 ASGI 앱을 생성
+
+    Flask 앱 생성 시 백그라운드 워밍업(그래프 컴파일, 검색 엔진, 동기 LLM 연결 풀)도 함께 시작됩니다.
+    """
+    return Starlette(
+        routes=[
+            Route('/api/chat/send', send_message, methods=['POST']),
+            Mount('/', app=WSGIMiddleware(create_app())),
+        ],
+        middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+        lifespan=lifespan,
+    )
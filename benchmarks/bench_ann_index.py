@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+ANN 인덱스 recall/지연 시간 벤치마크
+
+exact IndexFlatIP 검색 결과를 정답으로 두고, 인덱스 스펙별 recall@k와
+단일 쿼리 p50/p99 지연 시간, 빌드 시간, 인덱스 크기를 비교합니다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_ann_index --embeddings vectorDB/FAISS/paraphrase-multilingual-mpnet-base-v2/quotes_cosine_faiss.f32.npy
+    python -m benchmarks.bench_ann_index --synthetic 500000 --dim 768 \\
+        --spec flat --spec ivf_flat:nlist=4096,nprobe=32 --spec hnsw:ef_search=128
+"""
+
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from utils.index_spec import IndexSpec, build_faiss_index
+
+DEFAULT_SPECS = [
+    "flat",
+    "ivf_flat:nlist=1024,nprobe=8",
+    "ivf_flat:nlist=1024,nprobe=32",
+    "ivf_pq:nlist=1024,pq_m=64,nprobe=32",
+    "hnsw:hnsw_m=32,ef_search=64",
+    "hnsw:hnsw_m=32,ef_search=128",
+]
+
+
+def load_vectors(args) -> np.ndarray:
+    """임베딩 파일 또는 합성 벡터를 L2 정규화해 반환합니다."""
+    if args.embeddings:
+        vectors = np.load(args.embeddings, mmap_mode="r").astype(np.float32)
+    else:
+        rng = np.random.default_rng(args.seed)
+        # 실제 문장 임베딩처럼 군집 구조를 갖도록 중심점 주변에 분포시킴
+        centers = rng.standard_normal((max(1, args.synthetic // 500), args.dim)).astype(np.float32)
+        assignment = rng.integers(0, len(centers), args.synthetic)
+        vectors = centers[assignment] + 0.5 * rng.standard_normal((args.synthetic, args.dim)).astype(np.float32)
+    vectors = np.ascontiguousarray(vectors)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def make_queries(vectors: np.ndarray, num_queries: int, seed: int) -> np.ndarray:
+    """코퍼스 벡터에 잡음을 섞어 분포가 비슷한 쿼리를 만듭니다."""
+    rng = np.random.default_rng(seed + 1)
+    picks = rng.choice(len(vectors), size=min(num_queries, len(vectors)), replace=False)
+    queries = vectors[picks] + 0.1 * rng.standard_normal((len(picks), vectors.shape[1])).astype(np.float32)
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    faiss.normalize_L2(queries)
+    return queries
+
+
+def measure(index, queries: np.ndarray, top_k: int):
+    """단일 쿼리를 하나씩 검색하며 결과 ID와 지연 시간(ms)을 수집합니다."""
+    ids = np.empty((len(queries), top_k), dtype=np.int64)
+    latencies = np.empty(len(queries))
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        _, found = index.search(queries[i:i + 1], top_k)
+        latencies[i] = (time.perf_counter() - start) * 1000
+        ids[i] = found[0]
+    return ids, latencies
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    """exact 결과 대비 recall@k"""
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ANN 인덱스 recall@k / p50 / p99 벤치마크")
+    parser.add_argument("--embeddings", help="명언 임베딩 .npy 경로")
+    parser.add_argument("--synthetic", type=int, default=100000, help="임베딩 파일이 없을 때 생성할 합성 벡터 수")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=1, help="FAISS OpenMP 스레드 수 (서빙 환경과 맞추기)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spec", action="append", help="인덱스 스펙 (여러 번 지정 가능)")
+    args = parser.parse_args()
+
+    faiss.omp_set_num_threads(args.threads)
+    vectors = load_vectors(args)
+    queries = make_queries(vectors, args.queries, args.seed)
+    print(f"🚀 ANN 벤치마크: 벡터 {vectors.shape[0]}개 x {vectors.shape[1]}차원, 쿼리 {len(queries)}개, k={args.top_k}")
+
+    exact = faiss.IndexFlatIP(vectors.shape[1])
+    exact.add(vectors)
+    truth, _ = measure(exact, queries, args.top_k)
+
+    print(f"{'index':<48} {'recall@k':>9} {'p50(ms)':>9} {'p99(ms)':>9} {'build(s)':>9} {'size(MB)':>9}")
+    for text in args.spec or DEFAULT_SPECS:
+        spec = IndexSpec.parse(text)
+        start = time.perf_counter()
+        index = build_faiss_index(vectors, spec)
+        build_seconds = time.perf_counter() - start
+        size_mb = faiss.serialize_index(index).nbytes / 1024 / 1024
+
+        found, latencies = measure(index, queries, args.top_k)
+        print(f"{spec.label():<48} {recall_at_k(found, truth):>9.4f} "
+              f"{np.percentile(latencies, 50):>9.3f} {np.percentile(latencies, 99):>9.3f} "
+              f"{build_seconds:>9.1f} {size_mb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
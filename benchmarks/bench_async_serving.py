@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+동기(Flask) vs 비동기(ASGI) 서빙 부하 벤치마크
+
+가짜 LLM(benchmarks.bench_llm_client의 대역 서버, 응답마다 --generation-ms 지연)을 띄우고 두 서버 모드를
+각각 별도 프로세스로 실행한 뒤, 동시 세션 수를 늘려 가며 일정 시간 동안 /api/chat/send 턴을 계속 보냅니다.
+    - flask: gunicorn gthread 워커 1개 (--threads 스레드, graph.invoke) - 동시 처리 턴 수 = 스레드 수
+    - asgi:  uvicorn 워커 1개 (asgi:create_asgi_app, graph.ainvoke) - LLM 응답을 await하며 턴을 동시에 처리
+
+세션마다 이전 턴의 응답을 받은 뒤 다음 턴을 보내며(closed loop), 초당 처리 턴 수와 턴 지연 시간을 비교합니다.
+분석 턴이 생기지 않도록 세션의 턴 수가 상한에 도달하면 새 대화 스레드로 넘어갑니다. (명언 검색 엔진은 로드하지 않음)
+
+gunicorn과 uvicorn이 설치되어 있어야 합니다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_async_serving --sessions 8,32,128 --duration 10
+    python -m benchmarks.bench_async_serving --generation-ms 2000 --threads 16
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.bench_llm_client import start_stand_in
+
+MAX_TURNS = 9  # 대화 스레드당 턴 수 상한 (TURN_THRESHOLD 메시지에 도달하면 분석 턴이 시작됨)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(url: str, timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"서버가 {timeout}초 안에 준비되지 않았습니다: {url}")
+
+
+def start_server(mode: str, port: int, threads: int, env: dict) -> subprocess.Popen:
+    """서버 모드(flask/asgi)에 맞는 워커 프로세스 하나를 띄웁니다."""
+    if mode == "flask":
+        command = [sys.executable, "-m", "gunicorn", "-w", "1", "-k", "gthread", "--threads", str(threads),
+                   "-b", f"127.0.0.1:{port}", "--log-level", "warning", "app:create_app()"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "asgi:create_asgi_app", "--factory",
+                   "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+    return subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def run_load(base_url: str, sessions: int, duration: float) -> dict:
+    """sessions개 세션이 duration초 동안 턴을 계속 보내고 턴별 지연 시간(ms)과 오류 수를 반환합니다."""
+    import httpx
+
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def session(client, i):
+        nonlocal errors
+        thread, turn = 0, 0
+        while time.perf_counter() < deadline:
+            if turn == MAX_TURNS:
+                thread, turn = thread + 1, 0
+            start = time.perf_counter()
+            try:
+                response = await client.post(f"{base_url}/api/chat/send", json={
+                    "userId": f"load-{i}", "threadNum": str(thread), "content": f"오늘 조금 지쳤어요 ({turn})"})
+                if response.status_code != 200 or response.json().get("status") == "error":
+                    errors += 1
+                else:
+                    latencies.append((time.perf_counter() - start) * 1000)
+            except httpx.HTTPError:
+                errors += 1
+            turn += 1
+
+    limits = httpx.Limits(max_connections=sessions, max_keepalive_connections=sessions)
+    async with httpx.AsyncClient(limits=limits, timeout=120) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(session(client, i) for i in range(sessions)))
+        elapsed = time.perf_counter() - start
+    return {"latencies": latencies, "errors": errors, "elapsed": elapsed}
+
+
+def _summarize(label: str, result: dict) -> None:
+    """부하 결과의 처리량과 지연 시간 요약을 출력합니다."""
+    ordered = sorted(result["latencies"]) or [float("nan")]
+    p50 = ordered[len(ordered) // 2]
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    throughput = len(result["latencies"]) / result["elapsed"]
+    print(f"{label:<16} 처리량={throughput:7.1f}턴/s n={len(result['latencies']):<5} "
+          f"mean={statistics.mean(ordered):7.1f}ms p50={p50:7.1f}ms p99={p99:7.1f}ms 오류={result['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flask(gthread) vs ASGI(asyncio) 동시 세션 부하 벤치마크")
+    parser.add_argument("--sessions", default="8,32,128", help="동시 세션 수 목록 (쉼표 구분)")
+    parser.add_argument("--duration", type=float, default=10.0, help="세션 수마다 부하를 유지할 시간 (초)")
+    parser.add_argument("--threads", type=int, default=8, help="Flask 모드 워커 스레드 수 (gunicorn --threads)")
+    parser.add_argument("--generation-ms", type=float, default=1000.0, help="가짜 LLM의 응답 지연 (ms)")
+    parser.add_argument("--modes", default="flask,asgi", help="비교할 서버 모드 (쉼표 구분)")
+    args = parser.parse_args()
+    session_counts = [int(n) for n in args.sessions.split(",")]
+
+    llm_server = start_stand_in(0.0, args.generation_ms)
+    env = {
+        **os.environ,
+        "UPSTAGE_API_BASE": f"http://127.0.0.1:{llm_server.server_port}/v1",
+        "UPSTAGE_API_KEY": os.environ.get("UPSTAGE_API_KEY", "bench"),
+        "QUOTE_WARMUP": "0",
+        "LLM_POOL_SIZE": str(max(session_counts) * 2),  # LLM 연결 풀이 병목이 되지 않도록
+        "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])),
+    }
+
+    print("🚀 서빙 모드 부하 벤치마크 시작")
+    print(f"📡 가짜 LLM 응답 {args.generation_ms}ms | Flask 스레드 {args.threads} | 세션 수마다 {args.duration}초")
+    print("=" * 50)
+    for mode in args.modes.split(","):
+        port = _free_port()
+        process = start_server(mode, port, args.threads, env)
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            _wait_ready(f"{base_url}/api/health/ready", timeout=60)
+            asyncio.run(run_load(base_url, 1, 2.0))  # 그래프 컴파일/체인 생성이 측정에 섞이지 않도록
+            for sessions in session_counts:
+                _summarize(f"{mode} x{sessions}", asyncio.run(run_load(base_url, sessions, args.duration)))
+        finally:
+            process.terminate()
+            process.wait()
+    llm_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+채팅 스트리밍(SSE) 첫 바이트 시간 벤치마크
+
+가짜 스트리밍 LLM(benchmarks.bench_llm_client의 대역 서버)을 띄우고 앱 서버를 같은 프로세스에서 실행한 뒤,
+여러 세션이 동시에 채팅 턴을 보낼 때 두 API의 지연 시간을 비교합니다.
+    - send:   POST /api/chat/send   (전체 응답이 생성된 뒤 JSON 한 번에 수신)
+    - stream: GET  /api/chat/stream (챗봇 응답 토큰을 SSE 이벤트로 수신)
+
+    - ttfb: 요청 → 응답 본문 첫 바이트 (send는 전체 응답과 같음)
+    - first_token: 요청 → 첫 content 이벤트 (stream만 해당)
+    - total: 요청 → 응답 완료 (stream은 complete 이벤트)
+
+명언 검색 엔진은 로드하지 않으며(QUOTE_WARMUP=0), 분석 턴이 생기지 않도록 세션당 턴 수를 제한합니다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_chat_stream --sessions 8 --turns 5
+    python -m benchmarks.bench_chat_stream --generation-ms 400 --token-ms 40
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.bench_llm_client import start_stand_in
+
+MAX_TURNS = 9  # 세션당 턴 수 상한 (TURN_THRESHOLD 메시지에 도달하면 분석 턴이 시작됨)
+
+
+def _summarize(label: str, latencies: list) -> None:
+    """지연 시간 목록(ms)의 요약 통계를 출력합니다."""
+    ordered = sorted(latencies)
+    p50 = ordered[len(ordered) // 2]
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{label:<20} n={len(ordered):<4} mean={statistics.mean(ordered):7.1f}ms "
+          f"p50={p50:7.1f}ms p99={p99:7.1f}ms")
+
+
+def send_turn(client, base_url: str, user_id: str, message: str) -> dict:
+    """POST /api/chat/send 한 턴의 지연 시간(ms)"""
+    start = time.perf_counter()
+    with client.stream("POST", f"{base_url}/api/chat/send",
+                       json={"userId": user_id, "threadNum": "bench", "content": message}) as response:
+        response.raise_for_status()
+        chunks = response.iter_bytes()
+        next(chunks)
+        ttfb = (time.perf_counter() - start) * 1000
+        for _ in chunks:
+            pass
+    return {"ttfb": ttfb, "total": (time.perf_counter() - start) * 1000}
+
+
+def stream_turn(client, base_url: str, user_id: str, message: str) -> dict:
+    """GET /api/chat/stream 한 턴의 지연 시간(ms)"""
+    start = time.perf_counter()
+    result = {}
+    with client.stream("GET", f"{base_url}/api/chat/stream",
+                       params={"userId": user_id, "threadNum": "bench", "content": message}) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            result.setdefault("ttfb", (time.perf_counter() - start) * 1000)
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: "):])
+            if event["type"] == "content":
+                result.setdefault("first_token", (time.perf_counter() - start) * 1000)
+            elif event["type"] == "error":
+                raise RuntimeError(f"스트리밍 오류: {event['data']}")
+            elif event["type"] == "complete":
+                break
+    result["total"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def run_sessions(turn, base_url: str, sessions: int, turns: int, label: str) -> list:
+    """sessions개 세션이 동시에 turns번씩 턴을 보내고 턴별 지연 시간을 반환합니다."""
+    import httpx
+
+    def session(i):
+        with httpx.Client(timeout=60) as client:
+            return [turn(client, base_url, f"{label}-{i}", f"오늘 회사에서 조금 지쳤어요 ({t})") for t in range(turns)]
+
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        return [result for results in executor.map(session, range(sessions)) for result in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/api/chat/send vs /api/chat/stream 첫 바이트 시간 벤치마크")
+    parser.add_argument("--sessions", type=int, default=4, help="동시에 대화하는 세션 수")
+    parser.add_argument("--turns", type=int, default=5, help=f"세션당 턴 수 (최대 {MAX_TURNS})")
+    parser.add_argument("--generation-ms", type=float, default=300.0, help="가짜 LLM의 첫 토큰까지 지연 (ms)")
+    parser.add_argument("--token-ms", type=float, default=30.0, help="가짜 LLM의 토큰 간 지연 (ms)")
+    args = parser.parse_args()
+    turns = min(args.turns, MAX_TURNS)
+
+    llm_server = start_stand_in(0.0, args.generation_ms, args.token_ms)
+    # app/llm_client import 전에 설정해야 공유 클라이언트가 대역 서버를 가리킴
+    os.environ["UPSTAGE_API_BASE"] = f"http://127.0.0.1:{llm_server.server_port}/v1"
+    os.environ.setdefault("UPSTAGE_API_KEY", "bench")
+    os.environ["QUOTE_WARMUP"] = "0"
+
+    from werkzeug.serving import make_server
+
+    from app import LLMChainBuilder, create_app, get_graph
+
+    get_graph()  # 첫 요청에 그래프 컴파일/체인 생성 시간이 섞이지 않도록
+    LLMChainBuilder.warm_up()
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    app_server = make_server("127.0.0.1", 0, create_app(), threaded=True)
+    threading.Thread(target=app_server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{app_server.server_port}"
+
+    print("🚀 채팅 스트리밍 벤치마크 시작")
+    print(f"📡 가짜 LLM: 첫 토큰 {args.generation_ms}ms, 토큰 간 {args.token_ms}ms "
+          f"| 세션 {args.sessions} x 턴 {turns}")
+    print("=" * 50)
+
+    send = run_sessions(send_turn, base_url, args.sessions, turns, "send")
+    stream = run_sessions(stream_turn, base_url, args.sessions, turns, "stream")
+
+    _summarize("send ttfb", [r["ttfb"] for r in send])
+    _summarize("send total", [r["total"] for r in send])
+    _summarize("stream ttfb", [r["ttfb"] for r in stream])
+    _summarize("stream first_token", [r["first_token"] for r in stream if "first_token" in r])
+    _summarize("stream total", [r["total"] for r in stream])
+    saved = statistics.median(r["ttfb"] for r in send) - statistics.median(r["ttfb"] for r in stream)
+    print(f"📊 첫 바이트 p50 {saved:.1f}ms 단축")
+    app_server.shutdown()
+    llm_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
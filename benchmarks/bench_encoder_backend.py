@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+쿼리 인코더 백엔드 벤치마크
+
+PyTorch SentenceTransformer와 int8 양자화 ONNX Runtime 모델의
+임베딩 일치도(코사인 유사도)와 단일 쿼리/배치 인코딩 지연 시간을 비교합니다.
+(ONNX 모델은 python download_models.py로 먼저 내보내야 합니다)
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_encoder_backend --queries 50
+    python -m benchmarks.bench_encoder_backend --quantization avx512_vnni --batch-size 64
+"""
+
+import argparse
+import statistics
+import time
+
+from utils.encoder_backend import (ONNX_QUANTIZATION, PARITY_SAMPLES, PARITY_THRESHOLD, check_parity,
+                                   load_encoder)
+from utils.quote_retriever import MODEL_PATH
+
+
+def _summarize(label: str, latencies: list) -> None:
+    """지연 시간 목록(ms)의 요약 통계를 출력합니다."""
+    ordered = sorted(latencies)
+    p50 = ordered[len(ordered) // 2]
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{label:<14} n={len(ordered):<4} mean={statistics.mean(ordered):8.1f}ms "
+          f"p50={p50:8.1f}ms p99={p99:8.1f}ms")
+
+
+def bench_single(model, queries: int) -> list:
+    """단일 쿼리 인코딩 지연 시간(ms) (실제 검색 경로와 같은 배치 크기 1)"""
+    model.encode(PARITY_SAMPLES[:1], convert_to_tensor=False)  # 워밍업
+    latencies = []
+    for i in range(queries):
+        start = time.perf_counter()
+        model.encode([PARITY_SAMPLES[i % len(PARITY_SAMPLES)]], convert_to_tensor=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def bench_batch(model, batch_size: int, rounds: int) -> float:
+    """배치 인코딩 처리량 (문장/초)"""
+    texts = [PARITY_SAMPLES[i % len(PARITY_SAMPLES)] for i in range(batch_size)]
+    model.encode(texts, batch_size=batch_size, convert_to_tensor=False)  # 워밍업
+    start = time.perf_counter()
+    for _ in range(rounds):
+        model.encode(texts, batch_size=batch_size, convert_to_tensor=False)
+    return batch_size * rounds / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PyTorch vs int8 ONNX 쿼리 인코더 벤치마크")
+    parser.add_argument("--model", default=MODEL_PATH, help="로컬 SentenceTransformer 모델 경로")
+    parser.add_argument("--quantization", default=ONNX_QUANTIZATION, help="양자화 설정 이름")
+    parser.add_argument("--threshold", type=float, default=PARITY_THRESHOLD, help="최소 코사인 유사도")
+    parser.add_argument("--queries", type=int, default=50, help="단일 쿼리 측정 횟수")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--batch-rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print("🚀 인코더 백엔드 벤치마크 시작")
+    print("=" * 50)
+    parity = check_parity(args.model, args.quantization, threshold=args.threshold, save=False)
+    print(f"🔍 일치도: 최소 코사인 {parity['min_cosine']:.4f} / 평균 {parity['mean_cosine']:.4f} "
+          f"(기준 {args.threshold}, {'통과' if parity['passed'] else '실패'})")
+
+    results = {}
+    for backend in ("torch", "onnx"):
+        start = time.perf_counter()
+        model = load_encoder(args.model, backend, args.quantization)
+        print(f"🔧 {backend} 모델 로드: {(time.perf_counter() - start) * 1000:.0f}ms")
+        results[backend] = (bench_single(model, args.queries), bench_batch(model, args.batch_size, args.batch_rounds))
+
+    for backend, (latencies, throughput) in results.items():
+        _summarize(f"{backend} single", latencies)
+        print(f"{backend + ' batch':<14} {throughput:8.1f} 문장/초 (배치 {args.batch_size})")
+    speedup = statistics.median(results["torch"][0]) / statistics.median(results["onnx"][0])
+    print(f"📊 단일 쿼리 p50 기준 {speedup:.1f}배")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+LLM 클라이언트 재사용 벤치마크
+
+로컬 대역 서버(OpenAI 호환 /chat/completions)를 띄워 두고, 채팅 체인 한 번 호출(한 턴)의 지연 시간을 비교합니다.
+    - per-turn: 턴마다 ChatUpstage와 프롬프트 체인을 새로 생성 (기존 방식, 턴마다 새 클라이언트/연결)
+    - shared:   프로세스 공유 체인 + keep-alive 연결 풀 (LLMChainBuilder.get_chain)
+
+대역 서버는 새 연결마다 --handshake-ms 만큼 지연해 원격 API의 TCP/TLS 연결 수립 비용을 흉내 내고,
+응답마다 --generation-ms 만큼 지연해 모델 생성 시간을 흉내 냅니다.
+stream=true 요청에는 토큰마다 token_ms 간격으로 SSE 청크를 보내는 가짜 스트리밍 LLM으로 동작합니다.
+(benchmarks.bench_chat_stream에서 재사용)
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_llm_client --turns 50
+    python -m benchmarks.bench_llm_client --turns 100 --handshake-ms 60 --concurrency 4
+"""
+
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """OpenAI 호환 채팅 응답을 돌려주는 대역 API (HTTP/1.1 keep-alive)"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # 헤더/본문을 나눠 쓸 때 지연 ACK(40ms)에 걸리지 않도록
+    handshake_ms = 0.0
+    generation_ms = 0.0
+    token_ms = 0.0
+    reply = "오늘 하루도 수고 많으셨어요. 어떤 일이 있었는지 조금 더 들려주실래요?"
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StandInHandler.lock:
+            StandInHandler.connections += 1
+        time.sleep(self.handshake_ms / 1000)  # 연결 수립 비용 (연결당 한 번)
+
+    def _send(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._send(404, {"error": "not found"})
+
+    def _stream(self) -> None:
+        """OpenAI 호환 스트리밍 응답 (어절 단위 청크를 token_ms 간격으로 전송, chunked 인코딩)"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write(data: str) -> None:
+            payload = f"data: {data}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(payload):x}\r\n".encode() + payload + b"\r\n")
+            self.wfile.flush()
+
+        words = self.reply.split(" ")
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(self.token_ms / 1000)
+            write(json.dumps({
+                "id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": "solar-pro",
+                "choices": [{"index": 0, "finish_reason": None,
+                             "delta": {"role": "assistant", "content": word if i == 0 else " " + word}}],
+            }, ensure_ascii=False))
+        write(json.dumps({"id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": int(time.time()),
+                          "model": "solar-pro", "choices": [{"index": 0, "finish_reason": "stop", "delta": {}}]}))
+        write("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.generation_ms / 1000)
+        if body.get("stream"):
+            self._stream()
+            return
+        time.sleep(self.token_ms * (len(self.reply.split(" ")) - 1) / 1000)  # 스트리밍과 같은 전체 생성 시간
+        self._send(200, {
+            "id": "chatcmpl-bench", "object": "chat.completion", "created": int(time.time()), "model": "solar-pro",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": self.reply}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        })
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in(handshake_ms: float, generation_ms: float, token_ms: float = 0.0) -> ThreadingHTTPServer:
+    StandInHandler.handshake_ms = handshake_ms
+    StandInHandler.generation_ms = generation_ms
+    StandInHandler.token_ms = token_ms
+    server_class = type("StandInServer", (ThreadingHTTPServer,), {"request_queue_size": 1024})  # 동시 연결 폭주 시 SYN 재전송 방지
+    server = server_class(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _summarize(label: str, latencies: list, connections: int) -> None:
+    """지연 시간 목록(ms)의 요약 통계를 출력합니다."""
+    ordered = sorted(latencies)
+    p50 = ordered[len(ordered) // 2]
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{label:<10} n={len(ordered):<4} mean={statistics.mean(ordered):7.1f}ms "
+          f"p50={p50:7.1f}ms p99={p99:7.1f}ms 연결={connections}")
+
+
+def run_turns(make_chain, turns: int, concurrency: int) -> list:
+    """make_chain()으로 얻은 체인을 턴마다 호출하고 턴별 지연 시간(ms)을 반환합니다."""
+    def turn(i):
+        start = time.perf_counter()
+        make_chain().invoke({"user_input": f"오늘 너무 지쳤어요 ({i})"})
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(turn, range(turns)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="턴마다 새 LLM 클라이언트 vs 공유 체인 + 연결 풀 벤치마크")
+    parser.add_argument("--turns", type=int, default=50, help="측정할 턴 수")
+    parser.add_argument("--concurrency", type=int, default=1, help="동시에 진행하는 턴 수 (세션 수)")
+    parser.add_argument("--handshake-ms", type=float, default=30.0, help="대역 서버의 연결당 수립 지연 (ms)")
+    parser.add_argument("--generation-ms", type=float, default=0.0, help="대역 서버의 응답 생성 지연 (ms)")
+    args = parser.parse_args()
+
+    server = start_stand_in(args.handshake_ms, args.generation_ms)
+    # app/llm_client import 전에 설정해야 공유 클라이언트가 대역 서버를 가리킴
+    os.environ["UPSTAGE_API_BASE"] = f"http://127.0.0.1:{server.server_port}/v1"
+    os.environ.setdefault("UPSTAGE_API_KEY", "bench")
+
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_upstage import ChatUpstage
+
+    from app import LLMChainBuilder
+    from utils.llm_client import warm_up_http_pool
+    from utils.system_prompt import SYSTEM_PROMPT
+
+    def per_turn_chain():
+        llm = ChatUpstage(model="solar-pro", temperature=0.7, max_tokens=300,
+                          base_url=os.environ["UPSTAGE_API_BASE"])
+        prompt = ChatPromptTemplate.from_messages([("system", SYSTEM_PROMPT), ("user", "{user_input}")])
+        return prompt | llm
+
+    print("🚀 LLM 클라이언트 재사용 벤치마크 시작")
+    print(f"📡 대역 서버: {os.environ['UPSTAGE_API_BASE']} (연결 수립 {args.handshake_ms}ms, "
+          f"생성 {args.generation_ms}ms, 동시 {args.concurrency})")
+    print("=" * 50)
+
+    StandInHandler.connections = 0
+    per_turn = run_turns(per_turn_chain, args.turns, args.concurrency)
+    per_turn_connections = StandInHandler.connections
+
+    StandInHandler.connections = 0
+    LLMChainBuilder.get_chain("chat")
+    warm_up_http_pool(args.concurrency)  # 서버 시작 시 워밍업과 동일
+    shared = run_turns(lambda: LLMChainBuilder.get_chain("chat"), args.turns, args.concurrency)
+    shared_connections = StandInHandler.connections
+
+    _summarize("per-turn", per_turn, per_turn_connections)
+    _summarize("shared", shared, shared_connections)
+    saved = statistics.median(per_turn) - statistics.median(shared)
+    print(f"📊 턴당 p50 {saved:.1f}ms 절약 ({statistics.median(per_turn) / statistics.median(shared):.1f}배)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+명언 검색 마이크로 벤치마크
+
+호출마다 모델/인덱스/데이터셋을 새로 로드하던 기존 방식(before)과
+프로세스 상주 QuoteRetriever(after)의 쿼리당 지연 시간을 비교합니다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_quote_retriever --queries 20 --cold-queries 3
+"""
+
+import argparse
+import statistics
+import time
+
+from utils.quote_retriever import QuoteRetriever
+
+SAMPLE_ANALYSES = [
+    "사용자는 새로운 도전에 대한 불안감을 느끼고 있지만, 동시에 성장하고 싶은 강한 의지를 보이고 있습니다.",
+    "사용자는 최근 인간관계에서 상처를 받아 외로움과 슬픔을 느끼고 있으며 위로가 필요해 보입니다.",
+    "사용자는 취업 준비로 지쳐 있지만 목표를 포기하지 않으려는 끈기를 보여주고 있습니다.",
+    "사용자는 일상의 작은 행복에 감사하며 현재의 삶에 만족하고 있습니다.",
+    "The user feels stuck in their career and is looking for motivation to make a change.",
+]
+
+
+def _summarize(label: str, latencies: list) -> None:
+    """지연 시간 목록(ms)의 요약 통계를 출력합니다."""
+    ordered = sorted(latencies)
+    p50 = ordered[len(ordered) // 2]
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{label:<8} n={len(ordered):<4} mean={statistics.mean(ordered):9.1f}ms "
+          f"p50={p50:9.1f}ms p99={p99:9.1f}ms")
+
+
+def bench_cold(queries: int, top_k: int) -> list:
+    """호출마다 새 엔진을 만들어 로드까지 포함한 지연 시간을 측정합니다. (기존 방식)"""
+    latencies = []
+    for i in range(queries):
+        analysis = SAMPLE_ANALYSES[i % len(SAMPLE_ANALYSES)]
+        start = time.perf_counter()
+        QuoteRetriever().search(analysis, top_k=top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def bench_resident(queries: int, top_k: int) -> list:
+    """한 번 로드한 엔진을 재사용하는 쿼리당 지연 시간을 측정합니다. (상주 방식)"""
+    retriever = QuoteRetriever()
+    if not retriever.load():
+        raise RuntimeError(f"검색 엔진 로드 실패: {retriever.load_error}")
+    print(f"🔧 엔진 최초 로드: {retriever.load_seconds * 1000:.1f}ms")
+
+    latencies = []
+    for i in range(queries):
+        analysis = SAMPLE_ANALYSES[i % len(SAMPLE_ANALYSES)]
+        start = time.perf_counter()
+        retriever.search(analysis, top_k=top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="QuoteRetriever 쿼리당 지연 시간 벤치마크")
+    parser.add_argument("--queries", type=int, default=20, help="상주 엔진으로 실행할 쿼리 수")
+    parser.add_argument("--cold-queries", type=int, default=3, help="호출마다 새로 로드하는 쿼리 수")
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+
+    print("🚀 명언 검색 벤치마크 시작")
+    print("=" * 50)
+    cold = bench_cold(args.cold_queries, args.top_k)
+    resident = bench_resident(args.queries, args.top_k)
+
+    _summarize("before", cold)
+    _summarize("after", resident)
+    print(f"📊 쿼리당 평균 {statistics.mean(cold) / statistics.mean(resident):.0f}배 단축")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+서버 시작 시간 벤치마크
+
+새 프로세스에서 서버를 띄워 다음 시점을 측정합니다.
+    - import: app 모듈 import 시간 (프로세스 내부 측정)
+    - live: 프로세스 시작 → /api/health/live 첫 200 응답 (트래픽을 받을 수 있는 시점)
+    - ready: 프로세스 시작 → /api/health/ready 첫 200 응답 (그래프 컴파일 + 명언 검색 엔진 워밍업 완료)
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --runs 3 --importtime 15   # import 비용이 큰 모듈 상위 15개
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+SERVER_CODE = """
+import time
+start = time.perf_counter()
+import app
+print("IMPORT_MS", (time.perf_counter() - start) * 1000, flush=True)
+app.create_app().run(host="127.0.0.1", port={port}, debug=False, use_reloader=False)
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url: str, deadline: float) -> float | None:
+    """url이 200을 반환할 때까지 폴링하고 그 시각(perf_counter)을 반환합니다. (시간 초과 시 None)"""
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def measure_once(timeout: float) -> dict:
+    """서버 프로세스 하나를 띄워 import/live/ready 시간(ms)을 측정합니다."""
+    port = _free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", SERVER_CODE.format(port=port)],
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        import_ms = None
+        for line in process.stdout:
+            if line.startswith("IMPORT_MS"):
+                import_ms = float(line.split()[1])
+                break
+
+        deadline = start + timeout
+        base = f"http://127.0.0.1:{port}/api/health"
+        live = _wait_for(f"{base}/live", deadline)
+        ready = _wait_for(f"{base}/ready", deadline)
+        with urllib.request.urlopen(base, timeout=5) as response:
+            startup = json.load(response).get("startup")
+    finally:
+        process.terminate()
+        process.wait()
+
+    return {
+        "import_ms": import_ms,
+        "live_ms": (live - start) * 1000 if live else None,
+        "ready_ms": (ready - start) * 1000 if ready else None,
+        "startup": startup,
+    }
+
+
+def print_importtime(top: int) -> None:
+    """python -X importtime으로 app import 시 누적 비용이 큰 모듈을 출력합니다."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"],
+                            capture_output=True, text=True, env={**os.environ, "QUOTE_WARMUP": "0"})
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative), name))
+    print(f"📦 import 누적 시간 상위 {top}개")
+    for cumulative, name in sorted(rows, reverse=True)[:top]:
+        print(f"   {cumulative / 1000:8.1f}ms  {name}")
+
+
+def _summary(label: str, values: list) -> None:
+    values = [value for value in values if value is not None]
+    if not values:
+        print(f"{label:<8} 측정 실패 (시간 초과)")
+        return
+    print(f"{label:<8} n={len(values):<3} mean={statistics.mean(values):8.1f}ms "
+          f"min={min(values):8.1f}ms max={max(values):8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="서버 시작(import/live/ready) 시간 벤치마크")
+    parser.add_argument("--runs", type=int, default=5, help="서버 프로세스 실행 횟수")
+    parser.add_argument("--timeout", type=float, default=300.0, help="실행당 ready 대기 최대 시간 (초)")
+    parser.add_argument("--importtime", type=int, default=0, help="import 비용 상위 모듈 출력 개수 (0이면 생략)")
+    args = parser.parse_args()
+
+    print("🚀 서버 시작 시간 벤치마크")
+    print("=" * 50)
+    results = [measure_once(args.timeout) for _ in range(args.runs)]
+
+    _summary("import", [result["import_ms"] for result in results])
+    _summary("live", [result["live_ms"] for result in results])
+    _summary("ready", [result["ready_ms"] for result in results])
+    print(f"🔧 마지막 실행의 단계별 시간: {results[-1]['startup']}")
+
+    if args.importtime:
+        print_importtime(args.importtime)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+워커 프로세스별 메모리(RSS) 벤치마크
+
+gunicorn 워커처럼 여러 프로세스가 같은 인덱스 산출물(FAISS 인덱스, fp32 벡터, 메타데이터, 필터/BM25 색인)을
+동시에 열었을 때 워커당 메모리를 측정합니다. FAISS 인덱스를 메모리 매핑으로 여는 방식(mmap, QUOTE_INDEX_MMAP=1)과
+프로세스 힙에 읽어 들이는 방식(heap, QUOTE_INDEX_MMAP=0)을 비교합니다. (나머지 산출물은 두 방식 모두 메모리 매핑)
+
+    - rss: 워커가 산출물을 연 뒤 늘어난 상주 메모리 (공유 페이지 포함)
+    - pss: 공유 페이지를 공유하는 프로세스 수로 나눈 비례 메모리 (워커 pss 합 ≈ 호스트 실사용량)
+    - private: 해당 워커만 쓰는 메모리 (힙 복사본)
+
+임베딩 모델은 워커마다 따로 로드되므로 측정에서 제외합니다. (Linux /proc/self/smaps_rollup 필요)
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.bench_worker_memory --workers 1,4,8
+    python -m benchmarks.bench_worker_memory --artifact-dir vectorDB/FAISS/all-MiniLM-L6-v2 --queries 200
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from utils.index_artifacts import ArtifactPaths, artifact_dir_for
+from utils.quote_retriever import MODEL_PATH
+
+
+def read_smaps() -> dict:
+    """현재 프로세스의 Rss/Pss/Private 메모리 (MB)"""
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:", "Private_Clean:", "Private_Dirty:"):
+                values[parts[0][:-1]] = int(parts[1]) / 1024
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "private": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def run_worker(artifact_dir: str, mmap: bool, queries: int) -> None:
+    """산출물을 열고 모든 페이지를 한 번씩 읽은 뒤, 부모가 신호를 주면 메모리를 출력합니다."""
+    import faiss
+    import numpy as np
+
+    from utils.index_spec import apply_search_params, load_index_spec, read_faiss_index
+    from utils.quote_filters import QuoteFilterIndex
+    from utils.quote_lexical import QuoteLexicalIndex
+    from utils.quote_metadata import QuoteMetadataStore
+
+    before = read_smaps()
+    paths = ArtifactPaths(artifact_dir)
+    spec = load_index_spec(paths.index)
+    index, index_mmap = read_faiss_index(paths.index, spec, mmap)
+    spec.nprobe = spec.nlist  # 모든 IVF 리스트를 방문해 전체 페이지를 읽음
+    apply_search_params(index, spec)
+    vectors = np.load(paths.vectors, mmap_mode="r") if os.path.exists(paths.vectors) else None
+    metadata = QuoteMetadataStore(paths.metadata)
+    filters = QuoteFilterIndex(paths.filters) if os.path.exists(paths.filters) else None
+    lexical = QuoteLexicalIndex(paths.lexical) if os.path.exists(paths.lexical) else None
+
+    # 실제 검색 트래픽처럼 인덱스/벡터/메타데이터 페이지를 읽어 상주시킴
+    rng = np.random.default_rng(0)
+    batch = rng.standard_normal((queries, index.d)).astype(np.float32)
+    faiss.normalize_L2(batch)
+    index.search(batch, 10)
+    if vectors is not None:
+        float(np.asarray(vectors, dtype=np.float32).sum())
+    for row_id in range(len(metadata)):
+        metadata.row(row_id)
+    if filters is not None:
+        filters.most_common("tag", 10)
+    if lexical is not None:
+        lexical.search("hope courage love life", 10)
+
+    print("READY", flush=True)
+    sys.stdin.readline()  # 모든 워커가 로드를 마칠 때까지 대기 (동시에 살아 있어야 공유가 측정됨)
+    after = read_smaps()
+    print(json.dumps({"index_mmap": index_mmap, **{key: after[key] - before[key] for key in after}}), flush=True)
+    sys.stdin.readline()  # 다른 워커가 측정을 마칠 때까지 종료하지 않음
+
+
+def measure(artifact_dir: str, workers: int, mmap: bool, queries: int) -> list:
+    """워커 프로세스 workers개를 동시에 띄워 워커별 메모리 증가량(MB)을 측정합니다."""
+    command = [sys.executable, "-m", "benchmarks.bench_worker_memory", "--worker",
+               "--artifact-dir", artifact_dir, "--queries", str(queries)]
+    if not mmap:
+        command.append("--no-mmap")
+    processes = [subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+                 for _ in range(workers)]
+    try:
+        for process in processes:
+            line = process.stdout.readline()
+            if not line.startswith("READY"):
+                raise RuntimeError(f"워커 로드 실패: {line.strip() or process.wait()}")
+        for process in processes:
+            process.stdin.write("\n")
+            process.stdin.flush()
+        return [json.loads(process.stdout.readline()) for process in processes]
+    finally:
+        for process in processes:
+            process.kill()
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="워커 프로세스별 인덱스 메모리(RSS/PSS) 벤치마크")
+    parser.add_argument("--artifact-dir", default=artifact_dir_for(os.path.basename(MODEL_PATH)),
+                        help="build_index.py 산출물 디렉토리")
+    parser.add_argument("--workers", default="1,4,8", help="동시에 띄울 워커 수 목록 (쉼표 구분)")
+    parser.add_argument("--queries", type=int, default=100, help="워커마다 실행할 검색 쿼리 수")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--no-mmap", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.artifact_dir, not args.no_mmap, args.queries)
+        return
+
+    print("🚀 워커 메모리 벤치마크 시작")
+    print(f"📁 산출물: {args.artifact_dir}")
+    print("=" * 50)
+    index_not_mapped = False
+    for workers in (int(n) for n in args.workers.split(",")):
+        for mmap in (False, True):
+            results = measure(args.artifact_dir, workers, mmap, args.queries)
+            mode = "mmap" if mmap else "heap"
+            if mmap and not results[0]["index_mmap"]:
+                mode += "*"
+                index_not_mapped = True
+            rss = statistics.mean(result["rss"] for result in results)
+            private = statistics.mean(result["private"] for result in results)
+            total_pss = sum(result["pss"] for result in results)
+            print(f"workers={workers:<2} {mode:<6} 워커당 rss={rss:8.1f}MB private={private:8.1f}MB "
+                  f"| 전체 pss={total_pss:8.1f}MB")
+    if index_not_mapped:
+        print("(* FAISS 인덱스는 매핑되지 않음 - faiss 1.10 미만의 Flat/HNSW 인덱스)")
+
+
+if __name__ == "__main__":
+    main()
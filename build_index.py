@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+명언 검색 인덱스 빌드 스크립트
+명언 CSV → (CPU 배치 임베딩) → FAISS 인덱스 + 메타데이터 + 매니페스트
+
+중단되더라도 다시 실행하면 마지막 체크포인트부터 이어서 진행합니다.
+데이터셋을 수정한 뒤 다시 실행하면 바뀐 행만 인코딩하고 나머지 벡터는 재사용합니다.
+
+사용 예시:
+    python build_index.py                                           # exact IndexFlatIP
+    python build_index.py --index-type hnsw --ef-search 128
+    python build_index.py --index-type ivf_flat --nlist 4096 --nprobe 32
+    python build_index.py --storage int8 --rerank-k 50              # SQ8 양자화 + fp32 재정렬
+    python build_index.py --csv Dataset/sampled_quotes.csv --text-column quote
+    python build_index.py --rebuild                                 # 전체 재인코딩 (톰스톤 정리)
+    python build_index.py --dedup-threshold 0                       # 근접 중복 제거 끄기
+    python build_index.py --no-fallback                             # 중심점 폴백 산출물 생략
+    python build_index.py --tier fast                               # MiniLM 티어 인덱스 (영어, quote 컬럼)
+"""
+
+import argparse
+import os
+import time
+
+from utils.index_artifacts import ArtifactPaths, artifact_dir_for
+from utils.index_builder import IndexBuilder
+from utils.index_spec import INDEX_KINDS, STORAGE_TYPES, IndexSpec
+from utils.quote_dedup import DEDUP_THRESHOLD
+from utils.quote_fallback import FALLBACK_DIR, FALLBACK_MODEL_PATH, build_centroid_fallback
+from utils.quote_filters import QuoteFilterIndex
+from utils.model_registry import MODEL_TIERS
+from utils.quote_metadata import QuoteMetadataStore
+from utils.quote_retriever import DATASET_PATH, MODEL_PATH
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="명언 검색 인덱스 빌드 (재시작 가능, CPU 전용)")
+    parser.add_argument("--csv", default=DATASET_PATH, help="명언 CSV 경로")
+    parser.add_argument("--model", help=f"로컬 SentenceTransformer 모델 경로 (기본값: {MODEL_PATH})")
+    parser.add_argument("--tier", choices=list(MODEL_TIERS),
+                        help="모델 티어 (티어의 모델 경로와 임베딩 컬럼을 기본값으로 사용)")
+    parser.add_argument("--out-dir", help="산출물 디렉토리 (기본값: vectorDB/FAISS/<모델 ID>)")
+    parser.add_argument("--text-column", help="임베딩할 컬럼 (기본값: insight, 없으면 quote)")
+    parser.add_argument("--chunk-rows", type=int, default=2048, help="CSV 청크/체크포인트 단위 행 수")
+    parser.add_argument("--batch-size", type=int, default=64, help="인코딩 배치 크기")
+    parser.add_argument("--threads", type=int, help="torch CPU 스레드 수")
+    parser.add_argument("--no-resume", action="store_true", help="체크포인트를 무시하고 처음부터 빌드")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="이전 빌드의 벡터를 재사용하지 않고 전체를 다시 인코딩 (쌓인 톰스톤 정리)")
+    parser.add_argument("--dedup-threshold", type=float, default=DEDUP_THRESHOLD,
+                        help="근접 중복으로 묶을 코사인 유사도 하한 (0이면 중복 제거 안 함)")
+    parser.add_argument("--fallback-model", default=FALLBACK_MODEL_PATH, help="중심점 폴백용 경량 모델 경로")
+    parser.add_argument("--fallback-dir", default=FALLBACK_DIR, help="중심점 폴백 산출물 디렉토리")
+    parser.add_argument("--no-fallback", action="store_true", help="중심점 폴백 산출물을 만들지 않음")
+
+    # 인덱스 스펙
+    parser.add_argument("--index-type", choices=INDEX_KINDS, default="flat")
+    parser.add_argument("--storage", choices=STORAGE_TYPES, default="fp32", help="벡터 저장 정밀도")
+    parser.add_argument("--nlist", type=int, default=IndexSpec.nlist)
+    parser.add_argument("--pq-m", type=int, default=IndexSpec.pq_m)
+    parser.add_argument("--pq-nbits", type=int, default=IndexSpec.pq_nbits)
+    parser.add_argument("--hnsw-m", type=int, default=IndexSpec.hnsw_m)
+    parser.add_argument("--ef-construction", type=int, default=IndexSpec.ef_construction)
+    parser.add_argument("--nprobe", type=int, default=IndexSpec.nprobe)
+    parser.add_argument("--ef-search", type=int, default=IndexSpec.ef_search)
+    parser.add_argument("--rerank-k", type=int, default=0, help="fp32 벡터로 재정렬할 후보 수 (0이면 사용 안 함)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.tier:
+        tier = MODEL_TIERS[args.tier]
+        args.model = args.model or tier.model_path
+        args.text_column = args.text_column or tier.text_column
+    args.model = args.model or MODEL_PATH
+
+    if not os.path.exists(args.csv):
+        raise SystemExit(f"❌ 데이터셋 없음: {args.csv}")
+    if not os.path.exists(args.model):
+        raise SystemExit(f"❌ 로컬 모델 없음: {args.model} (python download_models.py 먼저 실행)")
+
+    spec = IndexSpec(
+        kind=args.index_type,
+        storage=args.storage,
+        nlist=args.nlist,
+        pq_m=args.pq_m,
+        pq_nbits=args.pq_nbits,
+        hnsw_m=args.hnsw_m,
+        ef_construction=args.ef_construction,
+        nprobe=args.nprobe,
+        ef_search=args.ef_search,
+        rerank_k=args.rerank_k,
+    )
+    out_dir = args.out_dir or artifact_dir_for(os.path.basename(os.path.normpath(args.model)))
+
+    print("🚀 명언 인덱스 빌드 시작")
+    print("=" * 50)
+    print(f"   데이터셋: {args.csv}")
+    print(f"   모델: {args.model}")
+    print(f"   인덱스: {spec.label()}")
+    print(f"   산출물: {out_dir}")
+
+    start_time = time.time()
+    builder = IndexBuilder(
+        csv_path=args.csv,
+        out_dir=out_dir,
+        model_path=args.model,
+        spec=spec,
+        text_column=args.text_column,
+        chunk_rows=args.chunk_rows,
+        batch_size=args.batch_size,
+        threads=args.threads,
+        dedup_threshold=args.dedup_threshold,
+    )
+    manifest = builder.build(resume=not args.no_resume, rebuild=args.rebuild)
+    report = manifest["report"]
+    incremental = manifest["incremental"]
+    dedup = manifest["dedup"]
+
+    print("\n" + "=" * 50)
+    print(f"🎉 빌드 완료! ({time.time() - start_time:.1f}초, 명언 {manifest['rows']}개, {manifest['dim']}차원)")
+    print(f"   재사용: {incremental['rows_reused']}행 / 새로 인코딩: {incremental['rows_new']}행 "
+          f"(이번 실행 {manifest['rows_encoded']}행)")
+    print(f"   톰스톤: 이번 빌드 {incremental['rows_tombstoned']}행, 누적 {incremental['tombstones']}행 "
+          f"(슬롯 {manifest['slots']}개)")
+    print(f"   단계별 시간: {manifest['timings']}")
+    if dedup["rows_collapsed"]:
+        print(f"🧹 근접 중복 제거 (코사인 ≥ {dedup['threshold']}): {dedup['rows_collapsed']}행을 "
+              f"{dedup['clusters']}개 대표 명언으로 통합 → 인덱스 {dedup['canonical_rows']}행")
+        print(f"   절약: 인덱스 약 {dedup['index_bytes_saved'] / 1024 / 1024:.1f}MB, "
+              f"인덱스 빌드 약 {dedup['index_seconds_saved']:.1f}초 (중복 탐색 {manifest['timings']['dedup_seconds']}초 소요)")
+    print("📊 인덱스 리포트")
+    print(f"   인덱스 메모리: {report['index_bytes'] / 1024 / 1024:.1f}MB "
+          f"(fp32 {report['fp32_bytes'] / 1024 / 1024:.1f}MB 대비 {report['compression']}배 압축)")
+    print(f"   recall@10: {report['recall']:.4f}")
+    if report["recall_reranked"] is not None:
+        print(f"   recall@10 (fp32 재정렬 {spec.rerank_k}개): {report['recall_reranked']:.4f}")
+
+    if not args.no_fallback:
+        build_fallback(out_dir, args.fallback_model, args.fallback_dir)
+
+
+def build_fallback(out_dir: str, model_path: str, fallback_dir: str):
+    """빌드된 메타데이터/태그 인덱스로 중심점 폴백 산출물을 만듭니다. (경량 모델이 없으면 건너뜀)"""
+    if not os.path.exists(model_path):
+        print(f"⚠️ 폴백 모델 없음: {model_path} - 중심점 폴백 생략 (python download_models.py 먼저 실행)")
+        return
+
+    paths = ArtifactPaths(out_dir)
+    start_time = time.time()
+    stats = build_centroid_fallback(QuoteMetadataStore(paths.metadata), QuoteFilterIndex(paths.filters),
+                                    out_dir=fallback_dir, model_path=model_path)
+    print(f"🧭 중심점 폴백: 카테고리 {stats['categories']}개, 대표 명언 {stats['quotes']}개 "
+          f"({stats['dim']}차원, {time.time() - start_time:.1f}초) → {fallback_dir}")
+
+
+if __name__ == "__main__":
+    main()
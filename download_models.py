@@ -2,13 +2,59 @@
 """
 임베딩 모델 사전 다운로드 스크립트
 한 번 실행하면 모델이 로컬에 저장되어 서버 시작 시간 단축
+다국어 모델은 int8 양자화 ONNX 버전도 함께 내보내고 PyTorch 임베딩과의 일치도를 검증합니다.
+
+사용 예시:
+    python download_models.py
+    python download_models.py --onnx-quantization avx512_vnni   # 서버 CPU에 맞는 양자화 설정
+    python download_models.py --skip-onnx
 """
 
+import argparse
 import os
 import time
 from sentence_transformers import SentenceTransformer
 
-def download_models():
+from utils.encoder_backend import ONNX_QUANTIZATION, PARITY_THRESHOLD, check_parity, export_onnx_int8, onnx_file_name
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="임베딩 모델 사전 다운로드 (+ int8 ONNX 내보내기)")
+    parser.add_argument("--skip-onnx", action="store_true", help="int8 ONNX 모델을 내보내지 않음")
+    parser.add_argument("--onnx-quantization", default=ONNX_QUANTIZATION,
+                        choices=["arm64", "avx2", "avx512", "avx512_vnni"], help="양자화 대상 CPU 명령어 집합")
+    parser.add_argument("--parity-threshold", type=float, default=PARITY_THRESHOLD,
+                        help="PyTorch 임베딩과의 최소 코사인 유사도")
+    return parser.parse_args()
+
+
+def export_onnx(local_path: str, quantization: str, threshold: float):
+    """int8 양자화 ONNX 모델을 내보내고 PyTorch 임베딩과의 일치도/지연 시간을 비교"""
+    onnx_path = os.path.join(local_path, onnx_file_name(quantization))
+    try:
+        if os.path.exists(onnx_path):
+            print(f"   ✅ int8 ONNX 모델 있음 - 내보내기 건너뛰기")
+        else:
+            start_time = time.time()
+            print(f"   📦 int8 ONNX 내보내기 중... ({quantization})")
+            export_onnx_int8(local_path, quantization)
+            print(f"   ✅ 내보내기 완료 ({time.time() - start_time:.1f}초, "
+                  f"{os.path.getsize(onnx_path) / 1024 / 1024:.0f}MB)")
+
+        parity = check_parity(local_path, quantization, threshold=threshold)
+    except ImportError as e:
+        print(f"   ⚠️ ONNX 내보내기 불가: {e} (pip install \"optimum[onnxruntime]\")")
+        return
+
+    latency = parity["latency_ms"]
+    status = "✅ 통과" if parity["passed"] else "❌ 실패 (검색 시 PyTorch 인코더 사용)"
+    print(f"   🔍 일치도 검증: 최소 코사인 {parity['min_cosine']:.4f} / 평균 {parity['mean_cosine']:.4f} "
+          f"(기준 {threshold}) {status}")
+    print(f"   ⏱️ 단일 쿼리 p50: PyTorch {latency['torch']['p50']}ms → ONNX int8 {latency['onnx']['p50']}ms")
+
+
+def download_models(skip_onnx: bool = False, onnx_quantization: str = ONNX_QUANTIZATION,
+                    parity_threshold: float = PARITY_THRESHOLD):
     """필요한 모델들을 로컬에 다운로드"""
     
     models_dir = "./models/sentence-transformers"
@@ -20,10 +66,16 @@ def download_models():
             "size": "22MB",
             "description": "경량 모델 (영어 특화, 빠른 속도)"
         },
+        {
+            "name": "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+            "size": "470MB",
+            "description": "경량 다국어 모델 (한국어 지원, 임베딩 중심점 폴백용)"
+        },
         {
             "name": "sentence-transformers/paraphrase-multilingual-mpnet-base-v2", 
             "size": "1GB",
-            "description": "다국어 모델 (한국어 지원, 높은 성능)"
+            "description": "다국어 모델 (한국어 지원, 높은 성능)",
+            "onnx": True
         }
     ]
     
@@ -41,27 +93,32 @@ def download_models():
         
         if os.path.exists(local_path):
             print(f"   ✅ 이미 다운로드됨 - 건너뛰기")
-            continue
-            
-        try:
-            start_time = time.time()
-            print(f"   📥 다운로드 중...")
-            
-            # 모델 다운로드 및 로컬 저장
-            model = SentenceTransformer(model_name)
-            model.save(local_path)
-            
-            download_time = time.time() - start_time
-            print(f"   ✅ 다운로드 완료 ({download_time:.1f}초)")
-            
-        except Exception as e:
-            print(f"   ❌ 다운로드 실패: {e}")
+        else:
+            try:
+                start_time = time.time()
+                print(f"   📥 다운로드 중...")
+
+                # 모델 다운로드 및 로컬 저장
+                model = SentenceTransformer(model_name)
+                model.save(local_path)
+
+                download_time = time.time() - start_time
+                print(f"   ✅ 다운로드 완료 ({download_time:.1f}초)")
+
+            except Exception as e:
+                print(f"   ❌ 다운로드 실패: {e}")
+                continue
+
+        if model_info.get("onnx") and not skip_onnx:
+            export_onnx(local_path, onnx_quantization, parity_threshold)
     
     print("\n" + "=" * 50)
     print("🎉 모델 다운로드 완료!")
     print("\n📋 사용법:")
     print("   1. 서버 시작: python app.py")
     print("   2. 로컬 모델이 자동으로 사용됩니다")
+    print("   3. int8 ONNX 인코더 사용: QUOTE_ENCODER_BACKEND=onnx")
     
 if __name__ == "__main__":
-    download_models() 
\ No newline at end of file
+    args = parse_args()
+    download_models(args.skip_onnx, args.onnx_quantization, args.parity_threshold)
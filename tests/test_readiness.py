@@ -0,0 +1,75 @@
+"""
+검색 엔진 없이 폴백 명언만 쓰는 배포의 준비 상태 테스트
+
+사용법 (프로젝트 루트에서):
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("UPSTAGE_API_KEY", "test")
+
+import app as server  # noqa: E402
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """워밍업 스레드 없이 만든 Flask 테스트 클라이언트 (전역 상태는 테스트마다 복원)"""
+    monkeypatch.setattr(server, "start_embedding_warmup", lambda: None)
+    monkeypatch.setattr(server, "WARMUP_ENABLED", True)
+    monkeypatch.setattr(server, "WARMUP_RETRY_SECONDS", 0)
+    monkeypatch.setattr(server, "EMBEDDING_AVAILABLE", False)
+    monkeypatch.setattr(server, "EMBEDDING_LOADING", False)
+    monkeypatch.setattr(server, "FALLBACK_MODE", False)
+    monkeypatch.setattr(server, "warmup_status", {**server.warmup_status, "attempts": 0, "tiers": {}})
+    return server.create_app().test_client()
+
+
+def _assert_fallback_ready(client):
+    ready = client.get("/api/health/ready")
+    assert ready.status_code == 200
+    assert ready.get_json()["fallback_mode"] is True
+
+    health = client.get("/api/health").get_json()
+    assert health["embedding_system"] == "⚠️ FALLBACK"
+    assert health["embedding_loading"] is False
+
+
+def test_not_ready_before_warmup(client):
+    assert client.get("/api/health/ready").status_code == 503
+
+
+def test_ready_without_embedding_libraries(client, monkeypatch):
+    monkeypatch.setattr(server, "EMBEDDING_LIBS_AVAILABLE", False)
+    server.warm_up_embedding_system()
+    _assert_fallback_ready(client)
+    assert server.warmup_status["attempts"] == 0
+
+
+@pytest.mark.skipif(not server.QUOTE_RETRIEVER_AVAILABLE, reason="명언 검색 시스템 import 불가")
+def test_ready_without_built_model_or_index(client, monkeypatch):
+    monkeypatch.setattr(server, "EMBEDDING_LIBS_AVAILABLE", True)
+    monkeypatch.setattr(server, "get_tier", lambda name: SimpleNamespace(is_built=lambda: False))
+    server.warm_up_embedding_system()
+    _assert_fallback_ready(client)
+
+
+@pytest.mark.skipif(not server.QUOTE_RETRIEVER_AVAILABLE, reason="명언 검색 시스템 import 불가")
+def test_bounded_retries_on_load_error(client, monkeypatch):
+    class BrokenRetriever:
+        def warm_up(self):
+            raise RuntimeError("인덱스 로드 실패")
+
+        def stats(self):
+            return {}
+
+    monkeypatch.setattr(server, "fallback_reason", lambda: None)
+    monkeypatch.setattr(server, "get_quote_retriever", lambda *args, **kwargs: BrokenRetriever())
+    server.warm_up_embedding_system()
+    _assert_fallback_ready(client)
+    assert server.warmup_status["attempts"] == server.WARMUP_MAX_ATTEMPTS
@@ -0,0 +1,62 @@
+"""
+일괄 검색의 분석별 모델 티어 라우팅 테스트
+
+사용법 (프로젝트 루트에서):
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.model_registry as model_registry  # noqa: E402
+import utils.quote_retriever as quote_retriever  # noqa: E402
+
+ENGLISH = [f"The user feels tired after work and wants some rest {i}." for i in range(9)]
+KOREAN = "사용자는 새로운 도전 앞에서 불안하지만 성장하고 싶어 합니다."
+
+
+class RecordingRetriever:
+    """티어별 배치 검색 호출을 기록하고 분석 텍스트와 티어를 결과로 돌려주는 검색 엔진"""
+
+    def __init__(self, tier):
+        self.tier = tier
+        self.batches = []
+
+    def search_batch(self, analyses, top_k=3, filters=None):
+        self.batches.append(list(analyses))
+        return [[{"quote": analysis, "tier": self.tier}] for analysis in analyses]
+
+
+def _patch(monkeypatch):
+    retrievers = {name: RecordingRetriever(name) for name in model_registry.MODEL_TIERS}
+    monkeypatch.setattr(quote_retriever, "EMBEDDING_AVAILABLE", True)
+    monkeypatch.setattr(model_registry, "built_tiers", lambda: frozenset(model_registry.ENABLED_TIERS))
+    monkeypatch.setattr(quote_retriever, "_observed_encode_ms", lambda: {})
+    monkeypatch.setattr(quote_retriever, "get_quote_retriever", lambda tier=None: retrievers[tier])
+    return retrievers
+
+
+def test_mixed_language_batch_routes_each_analysis(monkeypatch):
+    retrievers = _patch(monkeypatch)
+    analyses = ENGLISH[:4] + [KOREAN] + ENGLISH[4:]
+
+    results = quote_retriever.search_batch(analyses)
+
+    assert [result[0]["quote"] for result in results] == analyses
+    assert results[4][0]["tier"] == model_registry.route_tier(KOREAN, available=set(model_registry.ENABLED_TIERS))
+    assert results[4][0]["tier"] != "fast"
+    assert all(result[0]["tier"] == "fast" for i, result in enumerate(results) if i != 4)
+    assert len(retrievers["fast"].batches) == 1  # 티어별로 한 번씩만 배치 검색
+
+
+def test_forced_tier_searches_whole_batch(monkeypatch):
+    retrievers = _patch(monkeypatch)
+    analyses = ENGLISH[:2] + [KOREAN]
+
+    results = quote_retriever.search_batch(analyses, tier="quality")
+
+    assert retrievers["quality"].batches == [analyses]
+    assert retrievers["fast"].batches == []
+    assert [result[0]["tier"] for result in results] == ["quality"] * 3
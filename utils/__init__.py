@@ -4,6 +4,13 @@ Perfect Quote Chatbot Utils Package
 이 패키지는 챗봇 관련 클래스와 함수들을 제공합니다.
 """
 
-from .chatbot_utils import Chatbot
+__all__ = ['Chatbot']
 
-__all__ = ['Chatbot'] 
\ No newline at end of file
+
+def __getattr__(name):
+    # Chatbot은 langchain_upstage를 불러오므로 처음 접근할 때 import
+    # (utils 하위 모듈만 쓰는 서버/스크립트의 시작 시간에 영향을 주지 않도록)
+    if name == 'Chatbot':
+        from .chatbot_utils import Chatbot
+        return Chatbot
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}") 
\ No newline at end of file
@@ -0,0 +1,251 @@
+"""
+쿼리 임베딩 캐시 모듈
+대화 분석 텍스트의 임베딩을 메모리(LRU)와 디스크(SQLite) 두 단계로 캐싱합니다.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+# === 기본 설정 (환경 변수로 조정 가능) ===
+DEFAULT_MEMORY_ENTRIES = int(os.getenv("QUOTE_EMBED_CACHE_SIZE", "1024"))
+DEFAULT_DISK_ENTRIES = int(os.getenv("QUOTE_EMBED_CACHE_DISK_SIZE", "100000"))
+DEFAULT_DB_PATH = os.getenv("QUOTE_EMBED_CACHE_PATH", "./cache/query_embeddings.sqlite3")
+ACCESS_FLUSH_ROWS = 64  # 디스크 적중 시각(last_access)을 모아서 한 번에 갱신하는 항목 수
+ACCESS_FLUSH_SECONDS = 5.0  # 모인 항목이 적어도 이 시간이 지나면 갱신
+EVICTION_SLACK = 0.05  # 용량 초과 시 용량의 이 비율만큼 더 비워 두어 삭제를 드물게 실행
+RECOUNT_FRACTION = 0.1  # 이 프로세스의 삽입이 용량의 이 비율만큼 쌓일 때마다 실제 행 수를 다시 셈 (다른 워커의 삽입 반영)
+RECOUNT_MAX_INSERTS = 256  # 실제 행 수를 다시 세는 삽입 간격 상한
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    캐시 키 생성을 위해 텍스트를 정규화합니다.
+
+    유니코드 NFC 정규화 후 연속 공백을 하나로 합치고 앞뒤 공백을 제거합니다.
+    (대소문자는 임베딩 결과에 영향을 주므로 유지)
+    """
+    text = unicodedata.normalize("NFC", str(text))
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+class EmbeddingCache:
+    """
+    2단계 쿼리 임베딩 캐시
+
+    - 1단계: 프로세스 메모리의 LRU (최대 memory_entries개)
+    - 2단계: 재시작 후에도 유지되는 SQLite 파일 (최대 disk_entries개, 오래 안 쓴 항목부터 삭제)
+
+    디스크 단계의 행 수는 메모리에서 세고, 같은 파일을 쓰는 다른 워커의 삽입을 반영하도록 일정 삽입 수마다
+    (또는 용량을 넘을 때) 실제 COUNT로 보정한 뒤 초과분과 여유분을 삭제합니다.
+    디스크 적중 시각은 모아 두었다가 ACCESS_FLUSH_ROWS개 또는 ACCESS_FLUSH_SECONDS초마다 한 번에 갱신합니다.
+
+    키는 정규화된 텍스트와 모델 ID의 해시이므로 모델이 바뀌면 자동으로 분리됩니다.
+    """
+
+    def __init__(self, model_id: str, memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+                 db_path: str | None = DEFAULT_DB_PATH, disk_entries: int = DEFAULT_DISK_ENTRIES):
+        """
+        Args:
+            model_id: 임베딩 모델 식별자 (키에 포함)
+            memory_entries: 메모리 LRU 최대 항목 수 (0이면 메모리 단계 비활성화)
+            db_path: SQLite 파일 경로 (None 또는 빈 문자열이면 디스크 단계 비활성화)
+            disk_entries: 디스크 단계 최대 항목 수
+        """
+        self.model_id = model_id
+        self.memory_entries = memory_entries
+        self.db_path = db_path or None
+        self.disk_entries = disk_entries
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._disk_error = None
+        self._disk_rows = 0  # 디스크 단계 행 수 (삽입마다 증가, 주기적으로 실제 COUNT로 보정)
+        self._inserts_since_recount = 0
+        self._recount_every = max(1, min(RECOUNT_MAX_INSERTS, int(disk_entries * RECOUNT_FRACTION)))
+        self._pending_access = {}  # 키 → 아직 디스크에 반영하지 않은 적중 시각
+        self._last_access_flush = time.monotonic()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+    def make_key(self, text: str) -> str:
+        """정규화된 텍스트 + 모델 ID로 캐시 키를 만듭니다."""
+        payload = f"{self.model_id}\0{normalize_text(text)}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    # === 디스크 단계 ===
+    def _get_conn(self):
+        """SQLite 연결을 지연 생성합니다. 실패하면 디스크 단계를 비활성화합니다."""
+        if self._conn is not None or self.db_path is None or self._disk_error:
+            return self._conn
+
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY,"
+                " model_id TEXT NOT NULL,"
+                " dim INTEGER NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_access ON embeddings(last_access)")
+            conn.commit()
+            self._disk_rows = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            self._conn = conn
+        except sqlite3.Error as e:
+            self._disk_error = str(e)
+            print(f"⚠️ 임베딩 디스크 캐시 비활성화: {e}")
+        return self._conn
+
+    def _disk_get(self, key: str):
+        conn = self._get_conn()
+        if conn is None:
+            return None
+        row = conn.execute("SELECT dim, vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._pending_access[key] = time.time()
+        if (len(self._pending_access) >= ACCESS_FLUSH_ROWS
+                or time.monotonic() - self._last_access_flush >= ACCESS_FLUSH_SECONDS):
+            self._flush_access(conn)
+            conn.commit()
+        dim, blob = row
+        return np.frombuffer(blob, dtype=np.float32, count=dim).copy()
+
+    def _flush_access(self, conn) -> None:
+        """모아 둔 디스크 적중 시각을 한 번에 반영합니다. (커밋은 호출 측에서)"""
+        if self._pending_access:
+            conn.executemany("UPDATE embeddings SET last_access = ? WHERE key = ?",
+                             [(accessed, key) for key, accessed in self._pending_access.items()])
+            self._pending_access.clear()
+        self._last_access_flush = time.monotonic()
+
+    def _disk_put(self, key: str, vector: np.ndarray) -> None:
+        conn = self._get_conn()
+        if conn is None:
+            return
+        conn.execute(
+            "INSERT OR REPLACE INTO embeddings (key, model_id, dim, vector, last_access) VALUES (?, ?, ?, ?, ?)",
+            (key, self.model_id, int(vector.shape[0]), vector.tobytes(), time.time())
+        )
+        self._disk_rows += 1
+        self._inserts_since_recount += 1
+        if self._disk_rows > self.disk_entries or self._inserts_since_recount >= self._recount_every:
+            # 다른 프로세스/모델의 삽입과 교체된 키까지 반영된 실제 행 수로 보정한 뒤 초과 시 여유분까지 삭제
+            self._flush_access(conn)
+            self._disk_rows = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            self._inserts_since_recount = 0
+            overflow = self._disk_rows - self.disk_entries
+            if overflow > 0:
+                overflow += int(self.disk_entries * EVICTION_SLACK)
+                deleted = conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                ).rowcount
+                self._disk_rows -= deleted
+                self.disk_evictions += deleted
+        conn.commit()
+
+    # === 메모리 단계 ===
+    def _memory_put(self, key: str, vector: np.ndarray) -> None:
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.memory_evictions += 1
+
+    # === 공개 API ===
+    def get(self, text: str):
+        """
+        캐시된 임베딩을 조회합니다.
+
+        Args:
+            text: 대화 분석 텍스트
+
+        Returns:
+            np.ndarray | None: float32 임베딩 벡터 (없으면 None)
+        """
+        key = self.make_key(text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+
+            try:
+                vector = self._disk_get(key)
+            except sqlite3.Error as e:
+                print(f"⚠️ 임베딩 디스크 캐시 조회 실패: {e}")
+                vector = None
+
+            if vector is not None:
+                self.disk_hits += 1
+                self._memory_put(key, vector)
+                return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, text: str, vector: np.ndarray) -> None:
+        """
+        임베딩을 메모리와 디스크 단계에 저장합니다.
+
+        Args:
+            text: 대화 분석 텍스트
+            vector: 1차원 임베딩 벡터
+        """
+        key = self.make_key(text)
+        vector = np.ascontiguousarray(vector, dtype=np.float32).reshape(-1)
+        with self._lock:
+            self._memory_put(key, vector)
+            try:
+                self._disk_put(key, vector)
+            except sqlite3.Error as e:
+                print(f"⚠️ 임베딩 디스크 캐시 저장 실패: {e}")
+
+    def stats(self) -> dict:
+        """
+        캐시 크기 조정을 위한 카운터를 반환합니다.
+
+        Returns:
+            dict: 단계별 적중/미스/삭제 횟수와 현재 항목 수
+        """
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            disk_size = self._disk_rows if self._conn is not None else None  # 마지막 보정 이후의 추정치
+            return {
+                "model_id": self.model_id,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "memory_evictions": self.memory_evictions,
+                "disk_evictions": self.disk_evictions,
+                "memory_entries": len(self._memory),
+                "memory_capacity": self.memory_entries,
+                "disk_entries": disk_size,
+                "disk_capacity": self.disk_entries if self.db_path else 0,
+                "disk_error": self._disk_error,
+            }
@@ -0,0 +1,137 @@
+"""
+쿼리 인코딩 마이크로 배치 모듈
+여러 세션(스레드)이 동시에 보낸 인코딩 요청을 짧은 시간 동안 모아 한 번의 forward pass로 처리하고,
+요청마다 자기 행만 돌려줍니다. (배치 1짜리 encode 여러 개가 torch 스레드를 두고 경쟁하지 않도록)
+
+요청은 최대 max_wait_ms 동안 또는 모인 행 수가 max_batch에 이를 때까지 기다린 뒤 전용 스레드에서 인코딩됩니다.
+max_wait_ms가 0이면 배치 없이 호출한 스레드에서 바로 인코딩합니다.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+ENCODE_MAX_WAIT_MS = float(os.getenv("QUOTE_ENCODE_MAX_WAIT_MS", "5"))  # 요청을 모으는 최대 대기 시간
+ENCODE_MAX_BATCH = int(os.getenv("QUOTE_ENCODE_MAX_BATCH", "32"))  # 한 번에 인코딩하는 최대 행 수
+
+
+class EncodeBatcher:
+    """
+    동시 인코딩 요청을 모아 한 번에 처리하는 스케줄러 (스레드 안전)
+
+    큐는 요청 단위로 쌓이며, max_batch보다 큰 요청은 나누지 않고 단독 배치로 처리합니다.
+    """
+
+    def __init__(self, encode_fn, max_wait_ms: float = ENCODE_MAX_WAIT_MS, max_batch: int = ENCODE_MAX_BATCH):
+        """
+        Args:
+            encode_fn: 텍스트 목록을 받아 [len(texts), d] 배열을 반환하는 함수
+            max_wait_ms: 첫 요청 이후 다른 요청을 기다리는 최대 시간 (0이면 배치 없음)
+            max_batch: 한 번의 forward pass에 넣는 최대 행 수
+        """
+        self.encode_fn = encode_fn
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch = max(1, max_batch)
+
+        self._queue = deque()  # (texts, future)
+        self._queued_rows = 0
+        self._cond = threading.Condition()
+        self._worker = None
+
+        self._batches = 0
+        self._rows = 0
+        self._largest_batch = 0
+
+    def encode(self, texts: list) -> np.ndarray:
+        """
+        텍스트 목록을 인코딩합니다. 다른 스레드의 요청과 같은 배치로 묶일 수 있습니다.
+
+        Args:
+            texts (list[str]): 인코딩할 텍스트
+
+        Returns:
+            np.ndarray: [len(texts), d] 임베딩 (입력 순서)
+        """
+        if self.max_wait <= 0:
+            embeddings = np.asarray(self.encode_fn(texts))
+            self._count_batch(len(texts))
+            return embeddings
+
+        future = Future()
+        with self._cond:
+            self._ensure_worker()
+            self._queue.append((texts, future))
+            self._queued_rows += len(texts)
+            self._cond.notify()
+        return future.result()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="encode-batcher", daemon=True)
+            self._worker.start()
+
+    def _next_batch(self) -> list:
+        """첫 요청이 들어오면 대기 시간 또는 최대 행 수에 이를 때까지 요청을 모아 꺼냅니다."""
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            deadline = time.monotonic() + self.max_wait
+            while self._queued_rows < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = [self._queue.popleft()]
+            rows = len(batch[0][0])
+            while self._queue and rows + len(self._queue[0][0]) <= self.max_batch:
+                batch.append(self._queue.popleft())
+                rows += len(batch[-1][0])
+            self._queued_rows -= rows
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            try:
+                embeddings = np.asarray(self.encode_fn(texts))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self._count_batch(len(texts))
+            start = 0
+            for request_texts, future in batch:
+                future.set_result(embeddings[start:start + len(request_texts)])
+                start += len(request_texts)
+
+    def _count_batch(self, rows: int) -> None:
+        with self._cond:
+            self._batches += 1
+            self._rows += rows
+            self._largest_batch = max(self._largest_batch, rows)
+
+    def stats(self) -> dict:
+        """
+        큐 깊이와 배치 통계 (/api/health 노출용)
+
+        Returns:
+            dict: 대기 중인 요청/행 수, 처리한 배치/행 수, 평균/최대 배치 크기, 설정값
+        """
+        with self._cond:
+            return {
+                "queue_depth": len(self._queue),
+                "queued_rows": self._queued_rows,
+                "batches": self._batches,
+                "rows": self._rows,
+                "mean_batch_rows": round(self._rows / self._batches, 2) if self._batches else 0.0,
+                "max_batch_rows": self._largest_batch,
+                "max_wait_ms": self.max_wait * 1000,
+                "max_batch": self.max_batch,
+            }
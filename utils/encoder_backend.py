@@ -0,0 +1,189 @@
+"""
+쿼리 인코더 백엔드 모듈
+기본 PyTorch SentenceTransformer 대신 int8 동적 양자화된 ONNX Runtime 모델로 쿼리를 임베딩할 수 있게 합니다.
+
+ONNX 모델은 download_models.py가 로컬 모델 디렉토리 아래에 미리 내보내 둡니다:
+    <모델 경로>/onnx/model.onnx                  - fp32 ONNX 그래프
+    <모델 경로>/onnx/model_qint8_<설정>.onnx     - int8 동적 양자화 모델 (검색에 사용)
+    <모델 경로>/onnx/parity.json                 - PyTorch 임베딩 대비 코사인 유사도/지연 시간 검증 결과
+
+검증을 통과한 양자화 모델만 사용하며, 없거나 통과하지 못했으면 PyTorch 백엔드로 되돌아갑니다.
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+ENCODER_BACKENDS = ("torch", "onnx")
+ENCODER_BACKEND = os.getenv("QUOTE_ENCODER_BACKEND", "torch")  # torch 또는 onnx
+ONNX_QUANTIZATION = os.getenv("QUOTE_ONNX_QUANTIZATION", "avx2")  # arm64, avx2, avx512, avx512_vnni
+PARITY_THRESHOLD = 0.98  # PyTorch 임베딩과의 최소 코사인 유사도
+PARITY_FILENAME = os.path.join("onnx", "parity.json")
+
+# 검증용 문장 (실제 대화 분석 결과와 비슷한 한국어/영어 혼합)
+PARITY_SAMPLES = [
+    "사용자는 새로운 도전에 대한 불안감을 느끼고 있지만, 동시에 성장하고 싶은 강한 의지를 보이고 있습니다.",
+    "사용자는 최근 인간관계에서 상처를 받아 외로움과 슬픔을 느끼고 있으며 위로가 필요해 보입니다.",
+    "사용자는 취업 준비로 지쳐 있지만 목표를 포기하지 않으려는 끈기를 보여주고 있습니다.",
+    "사용자는 일상의 작은 행복에 감사하며 현재의 삶에 만족하고 있습니다.",
+    "사용자는 가족과의 갈등으로 마음이 무겁고, 어떻게 대화를 시작해야 할지 고민하고 있습니다.",
+    "사용자는 시험에서 좋은 결과를 얻어 자신감을 되찾았고 다음 목표를 세우고 있습니다.",
+    "The user feels stuck in their career and is looking for motivation to make a change.",
+    "The user is grieving the loss of a close friend and struggles to find meaning in daily life.",
+    "Success is not final, failure is not fatal: it is the courage to continue that counts.",
+    "행복은 멀리 있는 것이 아니라 지금 이 순간에 있다.",
+]
+
+
+def onnx_file_name(quantization: str = ONNX_QUANTIZATION) -> str:
+    """모델 디렉토리 기준 양자화 ONNX 파일 상대 경로"""
+    return os.path.join("onnx", f"model_qint8_{quantization}.onnx")
+
+
+def encoder_id(model_id: str, backend: str, quantization: str = ONNX_QUANTIZATION) -> str:
+    """
+    임베딩 캐시 키에 쓰는 인코더 식별자
+
+    양자화 모델의 임베딩은 PyTorch 임베딩과 미세하게 다르므로 캐시를 공유하지 않도록 구분합니다.
+    """
+    return model_id if backend == "torch" else f"{model_id}@onnx-qint8-{quantization}"
+
+
+def read_parity(model_path: str) -> dict | None:
+    """download_models.py가 남긴 검증 결과 (없으면 None)"""
+    path = os.path.join(model_path, PARITY_FILENAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def resolve_backend(model_path: str, backend: str = ENCODER_BACKEND,
+                    quantization: str = ONNX_QUANTIZATION) -> tuple:
+    """
+    설정된 백엔드를 실제로 사용할 수 있는지 확인합니다. (파일 확인만 하므로 모델 로드 전에 호출 가능)
+
+    Args:
+        model_path: 로컬 SentenceTransformer 모델 경로
+        backend: 요청한 백엔드 (torch 또는 onnx)
+        quantization: 양자화 설정 이름
+
+    Returns:
+        tuple[str, str | None]: (사용할 백엔드, onnx를 쓸 수 없는 사유)
+
+    Raises:
+        ValueError: 알 수 없는 백엔드인 경우
+    """
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"알 수 없는 인코더 백엔드: {backend} (사용 가능: {', '.join(ENCODER_BACKENDS)})")
+    if backend == "torch":
+        return "torch", None
+
+    if not os.path.exists(os.path.join(model_path, onnx_file_name(quantization))):
+        return "torch", f"양자화 ONNX 모델 없음: {onnx_file_name(quantization)} (python download_models.py 먼저 실행)"
+    parity = read_parity(model_path)
+    if not parity or parity.get("file") != onnx_file_name(quantization) or not parity.get("passed"):
+        return "torch", "양자화 ONNX 모델이 PyTorch 임베딩 검증을 통과하지 못함"
+    return "onnx", None
+
+
+def load_encoder(model_path: str, backend: str = "torch", quantization: str = ONNX_QUANTIZATION):
+    """
+    백엔드에 맞는 SentenceTransformer를 CPU에 로드합니다. (encode API는 두 백엔드가 동일)
+
+    Args:
+        model_path: 로컬 SentenceTransformer 모델 경로
+        backend: torch 또는 onnx
+        quantization: onnx 백엔드의 양자화 설정 이름
+
+    Returns:
+        SentenceTransformer: 로드된 모델
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(model_path, device="cpu")
+    return SentenceTransformer(model_path, device="cpu", backend="onnx",
+                               model_kwargs={"file_name": onnx_file_name(quantization),
+                                             "provider": "CPUExecutionProvider"})
+
+
+def export_onnx_int8(model_path: str, quantization: str = ONNX_QUANTIZATION) -> str:
+    """
+    로컬 모델을 ONNX로 내보내고 int8 동적 양자화 모델을 같은 디렉토리에 저장합니다.
+
+    Args:
+        model_path: 로컬 SentenceTransformer 모델 경로
+        quantization: 양자화 설정 이름 (대상 CPU 명령어 집합)
+
+    Returns:
+        str: 양자화 ONNX 파일 경로
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    # 로컬 디렉토리에 ONNX 파일이 없으면 로드 시 fp32 그래프로 변환되며, 저장하면 onnx/model.onnx로 남음
+    model = SentenceTransformer(model_path, device="cpu", backend="onnx")
+    model.save(model_path)
+    export_dynamic_quantized_onnx_model(model, quantization, model_path)
+    return os.path.join(model_path, onnx_file_name(quantization))
+
+
+def _encode_ms(model, text: str, repeats: int) -> list:
+    """단일 쿼리 인코딩 지연 시간(ms) 목록 (첫 호출은 워밍업으로 제외)"""
+    model.encode([text], convert_to_tensor=False)
+    latencies = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        model.encode([PARITY_SAMPLES[i % len(PARITY_SAMPLES)]], convert_to_tensor=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _percentile(values: list, q: float) -> float:
+    return round(float(np.percentile(values, q)), 2)
+
+
+def check_parity(model_path: str, quantization: str = ONNX_QUANTIZATION, texts: list | None = None,
+                 threshold: float = PARITY_THRESHOLD, repeats: int = 20, save: bool = True) -> dict:
+    """
+    양자화 ONNX 임베딩이 PyTorch 임베딩과 충분히 가까운지 검증하고 단일 쿼리 지연 시간을 비교합니다.
+
+    Args:
+        model_path: 로컬 SentenceTransformer 모델 경로
+        quantization: 양자화 설정 이름
+        texts: 검증 문장 (기본값: PARITY_SAMPLES)
+        threshold: 통과 기준 최소 코사인 유사도
+        repeats: 지연 시간 측정 반복 횟수
+        save: 결과를 <모델 경로>/onnx/parity.json에 저장할지 여부
+
+    Returns:
+        dict: 코사인 유사도(min/mean), 통과 여부, 백엔드별 p50/p99 지연 시간(ms)
+    """
+    texts = texts or PARITY_SAMPLES
+    torch_model = load_encoder(model_path, "torch")
+    onnx_model = load_encoder(model_path, "onnx", quantization)
+
+    reference = torch_model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+    quantized = onnx_model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+    cosine = np.sum(reference * quantized, axis=1)
+
+    torch_ms = _encode_ms(torch_model, texts[0], repeats)
+    onnx_ms = _encode_ms(onnx_model, texts[0], repeats)
+    result = {
+        "file": onnx_file_name(quantization),
+        "threshold": threshold,
+        "samples": len(texts),
+        "min_cosine": round(float(cosine.min()), 5),
+        "mean_cosine": round(float(cosine.mean()), 5),
+        "passed": bool(cosine.min() >= threshold),
+        "latency_ms": {
+            "torch": {"p50": _percentile(torch_ms, 50), "p99": _percentile(torch_ms, 99)},
+            "onnx": {"p50": _percentile(onnx_ms, 50), "p99": _percentile(onnx_ms, 99)},
+        },
+    }
+    if save:
+        with open(os.path.join(model_path, PARITY_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    return result
@@ -0,0 +1,180 @@
+"""
+인덱스 산출물 레이아웃 모듈
+build_index가 만들고 QuoteRetriever가 읽는 파일들의 위치와 공용 입출력 도구를 정의합니다.
+
+모델별 산출물 디렉토리 (기본값: vectorDB/FAISS/<모델 ID>/):
+    quotes_cosine_faiss.index      - FAISS 인덱스
+    quotes_cosine_faiss.spec.json  - 인덱스 스펙 (index_spec.IndexSpec)
+    quotes_cosine_faiss.f32.npy    - 정규화된 fp32 벡터 (슬롯 순서, 재정렬에 사용)
+    quotes_cosine_faiss.f32.npy.tmp - 빌드 중인 벡터 (이어 쓰기, 인덱스 교체 직후 위 파일로 교체)
+    slot_hashes.npy                - 슬롯별 내용 해시 uint8 [슬롯 수, 16] (quote + insight + 모델 ID, 증분 빌드용)
+    tombstones.npy                 - 슬롯별 삭제 표시 (삭제/수정된 행은 슬롯을 유지한 채 인덱스에서 제외)
+    aliases.npy                    - 슬롯별 대표 슬롯 int32 (근접 중복은 대표 슬롯만 인덱스에 포함, 톰스톤은 -1)
+    quotes_meta/                   - 열 단위 메타데이터 저장소 (슬롯 순서, quote_metadata)
+    quotes_filters/                - 태그/저자 필터 인덱스 (quote_filters)
+    quotes_bm25/                   - BM25 역색인 (quote_lexical)
+    manifest.json                  - 빌드 정보 (모델, 데이터셋 지문, 행 수, 리포트)
+    checkpoint.json                - 빌드 진행 상황 (빌드 완료 시 삭제)
+    *.next                         - 빌드 중인 슬롯 단위 산출물 (모두 만든 뒤 교체하며 인덱스는 마지막에 교체)
+
+슬롯 ID는 벡터 파일의 행 번호이며 FAISS 인덱스의 ID, 메타데이터 행 번호와 같습니다.
+슬롯은 빌드 간에 유지되므로 바뀌지 않은 명언은 다시 인코딩하지 않습니다.
+"""
+
+import json
+import os
+import shutil
+import struct
+
+import numpy as np
+
+from .index_spec import spec_path_for, vectors_path_for
+
+INDEX_ROOT = "vectorDB/FAISS"
+INDEX_FILENAME = "quotes_cosine_faiss.index"
+METADATA_DIRNAME = "quotes_meta"
+FILTERS_DIRNAME = "quotes_filters"
+LEXICAL_DIRNAME = "quotes_bm25"
+HASHES_FILENAME = "slot_hashes.npy"
+TOMBSTONES_FILENAME = "tombstones.npy"
+ALIASES_FILENAME = "aliases.npy"
+MANIFEST_FILENAME = "manifest.json"
+CHECKPOINT_FILENAME = "checkpoint.json"
+
+STAGING_SUFFIX = ".next"
+
+# .npy 헤더를 고정 크기로 예약해 두면 행을 이어 쓰면서 헤더(shape)만 제자리에서 갱신할 수 있음
+NPY_HEADER_BYTES = 128
+
+
+def artifact_dir_for(model_id: str, root: str = INDEX_ROOT) -> str:
+    """모델 ID별 산출물 디렉토리 경로"""
+    return os.path.join(root, model_id)
+
+
+class ArtifactPaths:
+    """산출물 디렉토리 안의 파일 경로 모음"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.index = os.path.join(root, INDEX_FILENAME)
+        self.spec = spec_path_for(self.index)
+        self.vectors = vectors_path_for(self.index)
+        self.vectors_staging = self.vectors + ".tmp"
+        self.metadata = os.path.join(root, METADATA_DIRNAME)
+        self.filters = os.path.join(root, FILTERS_DIRNAME)
+        self.lexical = os.path.join(root, LEXICAL_DIRNAME)
+        self.hashes = os.path.join(root, HASHES_FILENAME)
+        self.tombstones = os.path.join(root, TOMBSTONES_FILENAME)
+        self.aliases = os.path.join(root, ALIASES_FILENAME)
+        self.manifest = os.path.join(root, MANIFEST_FILENAME)
+        self.checkpoint = os.path.join(root, CHECKPOINT_FILENAME)
+
+    @staticmethod
+    def staged(path: str) -> str:
+        """빌드 중에 쓰는 스테이징 경로 (publish()로 실제 경로와 교체)"""
+        return path.rstrip("/\\") + STAGING_SUFFIX
+
+
+def publish(staged_path: str, path: str) -> None:
+    """
+    스테이징한 파일 또는 디렉토리를 실제 경로로 교체합니다.
+
+    파일은 os.replace 한 번으로 교체하고, 디렉토리는 기존 디렉토리를 옆으로 옮긴 직후 교체해
+    경로가 비는 구간을 최소화합니다. (실행 중인 워커가 연 파일은 삭제되어도 계속 읽을 수 있음)
+    """
+    if not os.path.isdir(staged_path):
+        os.replace(staged_path, path)
+        return
+    old_path = path.rstrip("/\\") + ".old"
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(staged_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def read_json(path: str):
+    """JSON 파일을 읽습니다. 파일이 없으면 None을 반환합니다."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json_atomic(path: str, data) -> None:
+    """임시 파일에 쓴 뒤 교체해, 중단되더라도 반쯤 쓰인 JSON이 남지 않도록 합니다."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def save_npy(path: str, array: np.ndarray) -> None:
+    """확장자와 무관하게 주어진 경로 그대로 .npy 형식으로 저장합니다. (np.save는 .npy를 덧붙임)"""
+    with open(path, "wb") as f:
+        np.save(f, array)
+
+
+def _npy_header(rows: int, dim: int) -> bytes:
+    """고정 크기(NPY_HEADER_BYTES)의 float32 [rows, dim] .npy v1.0 헤더"""
+    header = "{'descr': '<f4', 'fortran_order': False, 'shape': (%d, %d), }" % (rows, dim)
+    header = header.ljust(NPY_HEADER_BYTES - 10 - 1) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+class AppendableVectorFile:
+    """
+    이어 쓰기 가능한 fp32 벡터 파일 (.npy 형식)
+
+    행을 파일 끝에 추가하고 flush() 시점에 헤더의 행 수를 갱신합니다.
+    flush 이후에는 언제든 np.load(mmap_mode="r")로 읽을 수 있는 올바른 .npy 파일입니다.
+    파일을 제자리에서 잘라내므로 실행 중인 워커가 메모리 매핑한 파일이 아니라 스테이징 파일에 씁니다.
+    """
+
+    def __init__(self, path: str, dim: int, rows: int = 0, copy_from: str = None):
+        """
+        Args:
+            path: 벡터 파일 경로
+            dim: 벡터 차원
+            rows: 이어서 쓸 때 유지할 행 수 (체크포인트 이후 쓰인 행은 잘라냄, 0이면 새로 생성)
+            copy_from: 앞 rows행을 복사해 올 벡터 파일 (이전 빌드의 벡터 파일, 원본은 수정하지 않음)
+        """
+        self.path = path
+        self.dim = dim
+        self.rows = rows
+
+        if copy_from and rows > 0 and os.path.exists(copy_from):
+            shutil.copyfile(copy_from, path)
+        mode = "r+b" if rows > 0 and os.path.exists(path) else "w+b"
+        if mode == "w+b":
+            self.rows = 0
+        self._file = open(path, mode)
+        self._file.truncate(NPY_HEADER_BYTES + self.rows * dim * 4)
+        self._write_header()
+        self._file.seek(0, os.SEEK_END)
+
+    def _write_header(self) -> None:
+        self._file.seek(0)
+        self._file.write(_npy_header(self.rows, self.dim))
+
+    def append(self, vectors: np.ndarray) -> None:
+        """[n, dim] 벡터를 파일 끝에 추가합니다."""
+        vectors = np.ascontiguousarray(vectors, dtype="<f4")
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(f"벡터 차원 불일치: {vectors.shape} (기대값: [n, {self.dim}])")
+        self._file.write(vectors.tobytes())
+        self.rows += len(vectors)
+
+    def flush(self) -> None:
+        """헤더의 행 수를 갱신하고 디스크에 반영합니다."""
+        self._write_header()
+        self._file.seek(0, os.SEEK_END)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
@@ -0,0 +1,434 @@
+"""
+명언 인덱스 빌더 모듈
+명언 CSV를 청크 단위로 읽어 CPU에서 배치 임베딩하고, 벡터를 디스크 파일에 이어 쓰며
+진행 상황을 체크포인트로 남깁니다. 빌드가 중단되면 마지막 체크포인트부터 이어서 진행하고,
+마지막에 FAISS 인덱스 + 메타데이터 저장소 + 매니페스트를 한 번에 기록합니다.
+
+데이터셋이 바뀌면 행마다 내용 해시(quote + insight + 모델 ID)를 이전 빌드와 비교해
+바뀌지 않은 행은 저장된 벡터를 재사용하고, 새로 추가되거나 수정된 행만 인코딩합니다.
+삭제(또는 수정 전) 행의 슬롯은 톰스톤으로 남아 인덱스에서 제외됩니다.
+저자 표기만 다른 근접 중복 명언은 대표 슬롯 하나만 인덱스에 넣고 나머지는 별칭으로 기록합니다.
+"""
+
+import hashlib
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from .index_artifacts import AppendableVectorFile, ArtifactPaths, publish, read_json, save_npy, write_json_atomic
+from .index_spec import IndexSpec, build_faiss_index, evaluate_index, save_index_spec
+from .model_registry import invalidate_built_tiers
+from .quote_dedup import DEDUP_THRESHOLD, dedup_summary, find_near_duplicates
+from .quote_filters import build_filter_index
+from .quote_lexical import build_lexical_index
+from .quote_metadata import QuoteMetadataStore, to_text, write_quote_metadata
+
+MANIFEST_VERSION = 2
+HASH_BYTES = 16
+
+
+def dataset_fingerprint(csv_path: str) -> dict:
+    """체크포인트 재사용 여부 판단용 데이터셋 지문 (경로, 크기, 수정 시각)"""
+    stat = os.stat(csv_path)
+    return {"path": os.path.abspath(csv_path), "size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+def content_hash(model_id: str, quote, insight) -> bytes:
+    """증분 빌드용 행 내용 해시 (quote + insight + 모델 ID, 16바이트 blake2b)"""
+    digest = hashlib.blake2b(digest_size=HASH_BYTES)
+    for part in (model_id, to_text(quote), to_text(insight)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.digest()
+
+
+class IndexBuilder:
+    """
+    재시작 가능한 스트리밍 인덱스 빌더
+
+    - 벡터 전체를 메모리에 올리지 않고 청크 단위로 인코딩 → 벡터 파일에 이어 쓰기
+    - 청크마다 체크포인트를 기록하므로 중단된 빌드는 이어서 진행
+    - 내용 해시가 같은 행은 이전 빌드의 벡터를 재사용 (새로 추가/수정된 행만 인코딩)
+    - GPU 없이 CPU만으로 동작
+    """
+
+    def __init__(self, csv_path: str, out_dir: str, model_path: str, spec: IndexSpec,
+                 text_column: str | None = None, chunk_rows: int = 2048, batch_size: int = 64,
+                 threads: int | None = None, dedup_threshold: float = DEDUP_THRESHOLD):
+        """
+        Args:
+            csv_path: 명언 CSV 경로 (quote, author, category, insight 컬럼)
+            out_dir: 산출물 디렉토리
+            model_path: 로컬 SentenceTransformer 모델 경로
+            spec: 인덱스 스펙
+            text_column: 임베딩할 컬럼 (기본값: insight가 있으면 insight, 없으면 quote)
+            chunk_rows: CSV를 읽고 체크포인트를 남기는 단위 행 수
+            batch_size: 인코딩 배치 크기
+            threads: torch CPU 스레드 수 (None이면 기본값)
+            dedup_threshold: 근접 중복으로 묶을 코사인 유사도 하한 (0이면 중복 제거 안 함)
+        """
+        self.csv_path = csv_path
+        self.paths = ArtifactPaths(out_dir)
+        self.model_path = model_path
+        self.model_id = os.path.basename(os.path.normpath(model_path))
+        self.spec = spec
+        self.text_column = text_column
+        self.chunk_rows = chunk_rows
+        self.batch_size = batch_size
+        self.threads = threads
+        self.dedup_threshold = dedup_threshold
+
+        self._model = None
+        self.timings = {}
+
+    # === 인코더 ===
+    def _get_model(self):
+        if self._model is None:
+            import torch
+            from sentence_transformers import SentenceTransformer
+
+            if self.threads:
+                torch.set_num_threads(self.threads)
+            self._model = SentenceTransformer(self.model_path, device="cpu")
+        return self._model
+
+    def _encode(self, texts: list) -> np.ndarray:
+        vectors = self._get_model().encode(texts, batch_size=self.batch_size, convert_to_numpy=True,
+                                           normalize_embeddings=True, show_progress_bar=False, device="cpu")
+        return np.asarray(vectors, dtype=np.float32)
+
+    # === 이전 빌드 (증분 재사용) ===
+    def _load_previous(self, text_column: str | None, rebuild: bool):
+        """
+        벡터를 재사용할 수 있는 이전 빌드의 슬롯 상태를 읽습니다.
+
+        Returns:
+            dict | None: {'rows', 'dim', 'text_column', 'hashes', 'tombstones'} (재사용 불가면 None)
+        """
+        manifest = read_json(self.paths.manifest)
+        if rebuild or manifest is None:
+            return None
+        if not all(os.path.exists(p) for p in (self.paths.vectors, self.paths.hashes, self.paths.tombstones)):
+            return None
+        if manifest.get("model_id") != self.model_id or (text_column and manifest.get("text_column") != text_column):
+            print("⚠️ 모델 또는 임베딩 컬럼이 바뀌어 이전 벡터를 재사용하지 않고 전체를 인코딩합니다.")
+            return None
+
+        hashes = np.load(self.paths.hashes)
+        tombstones = np.load(self.paths.tombstones)
+        if len(hashes) != len(tombstones) or len(hashes) != manifest.get("slots"):
+            print("⚠️ 이전 빌드의 슬롯 파일이 맞지 않아 전체를 인코딩합니다.")
+            return None
+        return {
+            "rows": len(hashes),
+            "dim": manifest["dim"],
+            "text_column": manifest["text_column"],
+            "hashes": hashes,
+            "tombstones": tombstones,
+        }
+
+    # === 체크포인트 ===
+    def _load_checkpoint(self, fingerprint: dict, base_rows: int, resume: bool):
+        """이어서 진행할 수 있는 체크포인트면 반환하고, 아니면 None을 반환합니다."""
+        checkpoint = read_json(self.paths.checkpoint)
+        if checkpoint is None or not resume:
+            return None
+        if (checkpoint.get("dataset") != fingerprint or checkpoint.get("model_id") != self.model_id
+                or checkpoint.get("base_rows") != base_rows
+                or (self.text_column and checkpoint.get("text_column") != self.text_column)):
+            print("⚠️ 데이터셋 또는 모델이 바뀌어 이전 체크포인트를 버리고 처음부터 빌드합니다.")
+            return None
+        if checkpoint.get("vector_rows") and not os.path.exists(self.paths.vectors_staging):
+            print("⚠️ 빌드 중이던 벡터 파일이 없어 이전 체크포인트를 버리고 처음부터 빌드합니다.")
+            return None
+        return checkpoint
+
+    def _save_checkpoint(self, fingerprint: dict, text_column: str, dim: int, base_rows: int,
+                         rows_done: int, vector_rows: int) -> None:
+        write_json_atomic(self.paths.checkpoint, {
+            "dataset": fingerprint,
+            "model_id": self.model_id,
+            "text_column": text_column,
+            "dim": dim,
+            "base_rows": base_rows,
+            "rows_done": rows_done,
+            "vector_rows": vector_rows,
+            "updated_at": datetime.now().isoformat(),
+        })
+
+    # === 빌드 단계 ===
+    def _read_chunks(self):
+        import pandas as pd
+
+        return pd.read_csv(self.csv_path, chunksize=self.chunk_rows)
+
+    def encode_corpus(self, resume: bool = True, rebuild: bool = False) -> dict:
+        """
+        CSV를 스트리밍으로 읽어 각 행에 슬롯을 배정하고, 새 슬롯의 벡터만 인코딩해 벡터 파일에 이어 씁니다.
+
+        내용 해시가 이전 빌드의 살아 있는 슬롯과 같은 행은 그 슬롯(벡터)을 그대로 재사용하고,
+        새로 추가되거나 수정된 행만 파일 끝의 새 슬롯으로 인코딩합니다.
+        벡터는 실행 중인 워커가 메모리 매핑한 벡터 파일이 아니라 스테이징 파일(paths.vectors_staging)에 쓰며,
+        build()가 인덱스를 교체한 직후 벡터 파일로 교체합니다.
+        이번 CSV에서 어떤 행도 차지하지 않은 이전 슬롯은 톰스톤으로 표시됩니다.
+
+        Args:
+            resume: 체크포인트가 있으면 이어서 진행할지 여부
+            rebuild: 이전 벡터를 재사용하지 않고 전체를 새로 인코딩할지 여부 (톰스톤 정리)
+
+        Returns:
+            dict: text_column, dim, rows(CSV 행 수), slots(전체 슬롯 수), records(슬롯별 메타데이터),
+                  hashes, tombstones, rows_reused, rows_new, rows_encoded(이번 실행), rows_tombstoned(이번 빌드)
+        """
+        fingerprint = dataset_fingerprint(self.csv_path)
+        previous = self._load_previous(self.text_column, rebuild)
+        base_rows = previous["rows"] if previous else 0
+
+        checkpoint = self._load_checkpoint(fingerprint, base_rows, resume)
+        rows_done = checkpoint["rows_done"] if checkpoint else 0
+        text_column = (checkpoint or previous or {}).get("text_column") or self.text_column
+        dim = (checkpoint or previous or {}).get("dim")
+        if rows_done:
+            print(f"🔄 체크포인트에서 이어서 진행: {rows_done}행 완료")
+
+        # 내용 해시 → 재사용 가능한 이전 슬롯 (같은 내용의 행이 여럿이면 앞 슬롯부터 배정)
+        reusable = {}
+        if previous:
+            live = np.flatnonzero(~previous["tombstones"])
+            for slot in live[::-1]:
+                reusable.setdefault(previous["hashes"][slot].tobytes(), []).append(int(slot))
+
+        vector_file = None
+        if dim:
+            # 이전 슬롯 + 체크포인트까지 쓴 슬롯만 남기고 그 뒤는 잘라냄
+            # (체크포인트가 없으면 이전 빌드의 벡터를 스테이징 파일로 복사해 이어 씀)
+            if checkpoint:
+                vector_file = AppendableVectorFile(self.paths.vectors_staging, dim, checkpoint["vector_rows"])
+            else:
+                vector_file = AppendableVectorFile(self.paths.vectors_staging, dim, base_rows,
+                                                   copy_from=self.paths.vectors)
+
+        row_slots = []
+        row_records = []
+        new_hashes = []
+        rows_encoded = 0
+        rows_seen = 0
+        start_time = time.perf_counter()
+        try:
+            for chunk in self._read_chunks():
+                if text_column is None:
+                    text_column = "insight" if "insight" in chunk.columns else "quote"
+                    print(f"📝 임베딩 컬럼: {text_column}")
+
+                records = chunk.to_dict("records")
+                texts = chunk[text_column].fillna("").astype(str).tolist()
+                pending = []
+                for i, record in enumerate(records):
+                    row_hash = content_hash(self.model_id, record.get("quote"), record.get("insight"))
+                    slots = reusable.get(row_hash)
+                    if slots:
+                        row_slots.append(slots.pop())
+                    else:
+                        row_slots.append(base_rows + len(new_hashes))
+                        new_hashes.append(row_hash)
+                        if rows_seen + i >= rows_done:
+                            pending.append(texts[i])  # 중단 전 실행에서 이미 인코딩한 행은 건너뜀
+                    row_records.append(record)
+                rows_seen += len(records)
+
+                if rows_seen <= rows_done:
+                    continue  # 이미 처리한 청크 (슬롯 배정만 다시 계산)
+
+                if pending:
+                    vectors = self._encode(pending)
+                    if vector_file is None:
+                        dim = vectors.shape[1]
+                        vector_file = AppendableVectorFile(self.paths.vectors_staging, dim, 0)
+                    vector_file.append(vectors)
+                    vector_file.flush()
+                    rows_encoded += len(pending)
+                if vector_file is not None and vector_file.rows != base_rows + len(new_hashes):
+                    raise RuntimeError(f"벡터 파일 행 수 불일치: {vector_file.rows} != {base_rows + len(new_hashes)}")
+
+                rows_done = rows_seen
+                if dim:
+                    self._save_checkpoint(fingerprint, text_column, dim, base_rows, rows_done, vector_file.rows)
+
+                elapsed = time.perf_counter() - start_time
+                print(f"   ... {rows_done}행 처리 (인코딩 {rows_encoded}행, {rows_encoded / max(elapsed, 1e-9):.0f}행/초)")
+        finally:
+            if vector_file is not None:
+                vector_file.close()
+
+        num_slots = base_rows + len(new_hashes)
+        hashes = np.empty((num_slots, HASH_BYTES), dtype=np.uint8)
+        tombstones = np.ones(num_slots, dtype=bool)
+        if previous:
+            hashes[:base_rows] = previous["hashes"]
+        hashes[base_rows:] = np.frombuffer(b"".join(new_hashes), dtype=np.uint8).reshape(-1, HASH_BYTES)
+        tombstones[row_slots] = False
+
+        # 슬롯 순서 메타데이터 (톰스톤 슬롯은 이전 메타데이터를 유지, 검색 결과에는 나오지 않음)
+        records = [None] * num_slots
+        for slot, record in zip(row_slots, row_records):
+            records[slot] = record
+        dead_slots = np.flatnonzero(tombstones)
+        if len(dead_slots):
+            old_store = None
+            if os.path.exists(os.path.join(self.paths.metadata, "meta.json")):
+                old_store = QuoteMetadataStore(self.paths.metadata)
+            for slot in dead_slots:
+                records[slot] = old_store.row(int(slot)) if old_store and slot < len(old_store) else {}
+            if old_store is not None:
+                old_store.close()
+
+        rows_tombstoned = 0
+        if previous:
+            rows_tombstoned = int(np.count_nonzero(tombstones[:base_rows] & ~previous["tombstones"]))
+
+        self.timings["encode_seconds"] = round(time.perf_counter() - start_time, 2)
+        return {
+            "text_column": text_column,
+            "dim": dim,
+            "rows": len(row_slots),
+            "slots": num_slots,
+            "records": records,
+            "hashes": hashes,
+            "tombstones": tombstones,
+            "rows_reused": len(row_slots) - len(new_hashes),
+            "rows_new": len(new_hashes),
+            "rows_encoded": rows_encoded,
+            "rows_tombstoned": rows_tombstoned,
+        }
+
+    def _dedup_report(self, canonical: np.ndarray, index, index_seconds: float) -> dict:
+        """중복 제거 결과와 절약량 (인덱스 크기/빌드 시간은 대표 행 기준 실측치를 행 수에 비례해 추정)"""
+        import faiss
+
+        summary = dedup_summary(canonical)
+        kept = max(1, summary["canonical_rows"])
+        index_bytes = faiss.serialize_index(index).nbytes
+        return {
+            "threshold": self.dedup_threshold,
+            **summary,
+            "index_bytes_saved": int(index_bytes / kept * summary["rows_collapsed"]),
+            "index_seconds_saved": round(index_seconds / kept * summary["rows_collapsed"], 2),
+        }
+
+    def build(self, resume: bool = True, rebuild: bool = False) -> dict:
+        """
+        인코딩 → 인덱스 → 메타데이터 → 매니페스트 순으로 전체 빌드를 수행합니다.
+
+        Args:
+            resume: 체크포인트가 있으면 이어서 진행할지 여부
+            rebuild: 이전 빌드의 벡터를 재사용하지 않고 전체를 다시 인코딩할지 여부
+
+        Returns:
+            dict: 기록한 매니페스트
+        """
+        os.makedirs(self.paths.root, exist_ok=True)
+        fingerprint = dataset_fingerprint(self.csv_path)
+
+        corpus = self.encode_corpus(resume=resume, rebuild=rebuild)
+        if corpus["rows"] == 0:
+            raise ValueError(f"데이터셋이 비어 있습니다: {self.csv_path}")
+
+        import faiss
+
+        vectors = np.load(self.paths.vectors_staging, mmap_mode="r")
+        if len(vectors) != corpus["slots"]:
+            raise RuntimeError(f"벡터 파일 행 수 불일치: {len(vectors)} != {corpus['slots']}")
+        live_slots = np.flatnonzero(~corpus["tombstones"]).astype(np.int64)
+
+        # 근접 중복을 대표 슬롯으로 묶고 대표만 인덱스에 넣음
+        start_time = time.perf_counter()
+        if self.dedup_threshold > 0:
+            canonical = find_near_duplicates(vectors, live_slots, self.dedup_threshold)
+        else:
+            canonical = np.full(len(vectors), -1, dtype=np.int64)
+            canonical[live_slots] = live_slots
+        index_slots = np.flatnonzero(canonical == np.arange(len(canonical))).astype(np.int64)
+        self.timings["dedup_seconds"] = round(time.perf_counter() - start_time, 2)
+
+        # 실행 중인 워커가 이전 산출물을 메모리 매핑하고 있고, 새로 시작하는 워커가 인덱스와 다른 빌드의
+        # 메타데이터/필터/BM25를 읽지 않도록 슬롯 단위 산출물은 모두 스테이징 경로에 쓴 뒤 교체 (인덱스는 마지막)
+        staged = ArtifactPaths.staged
+
+        # 톰스톤/별칭 슬롯은 인덱스에 넣지 않고, 검색 결과 ID가 곧 슬롯 ID가 되도록 ID 매핑
+        start_time = time.perf_counter()
+        index = build_faiss_index(vectors, self.spec, ids=index_slots)
+        faiss.write_index(index, staged(self.paths.index))
+        self.timings["index_seconds"] = round(time.perf_counter() - start_time, 2)
+        dedup = self._dedup_report(canonical, index, self.timings["index_seconds"])
+
+        start_time = time.perf_counter()
+        write_quote_metadata(corpus["records"], staged(self.paths.metadata))
+        save_npy(staged(self.paths.hashes), corpus["hashes"])
+        save_npy(staged(self.paths.tombstones), corpus["tombstones"])
+        save_npy(staged(self.paths.aliases), canonical.astype(np.int32))
+        self.timings["metadata_seconds"] = round(time.perf_counter() - start_time, 2)
+
+        start_time = time.perf_counter()
+        metadata = QuoteMetadataStore(staged(self.paths.metadata))
+        filter_vocab = build_filter_index(metadata, staged(self.paths.filters), canonical=canonical)
+        self.timings["filters_seconds"] = round(time.perf_counter() - start_time, 2)
+
+        start_time = time.perf_counter()
+        lexical_stats = build_lexical_index(metadata, staged(self.paths.lexical),
+                                            live=canonical == np.arange(len(canonical)))
+        metadata.close()
+        self.timings["lexical_seconds"] = round(time.perf_counter() - start_time, 2)
+
+        for path in (self.paths.metadata, self.paths.filters, self.paths.lexical, self.paths.hashes,
+                     self.paths.tombstones, self.paths.aliases):
+            publish(staged(path), path)
+        publish(self.paths.vectors_staging, self.paths.vectors)
+        save_index_spec(self.spec, self.paths.index)
+        publish(staged(self.paths.index), self.paths.index)
+
+        report = evaluate_index(index, vectors, self.spec, ids=index_slots)
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "model_id": self.model_id,
+            "model_path": self.model_path,
+            "dim": int(vectors.shape[1]),
+            "rows": corpus["rows"],
+            "slots": corpus["slots"],
+            "text_column": corpus["text_column"],
+            "dataset": fingerprint,
+            "index": self.spec.to_dict(),
+            "files": {
+                "index": os.path.basename(self.paths.index),
+                "spec": os.path.basename(self.paths.spec),
+                "vectors": os.path.basename(self.paths.vectors),
+                "hashes": os.path.basename(self.paths.hashes),
+                "tombstones": os.path.basename(self.paths.tombstones),
+                "aliases": os.path.basename(self.paths.aliases),
+                "metadata": os.path.basename(self.paths.metadata),
+                "filters": os.path.basename(self.paths.filters),
+                "lexical": os.path.basename(self.paths.lexical),
+            },
+            "filters": filter_vocab,
+            "lexical": lexical_stats,
+            "incremental": {
+                "rows_reused": corpus["rows_reused"],
+                "rows_new": corpus["rows_new"],
+                "rows_tombstoned": corpus["rows_tombstoned"],
+                "tombstones": int(np.count_nonzero(corpus["tombstones"])),
+            },
+            "dedup": dedup,
+            "rows_encoded": corpus["rows_encoded"],
+            "timings": self.timings,
+            "report": report,
+            "built_at": datetime.now().isoformat(),
+        }
+        write_json_atomic(self.paths.manifest, manifest)
+
+        # 빌드 완료 - 체크포인트 제거
+        if os.path.exists(self.paths.checkpoint):
+            os.remove(self.paths.checkpoint)
+        invalidate_built_tiers()
+        return manifest
@@ -0,0 +1,436 @@
+"""
+FAISS 인덱스 스펙 모듈
+코사인(내적) 인덱스의 종류(Flat, IVF-Flat, IVF-PQ, HNSW), 벡터 저장 정밀도(fp32/fp16/int8/PQ),
+빌드/검색 파라미터를 정의하고, 인덱스 파일 옆에 스펙(JSON)을 함께 저장해
+런타임 검색기가 같은 파라미터로 검색하도록 합니다.
+
+양자화 인덱스는 원본 정밀도(fp32) 벡터 파일을 인덱스 옆에 함께 저장해 두고,
+rerank_k > 0이면 상위 후보를 디스크의 fp32 벡터로 다시 정확히 정렬합니다.
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass, fields
+
+import numpy as np
+
+INDEX_KINDS = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+STORAGE_TYPES = ("fp32", "fp16", "int8", "pq")
+ADD_BATCH_ROWS = 65536  # 인덱스에 한 번에 추가하는 행 수 (메모리 매핑 벡터를 통째로 복사하지 않도록)
+
+
+@dataclass
+class IndexSpec:
+    """
+    FAISS 인덱스 스펙
+
+    Attributes:
+        kind: 인덱스 종류 (flat, ivf_flat, ivf_pq, hnsw)
+        storage: 벡터 저장 정밀도 (fp32, fp16, int8, pq / ivf_pq는 항상 pq)
+        nlist: IVF 클러스터 수
+        pq_m: PQ 서브 벡터 수 (임베딩 차원의 약수여야 함)
+        pq_nbits: PQ 서브 벡터당 비트 수
+        hnsw_m: HNSW 노드당 연결 수
+        ef_construction: HNSW 빌드 시 탐색 폭
+        nprobe: IVF 검색 시 방문할 클러스터 수 (검색 파라미터)
+        ef_search: HNSW 검색 시 탐색 폭 (검색 파라미터)
+        rerank_k: 원본 fp32 벡터로 다시 정렬할 후보 수 (0이면 재정렬 안 함, 검색 파라미터)
+    """
+    kind: str = "flat"
+    storage: str = "fp32"
+    nlist: int = 1024
+    pq_m: int = 64
+    pq_nbits: int = 8
+    hnsw_m: int = 32
+    ef_construction: int = 200
+    nprobe: int = 16
+    ef_search: int = 64
+    rerank_k: int = 0
+
+    def __post_init__(self):
+        if self.kind not in INDEX_KINDS:
+            raise ValueError(f"지원하지 않는 인덱스 종류: {self.kind} (가능: {', '.join(INDEX_KINDS)})")
+        if self.kind == "ivf_pq":
+            self.storage = "pq"
+        if self.storage not in STORAGE_TYPES:
+            raise ValueError(f"지원하지 않는 저장 정밀도: {self.storage} (가능: {', '.join(STORAGE_TYPES)})")
+
+    @classmethod
+    def parse(cls, text: str) -> "IndexSpec":
+        """
+        CLI용 문자열 스펙을 파싱합니다.
+
+        예시: "flat", "ivf_flat:nlist=1024,nprobe=16", "hnsw:hnsw_m=32,ef_search=128",
+              "flat:storage=int8,rerank_k=50"
+        """
+        kind, _, params = text.partition(":")
+        kwargs = {"kind": kind.strip()}
+        known = {f.name for f in fields(cls)} - {"kind"}
+        for item in filter(None, params.split(",")):
+            key, _, value = item.partition("=")
+            key = key.strip()
+            if key not in known:
+                raise ValueError(f"알 수 없는 인덱스 파라미터: {key}")
+            kwargs[key] = value.strip() if key == "storage" else int(value)
+        return cls(**kwargs)
+
+    def label(self) -> str:
+        """벤치마크/로그 출력용 짧은 이름"""
+        if self.kind == "flat":
+            label = "flat"
+        elif self.kind == "ivf_flat":
+            label = f"ivf_flat(nlist={self.nlist},nprobe={self.nprobe})"
+        elif self.kind == "ivf_pq":
+            label = f"ivf_pq(nlist={self.nlist},m={self.pq_m}x{self.pq_nbits},nprobe={self.nprobe})"
+        else:
+            label = f"hnsw(M={self.hnsw_m},efSearch={self.ef_search})"
+
+        if self.storage != "fp32" and self.kind != "ivf_pq":
+            label += f"[{self._storage_label()}]"
+        if self.rerank_k:
+            label += f"+rerank{self.rerank_k}"
+        return label
+
+    def _storage_label(self) -> str:
+        if self.storage == "pq":
+            return f"pq{self.pq_m}x{self.pq_nbits}"
+        return self.storage
+
+    def _codec(self) -> str:
+        """저장 정밀도에 해당하는 faiss 코덱 문자열"""
+        return {
+            "fp32": "Flat",
+            "fp16": "SQfp16",
+            "int8": "SQ8",
+            "pq": f"PQ{self.pq_m}x{self.pq_nbits}",
+        }[self.storage]
+
+    def factory_string(self, num_vectors: int | None = None) -> str:
+        """
+        faiss.index_factory 문자열을 만듭니다.
+
+        Args:
+            num_vectors: 학습 벡터 수 (IVF nlist가 벡터 수보다 크지 않도록 보정)
+        """
+        nlist = self.nlist
+        if num_vectors is not None:
+            nlist = max(1, min(nlist, num_vectors))
+
+        if self.kind == "flat":
+            return self._codec()
+        if self.kind in ("ivf_flat", "ivf_pq"):
+            return f"IVF{nlist},{self._codec()}"
+        if self.storage == "fp32":
+            return f"HNSW{self.hnsw_m}"
+        if self.storage == "pq":
+            return f"HNSW{self.hnsw_m}_PQ{self.pq_m}"
+        return f"HNSW{self.hnsw_m}_{self._codec()}"
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IndexSpec":
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+def spec_path_for(index_path: str) -> str:
+    """인덱스 파일 옆에 저장되는 스펙 파일 경로 (예: quotes_cosine_faiss.index → quotes_cosine_faiss.spec.json)"""
+    return os.path.splitext(index_path)[0] + ".spec.json"
+
+
+def vectors_path_for(index_path: str) -> str:
+    """재정렬용 원본 fp32 벡터 파일 경로 (예: quotes_cosine_faiss.index → quotes_cosine_faiss.f32.npy)"""
+    return os.path.splitext(index_path)[0] + ".f32.npy"
+
+
+def save_index_spec(spec: IndexSpec, index_path: str) -> str:
+    """스펙을 인덱스 파일 옆에 JSON으로 저장하고 경로를 반환합니다."""
+    path = spec_path_for(index_path)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(spec.to_dict(), f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)  # 워커가 읽는 중에 반쯤 쓰인 스펙이 보이지 않도록
+    return path
+
+
+def index_slot_count(index) -> int:
+    """인덱스가 참조하는 슬롯 수 (ID 매핑 인덱스는 가장 큰 슬롯 ID + 1, 아니면 벡터 수)"""
+    import faiss
+
+    if hasattr(index, "id_map"):
+        ids = faiss.vector_to_array(index.id_map)
+        return int(ids.max()) + 1 if len(ids) else 0
+    return int(index.ntotal)
+
+
+def load_index_spec(index_path: str) -> IndexSpec:
+    """인덱스 옆의 스펙을 읽습니다. 스펙 파일이 없는 기존 인덱스는 exact Flat으로 간주합니다."""
+    path = spec_path_for(index_path)
+    if not os.path.exists(path):
+        return IndexSpec()
+    with open(path, encoding="utf-8") as f:
+        return IndexSpec.from_dict(json.load(f))
+
+
+def build_faiss_index(vectors: np.ndarray, spec: IndexSpec, ids: np.ndarray | None = None):
+    """
+    정규화된 벡터로 스펙에 맞는 내적(코사인) 인덱스를 학습/생성합니다.
+
+    Args:
+        vectors: L2 정규화된 float32 벡터 [N, d] (메모리 매핑 배열 가능)
+        spec: 인덱스 스펙
+        ids: 인덱스에 넣을 행 ID (None이면 전체 행을 0..N-1 순서로 추가,
+             지정하면 해당 행만 IndexIDMap2로 감싸 원래 행 ID를 그대로 검색 결과 ID로 사용)
+
+    Returns:
+        faiss.Index: 벡터가 추가된 인덱스 (검색 파라미터 적용 완료)
+    """
+    import faiss
+
+    dim = vectors.shape[1]
+    num_vectors = len(vectors) if ids is None else len(ids)
+
+    index = faiss.index_factory(dim, spec.factory_string(num_vectors), faiss.METRIC_INNER_PRODUCT)
+    if spec.kind == "hnsw":
+        faiss.downcast_index(index).hnsw.efConstruction = spec.ef_construction
+    if not index.is_trained:
+        # 양자화 학습은 표본으로 충분 (대용량 코퍼스의 학습 시간 제한)
+        train_size = min(num_vectors, 256 * 1024)
+        step = max(1, num_vectors // train_size)
+        sample = vectors[::step][:train_size] if ids is None else vectors[np.sort(ids[::step][:train_size])]
+        index.train(np.ascontiguousarray(sample, dtype=np.float32))
+
+    if ids is None:
+        for start in range(0, num_vectors, ADD_BATCH_ROWS):
+            index.add(np.ascontiguousarray(vectors[start:start + ADD_BATCH_ROWS], dtype=np.float32))
+    else:
+        index = faiss.IndexIDMap2(index)
+        ids = np.asarray(ids, dtype=np.int64)
+        for start in range(0, num_vectors, ADD_BATCH_ROWS):
+            batch_ids = ids[start:start + ADD_BATCH_ROWS]
+            index.add_with_ids(np.ascontiguousarray(vectors[batch_ids], dtype=np.float32), batch_ids)
+
+    apply_search_params(index, spec)
+    return index
+
+
+def read_faiss_index(index_path: str, spec: IndexSpec, mmap: bool = True) -> tuple:
+    """
+    인덱스 파일을 읽습니다. mmap이면 벡터 코드를 힙에 복사하지 않고 파일을 읽기 전용으로 메모리 매핑해,
+    같은 호스트의 여러 워커 프로세스가 페이지 캐시의 한 사본을 공유하도록 합니다.
+
+    - IVF (ivf_flat, ivf_pq): 역리스트를 매핑 (IO_FLAG_MMAP)
+    - Flat / fp16 / int8 / HNSW: 코드 배열을 매핑 (IO_FLAG_MMAP_IFC, faiss 1.10 이상, HNSW 그래프는 힙에 로드)
+
+    매핑된 인덱스는 읽기 전용이므로 검색만 해야 하며(add/remove 불가),
+    빌드는 파일을 교체(os.replace)해야 실행 중인 워커가 이전 파일을 계속 안전하게 읽을 수 있습니다.
+
+    Args:
+        index_path: FAISS 인덱스 파일 경로
+        spec: 인덱스 스펙 (매핑 방식 선택에 사용)
+        mmap: 메모리 매핑 사용 여부
+
+    Returns:
+        tuple[faiss.Index, bool]: (인덱스, 실제로 메모리 매핑되었는지 여부)
+    """
+    import faiss
+
+    if mmap:
+        if spec.kind in ("ivf_flat", "ivf_pq"):
+            io_flags = faiss.IO_FLAG_MMAP
+        else:
+            io_flags = getattr(faiss, "IO_FLAG_MMAP_IFC", 0)  # faiss 1.10 미만은 지원하지 않음
+        if io_flags:
+            try:
+                return faiss.read_index(index_path, io_flags | faiss.IO_FLAG_READ_ONLY), True
+            except RuntimeError as e:
+                print(f"⚠️ 인덱스 메모리 매핑 실패 - 메모리로 로드: {e}")
+    return faiss.read_index(index_path), False
+
+
+def apply_search_params(index, spec: IndexSpec) -> None:
+    """
+    스펙의 검색 파라미터(nprobe, efSearch)를 인덱스에 적용합니다.
+
+    Args:
+        index: faiss.Index
+        spec: 인덱스 스펙
+    """
+    import faiss
+
+    params = faiss.ParameterSpace()
+    if spec.kind in ("ivf_flat", "ivf_pq"):
+        params.set_index_parameter(index, "nprobe", spec.nprobe)
+    elif spec.kind == "hnsw":
+        params.set_index_parameter(index, "efSearch", spec.ef_search)
+
+
+def search_params_with_selector(spec: IndexSpec, selector):
+    """
+    ID 셀렉터를 포함한 검색 파라미터를 만듭니다. (호출 단위 파라미터라 스펙의 nprobe/efSearch도 함께 지정)
+
+    Args:
+        spec: 인덱스 스펙
+        selector: faiss.IDSelector (검색 결과로 허용할 ID)
+
+    Returns:
+        faiss.SearchParameters: index.search(..., params=...)에 넘길 파라미터
+    """
+    import faiss
+
+    if spec.kind in ("ivf_flat", "ivf_pq"):
+        return faiss.SearchParametersIVF(sel=selector, nprobe=spec.nprobe)
+    if spec.kind == "hnsw":
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=spec.ef_search)
+    return faiss.SearchParameters(sel=selector)
+
+
+def rerank_exact(query: np.ndarray, candidate_ids: np.ndarray, full_vectors: np.ndarray, top_k: int):
+    """
+    양자화 인덱스가 고른 후보를 원본 fp32 벡터로 다시 정확히 정렬합니다.
+
+    Args:
+        query: L2 정규화된 쿼리 벡터 [d]
+        candidate_ids: 후보 행 ID (음수는 빈 슬롯)
+        full_vectors: 원본 fp32 벡터 [N, d] (메모리 매핑 권장, 후보 행만 읽음)
+        top_k: 반환할 개수
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (유사도, 행 ID) - 유사도 내림차순
+    """
+    # 행 ID 순서로 읽어야 메모리 매핑 파일 접근이 순차적
+    ids = np.sort(candidate_ids[candidate_ids >= 0])
+    if len(ids) == 0:
+        return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+
+    scores = np.asarray(full_vectors[ids], dtype=np.float32) @ query
+    order = np.argsort(-scores)[:top_k]
+    return scores[order], ids[order]
+
+
+def mmr_select(relevance: np.ndarray, candidate_vectors: np.ndarray, top_k: int, lambda_mult: float) -> np.ndarray:
+    """
+    MMR(maximal marginal relevance)로 관련도가 높으면서 서로 덜 비슷한 후보를 고릅니다.
+
+    매 단계 λ * 관련도 - (1 - λ) * (이미 고른 후보와의 최대 유사도)가 가장 큰 후보를 선택하며,
+    후보 간 유사도 행렬은 한 번의 행렬곱으로 미리 계산합니다. (후보 50개 기준 수십 마이크로초)
+
+    Args:
+        relevance: 후보별 쿼리 관련도 [n] (내림차순일 필요 없음)
+        candidate_vectors: L2 정규화된 후보 벡터 [n, d]
+        top_k: 고를 개수
+        lambda_mult: 관련도 가중치 λ (1이면 관련도 순 그대로, 작을수록 다양성 우선)
+
+    Returns:
+        np.ndarray: 선택된 후보의 위치 (선택 순서)
+    """
+    n = len(relevance)
+    top_k = min(top_k, n)
+    if top_k == 0:
+        return np.empty(0, dtype=np.int64)
+
+    relevance = np.asarray(relevance, dtype=np.float32)
+    vectors = np.asarray(candidate_vectors, dtype=np.float32)
+    pairwise = vectors @ vectors.T
+
+    selected = np.empty(top_k, dtype=np.int64)
+    max_similarity = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    for step in range(top_k):
+        if step == 0:
+            scores = relevance.copy()
+        else:
+            scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[~available] = -np.inf
+        pick = int(np.argmax(scores))
+        selected[step] = pick
+        available[pick] = False
+        np.maximum(max_similarity, pairwise[pick], out=max_similarity)
+    return selected
+
+
+def exact_top_k(queries: np.ndarray, vectors: np.ndarray, top_k: int,
+                valid: np.ndarray | None = None) -> np.ndarray:
+    """
+    전체 벡터를 블록 단위로 훑어 exact 내적 top-k 행 ID를 구합니다. (벡터 전체를 복사하지 않음)
+
+    Args:
+        queries: 쿼리 행렬 [Q, d]
+        vectors: 코퍼스 벡터 [N, d] (메모리 매핑 배열 가능)
+        top_k: k
+        valid: 검색 대상 행 표시 (bool [N], None이면 전체)
+
+    Returns:
+        np.ndarray: 유사도 내림차순 행 ID [Q, top_k]
+    """
+    best_scores = np.empty((len(queries), 0), dtype=np.float32)
+    best_ids = np.empty((len(queries), 0), dtype=np.int64)
+    for start in range(0, len(vectors), ADD_BATCH_ROWS):
+        block = np.asarray(vectors[start:start + ADD_BATCH_ROWS], dtype=np.float32)
+        block_ids = np.broadcast_to(np.arange(start, start + len(block)), (len(queries), len(block)))
+        block_scores = queries @ block.T
+        if valid is not None:
+            block_scores[:, ~valid[start:start + len(block)]] = -np.inf
+        scores = np.concatenate([best_scores, block_scores], axis=1)
+        ids = np.concatenate([best_ids, block_ids], axis=1)
+
+        k = min(top_k, scores.shape[1])
+        keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, keep, axis=1)
+        best_ids = np.take_along_axis(ids, keep, axis=1)
+
+    order = np.argsort(-best_scores, axis=1)
+    return np.take_along_axis(best_ids, order, axis=1)
+
+
+def evaluate_index(index, vectors: np.ndarray, spec: IndexSpec, num_queries: int = 200,
+                   top_k: int = 10, seed: int = 0, ids: np.ndarray | None = None) -> dict:
+    """
+    빌드한 인덱스의 메모리 사용량과 exact 검색 대비 recall@k를 측정합니다.
+
+    Args:
+        index: 평가할 faiss.Index
+        vectors: 인덱스에 추가한 원본 fp32 정규화 벡터 [N, d] (메모리 매핑 배열 가능)
+        spec: 인덱스 스펙 (rerank_k > 0이면 재정렬 후 recall도 측정)
+        num_queries: 코퍼스에서 뽑아 잡음을 섞은 평가 쿼리 수
+        top_k: recall@k의 k
+        ids: 인덱스에 들어 있는 행 ID (None이면 전체 행)
+
+    Returns:
+        dict: index_bytes, fp32_bytes, compression, recall, recall_reranked
+    """
+    import faiss
+
+    rng = np.random.default_rng(seed)
+    candidates = np.arange(len(vectors)) if ids is None else np.asarray(ids)
+    picks = np.sort(rng.choice(candidates, size=min(num_queries, len(candidates)), replace=False))
+    queries = np.asarray(vectors[picks], dtype=np.float32)
+    queries = queries + 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+    queries = np.ascontiguousarray(queries)
+    faiss.normalize_L2(queries)
+
+    valid = None
+    if ids is not None:
+        valid = np.zeros(len(vectors), dtype=bool)
+        valid[ids] = True
+    truth = exact_top_k(queries, vectors, top_k, valid)
+
+    fetch_k = max(top_k, spec.rerank_k)
+    _, found = index.search(queries, fetch_k)
+
+    def _recall(result_ids):
+        return sum(len(set(r[:top_k]) & set(t)) for r, t in zip(result_ids, truth)) / truth.size
+
+    report = {
+        "index_bytes": int(faiss.serialize_index(index).nbytes),
+        "fp32_bytes": int(len(candidates) * vectors.shape[1] * 4),
+        "recall": round(_recall(found), 4),
+        "recall_reranked": None,
+    }
+    report["compression"] = round(report["fp32_bytes"] / max(1, report["index_bytes"]), 2)
+
+    if spec.rerank_k:
+        reranked = [rerank_exact(q, ids, vectors, top_k)[1] for q, ids in zip(queries, found)]
+        report["recall_reranked"] = round(_recall(reranked), 4)
+    return report
@@ -0,0 +1,163 @@
+"""
+LLM HTTP 클라이언트 풀 모듈
+Solar API 호출에 쓰는 keep-alive HTTP 클라이언트를 프로세스당 하나만 만들어 모든 체인이 공유합니다.
+
+ChatUpstage를 호출마다 새로 만들면 OpenAI 클라이언트 생성(SSL 컨텍스트 로드)과 새 TCP/TLS 연결 비용을
+매 턴 치르게 됩니다. 공유 클라이언트는 연결을 풀에 유지해 다음 요청에서 재사용하고,
+서버 시작 시 warm_up_http_pool()로 미리 연결을 열어 둡니다.
+
+비동기 경로(ASGI 서버의 graph.ainvoke)는 같은 설정의 httpx.AsyncClient를 공유합니다.
+AsyncClient의 연결은 처음 사용한 이벤트 루프에 묶이므로 프로세스당 하나의 루프(ASGI 서버)에서만 사용합니다.
+aclose_http_pool()로 닫으면 세대 번호(async_pool_generation)가 바뀌고, 클라이언트를 물고 있는 쪽(공유 LLM)은
+이를 보고 다음 사용 시 새 클라이언트로 다시 만듭니다. (ASGI lifespan 재시작 대응)
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+LLM_API_BASE = os.getenv("UPSTAGE_API_BASE", "https://api.upstage.ai/v1")
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "20"))  # 최대 동시 연결 수
+LLM_POOL_KEEPALIVE = int(os.getenv("LLM_POOL_KEEPALIVE", "10"))  # 풀에 유지하는 유휴 연결 수
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))  # 유휴 연결 유지 시간 (초)
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))  # 연결 수립 제한 시간 (초)
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "60"))  # 응답 대기 제한 시간 (초)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_WARMUP_CONNECTIONS = int(os.getenv("LLM_WARMUP_CONNECTIONS", "2"))  # 시작 시 미리 열어 둘 연결 수
+
+_http_client = None
+_async_http_client = None
+_async_pool_generation = 0  # 비동기 클라이언트를 닫을 때마다 증가
+_http_client_lock = threading.Lock()
+pool_status = {"warm_connections": 0, "warmup_ms": None, "error": None}
+
+
+def create_http_client(pool_size: int = LLM_POOL_SIZE, keepalive: int = LLM_POOL_KEEPALIVE,
+                       keepalive_expiry: float = LLM_KEEPALIVE_EXPIRY, connect_timeout: float = LLM_CONNECT_TIMEOUT,
+                       read_timeout: float = LLM_READ_TIMEOUT, asynchronous: bool = False):
+    """
+    연결 풀 크기와 제한 시간을 지정한 keep-alive httpx 클라이언트를 만듭니다.
+
+    Args:
+        asynchronous: True이면 비동기 클라이언트(httpx.AsyncClient)를 만듦
+
+    Returns:
+        httpx.Client | httpx.AsyncClient: 스레드(또는 코루틴) 간에 공유해도 안전한 클라이언트
+    """
+    import httpx
+
+    client_class = httpx.AsyncClient if asynchronous else httpx.Client
+    return client_class(
+        limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=keepalive,
+                            keepalive_expiry=keepalive_expiry),
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+    )
+
+
+def get_http_client():
+    """프로세스 공유 HTTP 클라이언트 (최초 호출 시 생성)"""
+    global _http_client
+
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = create_http_client()
+    return _http_client
+
+
+def get_async_http_client():
+    """프로세스 공유 비동기 HTTP 클라이언트 (최초 호출 시 생성, 연결은 처음 사용할 때 열림)"""
+    global _async_http_client
+
+    if _async_http_client is None:
+        with _http_client_lock:
+            if _async_http_client is None:
+                _async_http_client = create_http_client(asynchronous=True)
+    return _async_http_client
+
+
+async def awarm_up_http_pool(connections: int = LLM_WARMUP_CONNECTIONS, base_url: str = LLM_API_BASE) -> int:
+    """
+    비동기 클라이언트로 API 서버 연결을 미리 열어 둡니다. (ASGI 서버 시작 시, 서버의 이벤트 루프에서 호출)
+
+    Returns:
+        int: 수립된 연결 수
+    """
+    import httpx
+
+    client = get_async_http_client()
+
+    async def touch():
+        try:
+            await client.get(base_url)
+            return True
+        except httpx.HTTPError as e:
+            pool_status["error"] = str(e)
+            return False
+
+    return sum(await asyncio.gather(*(touch() for _ in range(connections))))
+
+
+def async_pool_generation() -> int:
+    """비동기 클라이언트 세대 번호 (값이 바뀌었으면 이전에 받은 클라이언트는 닫힌 것)"""
+    return _async_pool_generation
+
+
+async def aclose_http_pool() -> None:
+    """비동기 클라이언트의 연결을 닫습니다. (ASGI 서버 종료 시, 다음 get_async_http_client()는 새 클라이언트)"""
+    global _async_http_client, _async_pool_generation
+
+    with _http_client_lock:
+        client, _async_http_client = _async_http_client, None
+        _async_pool_generation += 1
+    if client is not None:
+        await client.aclose()
+
+
+def warm_up_http_pool(connections: int = LLM_WARMUP_CONNECTIONS, base_url: str = LLM_API_BASE) -> int:
+    """
+    API 서버에 가벼운 요청을 동시에 보내 연결(TCP/TLS)을 미리 열어 풀에 남겨 둡니다.
+
+    응답 상태 코드와 무관하게 연결이 수립되면 성공으로 봅니다. (인증 없는 요청이라 401/404가 정상)
+
+    Args:
+        connections: 미리 열 연결 수
+        base_url: API 기본 URL
+
+    Returns:
+        int: 수립된 연결 수
+    """
+    import httpx
+
+    client = get_http_client()
+    start = time.perf_counter()
+
+    def touch(_):
+        try:
+            client.get(base_url)
+            return True
+        except httpx.HTTPError as e:
+            pool_status["error"] = str(e)
+            return False
+
+    with ThreadPoolExecutor(max_workers=max(1, connections)) as executor:
+        opened = sum(executor.map(touch, range(connections)))
+    pool_status.update({"warm_connections": opened, "warmup_ms": round((time.perf_counter() - start) * 1000, 1)})
+    if opened:
+        pool_status["error"] = None
+    return opened
+
+
+def http_pool_stats() -> dict:
+    """연결 풀 설정과 워밍업 결과 (/api/health 노출용)"""
+    return {
+        **pool_status,
+        "created": _http_client is not None,
+        "async_created": _async_http_client is not None,
+        "pool_size": LLM_POOL_SIZE,
+        "keepalive": LLM_POOL_KEEPALIVE,
+        "connect_timeout": LLM_CONNECT_TIMEOUT,
+        "read_timeout": LLM_READ_TIMEOUT,
+    }
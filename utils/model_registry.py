@@ -0,0 +1,167 @@
+"""
+임베딩 모델 티어 레지스트리
+인코더마다 자신의 인덱스/매니페스트(vectorDB/FAISS/<모델 ID>/)를 갖고,
+요청의 언어 또는 지연 시간 예산에 맞는 티어를 골라 검색합니다.
+
+기본 티어:
+    fast     - all-MiniLM-L6-v2 (22MB, 영어 전용, quote 컬럼으로 인덱싱)
+    quality  - paraphrase-multilingual-mpnet-base-v2 (1GB, 다국어/한국어)
+
+라우팅 규칙:
+    - 해당 언어를 지원하는 티어만 후보 (한국어 → quality, 영어 → fast/quality)
+    - 지연 시간 예산이 없으면 후보 중 가장 빠른 티어 (영어 → fast)
+    - 예산이 있으면 예산 안에서 가장 품질이 높은 티어, 예산을 맞출 수 없으면 가장 빠른 티어
+    - 인덱스가 빌드되지 않은 티어는 후보에서 제외 (후보가 없으면 기본 티어)
+      빌드 여부는 요청마다 파일을 확인하지 않고 캐시하며, TIER_RECHECK_SECONDS마다 다시 확인합니다.
+"""
+
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from .index_artifacts import ArtifactPaths, artifact_dir_for
+
+MODELS_DIR = "./models/sentence-transformers"
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    """임베딩 모델 티어 (모델 경로, 지원 언어, 예상 지연 시간, 품질 순위)"""
+
+    name: str
+    model_path: str
+    languages: tuple  # 지원 언어 코드 ('*'는 모든 언어)
+    latency_ms: float  # 단일 쿼리 인코딩 예상 지연 시간 (실측값이 쌓이기 전 라우팅에 사용)
+    quality: int  # 클수록 검색 품질이 높음
+    text_column: str | None = None  # 인덱스 빌드 시 임베딩할 컬럼 (None이면 insight, 없으면 quote)
+
+    @property
+    def model_id(self) -> str:
+        return os.path.basename(os.path.normpath(self.model_path))
+
+    @property
+    def artifact_dir(self) -> str:
+        return artifact_dir_for(self.model_id)
+
+    def supports(self, language: str) -> bool:
+        return "*" in self.languages or language in self.languages
+
+    def is_built(self) -> bool:
+        """로컬 모델과 빌드된 인덱스가 모두 있는지 여부"""
+        return os.path.exists(self.model_path) and os.path.exists(ArtifactPaths(self.artifact_dir).index)
+
+
+MODEL_TIERS = {
+    tier.name: tier
+    for tier in (
+        ModelTier("fast", os.path.join(MODELS_DIR, "all-MiniLM-L6-v2"), ("en",), latency_ms=8.0, quality=1,
+                  text_column="quote"),
+        ModelTier("quality", os.path.join(MODELS_DIR, "paraphrase-multilingual-mpnet-base-v2"), ("*",),
+                  latency_ms=60.0, quality=2),
+    )
+}
+DEFAULT_TIER = os.getenv("QUOTE_DEFAULT_TIER", "quality")
+ENABLED_TIERS = tuple(name.strip() for name in os.getenv("QUOTE_MODEL_TIERS", "fast,quality").split(",")
+                      if name.strip() in MODEL_TIERS)
+# 빌드된 티어 목록을 다시 확인하는 간격 (다른 프로세스에서 새로 빌드한 티어를 재시작 없이 라우팅 대상에 추가)
+TIER_RECHECK_SECONDS = float(os.getenv("QUOTE_TIER_RECHECK_SECONDS", "60"))
+
+_HANGUL_RE = re.compile(r"[가-힣ㄱ-ㅎㅏ-ㅣ]")
+_LATIN_RE = re.compile(r"[A-Za-z]")
+
+
+def detect_language(text: str) -> str:
+    """
+    문자 구성으로 언어를 추정합니다. (한글이 글자의 20% 이상이면 ko, 라틴 문자가 대부분이면 en)
+
+    Returns:
+        str: 'ko', 'en' 또는 'other'
+    """
+    hangul = len(_HANGUL_RE.findall(text or ""))
+    latin = len(_LATIN_RE.findall(text or ""))
+    if hangul and hangul >= 0.2 * (hangul + latin):
+        return "ko"
+    if latin:
+        return "en"
+    return "other"
+
+
+def get_tier(name: str) -> ModelTier:
+    """
+    이름으로 티어를 찾습니다.
+
+    Raises:
+        ValueError: 등록되지 않은 티어인 경우
+    """
+    if name not in MODEL_TIERS:
+        raise ValueError(f"알 수 없는 모델 티어: {name} (사용 가능: {', '.join(MODEL_TIERS)})")
+    return MODEL_TIERS[name]
+
+
+_built_tiers = None
+_built_tiers_checked_at = 0.0
+_built_tiers_lock = threading.Lock()
+
+
+def built_tiers() -> frozenset:
+    """
+    로컬 모델과 인덱스가 모두 있는 활성 티어 이름 (캐시, TIER_RECHECK_SECONDS가 지나면 다시 확인)
+
+    Returns:
+        frozenset: 빌드된 티어 이름
+    """
+    global _built_tiers, _built_tiers_checked_at
+
+    if _built_tiers is None or time.monotonic() - _built_tiers_checked_at >= TIER_RECHECK_SECONDS:
+        with _built_tiers_lock:
+            if _built_tiers is None or time.monotonic() - _built_tiers_checked_at >= TIER_RECHECK_SECONDS:
+                _built_tiers = frozenset(name for name in ENABLED_TIERS if MODEL_TIERS[name].is_built())
+                _built_tiers_checked_at = time.monotonic()
+    return _built_tiers
+
+
+def invalidate_built_tiers() -> None:
+    """빌드된 티어 캐시를 비워 다음 라우팅에서 다시 확인하도록 합니다. (인덱스 빌드 직후 호출)"""
+    global _built_tiers
+
+    with _built_tiers_lock:
+        _built_tiers = None
+
+
+def route_tier(text: str, language: str | None = None, latency_budget_ms: float | None = None,
+               observed_ms: dict | None = None, available: set | None = None) -> str:
+    """
+    요청에 맞는 모델 티어를 고릅니다.
+
+    Args:
+        text: 쿼리 텍스트 (language가 없을 때 언어 추정에 사용)
+        language: 요청이 지정한 언어 코드 (예: 'ko', 'en')
+        latency_budget_ms: 쿼리 인코딩 지연 시간 예산 (ms)
+        observed_ms: 티어별 실측 인코딩 p50 (ms, 있으면 예상값 대신 사용)
+        available: 사용할 수 있는 티어 이름 (None이면 인덱스가 빌드된 활성 티어, built_tiers 캐시)
+
+    Returns:
+        str: 티어 이름 (후보가 없으면 DEFAULT_TIER)
+    """
+    if available is None:
+        available = built_tiers()
+    tiers = [MODEL_TIERS[name] for name in ENABLED_TIERS if name in available]
+    if not tiers:
+        return DEFAULT_TIER
+
+    language = (language or detect_language(text)).lower()
+    candidates = [tier for tier in tiers if tier.supports(language)]
+    if not candidates:
+        return DEFAULT_TIER  # 지원하지 않는 언어를 다른 모델로 검색하지 않음
+    observed_ms = observed_ms or {}
+
+    def expected_ms(tier: ModelTier) -> float:
+        return observed_ms.get(tier.name) or tier.latency_ms
+
+    if latency_budget_ms is not None:
+        within = [tier for tier in candidates if expected_ms(tier) <= latency_budget_ms]
+        if within:
+            return max(within, key=lambda tier: tier.quality).name
+    return min(candidates, key=expected_ms).name
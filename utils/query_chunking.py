@@ -0,0 +1,199 @@
+"""
+쿼리 토큰 청킹 모듈
+대화 분석 텍스트를 한 번만 토크나이즈하고, 모델 최대 시퀀스 길이를 넘는 분석은 겹치는 청크로 나눠
+한 번의 배치 forward pass로 인코딩한 뒤 하나의 쿼리 벡터로 풀링합니다.
+
+SentenceTransformer.encode는 최대 길이를 넘는 토큰을 조용히 잘라내므로, 긴 분석의 뒷부분이 검색에 반영되지 않고
+잘려 나갈 토큰까지 토크나이즈합니다. 여기서는 토큰 ID로 직접 모델 입력을 만들어 다시 토크나이즈하지 않습니다.
+
+풀링 방식:
+    mean      - 청크 임베딩(정규화)의 평균
+    weighted  - 청크의 토큰 수로 가중한 평균 (토큰이 적은 마지막 청크의 비중을 줄임)
+"""
+
+import os
+import threading
+from collections import deque
+
+import numpy as np
+
+QUERY_MAX_TOKENS = int(os.getenv("QUOTE_QUERY_MAX_TOKENS", "0"))  # 청크당 최대 토큰 수 (0이면 모델 max_seq_length)
+QUERY_CHUNK_OVERLAP = int(os.getenv("QUOTE_QUERY_CHUNK_OVERLAP", "32"))  # 이웃 청크가 겹치는 토큰 수
+QUERY_CHUNK_POOLING = os.getenv("QUOTE_QUERY_CHUNK_POOLING", "mean")  # mean 또는 weighted
+POOLING_MODES = ("mean", "weighted")
+FORWARD_BATCH = 64  # 한 번의 forward에 넣는 최대 청크 수
+TOKEN_BUCKETS = (32, 64, 128, 256, 512, 1024)  # 토큰 수 분포 구간 상한
+
+
+def chunking_id(max_tokens: int = QUERY_MAX_TOKENS, overlap: int = QUERY_CHUNK_OVERLAP,
+                pooling: str = QUERY_CHUNK_POOLING) -> str:
+    """청킹 설정 식별자 (설정이 바뀌면 긴 쿼리의 임베딩이 달라지므로 임베딩 캐시 키에 포함)"""
+    return f"chunk{max_tokens or 'max'}-{overlap}-{pooling}"
+
+
+def split_token_chunks(ids: list, max_tokens: int, overlap: int) -> list:
+    """
+    토큰 ID 목록을 max_tokens 이하의 겹치는 청크로 나눕니다.
+
+    Args:
+        ids: 특수 토큰을 제외한 토큰 ID 목록
+        max_tokens: 청크당 최대 토큰 수
+        overlap: 이웃 청크가 겹치는 토큰 수 (max_tokens의 절반 미만으로 제한)
+
+    Returns:
+        list[list[int]]: 청크 목록 (길이가 max_tokens 이하이면 원본 하나, 빈 입력도 청크 하나)
+    """
+    if len(ids) <= max_tokens:
+        return [ids]
+    stride = max_tokens - min(overlap, max_tokens // 2)
+    chunks = []
+    for start in range(0, len(ids), stride):
+        chunks.append(ids[start:start + max_tokens])
+        if start + max_tokens >= len(ids):
+            break
+    return chunks
+
+
+def pool_chunk_embeddings(embeddings: np.ndarray, weights: list, pooling: str = QUERY_CHUNK_POOLING) -> np.ndarray:
+    """
+    한 쿼리의 청크 임베딩을 L2 정규화된 벡터 하나로 합칩니다.
+
+    Args:
+        embeddings: 청크 임베딩 [청크 수, d] (정규화 전)
+        weights: 청크별 토큰 수 (weighted 풀링에 사용)
+        pooling: mean 또는 weighted
+
+    Returns:
+        np.ndarray: L2 정규화된 float32 벡터 (1차원)
+    """
+    embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    if pooling == "weighted":
+        pooled = np.average(embeddings, axis=0, weights=np.asarray(weights, dtype=np.float32))
+    else:
+        pooled = embeddings.mean(axis=0)
+    return (pooled / np.linalg.norm(pooled)).astype(np.float32)
+
+
+class QueryTokenStats:
+    """쿼리별 토큰 수/청크 수의 최근 구간 분포 (/api/health 노출용, 스레드 안전)"""
+
+    def __init__(self, max_tokens: int, window: int = 1024):
+        self.max_tokens = max_tokens
+        self._tokens = deque(maxlen=window)
+        self._chunks = deque(maxlen=window)
+        self._over_limit = 0
+        self._queries = 0
+        self._lock = threading.Lock()
+
+    def record(self, tokens: int, chunks: int) -> None:
+        with self._lock:
+            self._tokens.append(tokens)
+            self._chunks.append(chunks)
+            self._queries += 1
+            self._over_limit += chunks > 1
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: 누적 쿼리 수, 최대 길이 초과(청킹) 쿼리 수, 최근 구간 토큰 수 분위수/구간별 개수, 평균 청크 수
+        """
+        with self._lock:
+            tokens = np.array(self._tokens)
+            chunks = np.array(self._chunks)
+            queries, over_limit = self._queries, self._over_limit
+        result = {"queries": queries, "chunked": over_limit, "max_tokens": self.max_tokens}
+        if len(tokens):
+            edges = np.searchsorted(TOKEN_BUCKETS, tokens)  # 각 쿼리가 속한 구간 번호
+            labels = [f"<={limit}" for limit in TOKEN_BUCKETS] + [f">{TOKEN_BUCKETS[-1]}"]
+            result.update({
+                "tokens_mean": round(float(tokens.mean()), 1),
+                "tokens_p50": int(np.percentile(tokens, 50)),
+                "tokens_p99": int(np.percentile(tokens, 99)),
+                "tokens_max": int(tokens.max()),
+                "chunks_mean": round(float(chunks.mean()), 2),
+                "histogram": {label: int(count)
+                              for label, count in zip(labels, np.bincount(edges, minlength=len(labels)))},
+            })
+        return result
+
+
+class QueryChunker:
+    """
+    토크나이저를 한 번만 거쳐 긴 쿼리를 청크 단위로 인코딩하는 인코더 래퍼
+
+    SentenceTransformer의 tokenizer와 forward(특성 딕셔너리 → sentence_embedding)를 직접 사용하며,
+    torch/ONNX 백엔드 모두 같은 경로로 동작합니다.
+    """
+
+    def __init__(self, model, max_tokens: int = QUERY_MAX_TOKENS, overlap: int = QUERY_CHUNK_OVERLAP,
+                 pooling: str = QUERY_CHUNK_POOLING):
+        """
+        Args:
+            model: 로드된 SentenceTransformer
+            max_tokens: 청크당 최대 토큰 수 (특수 토큰 포함, 0이면 모델 max_seq_length)
+            overlap: 이웃 청크가 겹치는 토큰 수
+            pooling: 청크 임베딩 풀링 방식 (mean 또는 weighted)
+
+        Raises:
+            ValueError: 알 수 없는 풀링 방식인 경우
+        """
+        if pooling not in POOLING_MODES:
+            raise ValueError(f"알 수 없는 청크 풀링 방식: {pooling} (사용 가능: {', '.join(POOLING_MODES)})")
+        self.model = model
+        self.tokenizer = model.tokenizer
+        self.max_tokens = min(max_tokens or model.max_seq_length, model.max_seq_length)
+        self.body_tokens = self.max_tokens - self.tokenizer.num_special_tokens_to_add(pair=False)
+        self.overlap = overlap
+        self.pooling = pooling
+        self._token_type_ids = "token_type_ids" in self.tokenizer.model_input_names
+        self.token_stats = QueryTokenStats(self.max_tokens)
+
+    def encode(self, texts: list) -> np.ndarray:
+        """
+        텍스트 목록을 토크나이즈 → 청크 분할 → 배치 forward → 풀링해 쿼리 벡터로 변환합니다.
+
+        Args:
+            texts (list[str]): 대화 분석 텍스트 목록
+
+        Returns:
+            np.ndarray: L2 정규화된 float32 행렬 [len(texts), d]
+        """
+        # 잘라내지 않고 전체 토큰을 얻어야 청크로 나눌 수 있음 (긴 입력 경고 억제)
+        token_ids = self.tokenizer(texts, add_special_tokens=False, truncation=False, verbose=False)["input_ids"]
+
+        chunks, owners = [], []
+        for i, ids in enumerate(token_ids):
+            text_chunks = split_token_chunks(ids, self.body_tokens, self.overlap)
+            self.token_stats.record(len(ids), len(text_chunks))
+            chunks.extend(text_chunks)
+            owners.extend([i] * len(text_chunks))
+
+        embeddings = self._forward(chunks)
+        owners = np.asarray(owners)
+        return np.stack([
+            pool_chunk_embeddings(embeddings[owners == i], [len(chunks[j]) for j in np.flatnonzero(owners == i)],
+                                  self.pooling)
+            for i in range(len(texts))
+        ])
+
+    def _forward(self, chunks: list) -> np.ndarray:
+        """청크(토큰 ID)에 특수 토큰을 붙이고 길이순 배치로 모델을 실행합니다. (패딩 최소화)"""
+        import torch
+
+        order = sorted(range(len(chunks)), key=lambda i: len(chunks[i]))
+        embeddings = [None] * len(chunks)
+        for start in range(0, len(order), FORWARD_BATCH):
+            batch = order[start:start + FORWARD_BATCH]
+            encoded = {"input_ids": [self.tokenizer.build_inputs_with_special_tokens(chunks[i]) for i in batch]}
+            if self._token_type_ids:
+                encoded["token_type_ids"] = [self.tokenizer.create_token_type_ids_from_sequences(chunks[i])
+                                             for i in batch]
+            features = self.tokenizer.pad(encoded, return_tensors="pt")
+            with torch.inference_mode():
+                output = self.model(dict(features))["sentence_embedding"]
+            for i, vector in zip(batch, output.float().cpu().numpy()):
+                embeddings[i] = vector
+        return np.stack(embeddings).astype(np.float32)
+
+    def stats(self) -> dict:
+        return {**self.token_stats.stats(), "overlap": self.overlap, "pooling": self.pooling}
@@ -0,0 +1,81 @@
+"""
+명언 근접 중복 제거 모듈
+같은 명언이 저자 표기만 다르게 여러 번 들어 있는 경우(예: 'Lailah Gifty Akita, Pearls of Wisdom')
+코사인 유사도가 임계값 이상인 벡터를 ANN 인덱스로 찾아 하나의 대표 슬롯으로 묶습니다.
+대표가 아닌 슬롯(별칭)은 검색 인덱스에서 빠지고, 별칭 → 대표 슬롯 매핑은 산출물에 기록됩니다.
+"""
+
+import math
+
+import numpy as np
+
+from .index_spec import ADD_BATCH_ROWS, IndexSpec, build_faiss_index
+
+DEDUP_THRESHOLD = 0.97
+DEDUP_NEIGHBORS = 10
+EXACT_DEDUP_MAX_ROWS = 20000  # 이보다 적으면 exact 인덱스로 이웃 탐색
+
+
+def _neighbor_index(vectors: np.ndarray, slots: np.ndarray):
+    """중복 탐색용 인덱스 (작은 코퍼스는 exact, 큰 코퍼스는 IVF-Flat ANN)"""
+    if len(slots) <= EXACT_DEDUP_MAX_ROWS:
+        spec = IndexSpec()
+    else:
+        nlist = int(min(65536, 4 * math.sqrt(len(slots))))
+        spec = IndexSpec(kind="ivf_flat", nlist=nlist, nprobe=8)
+    return build_faiss_index(vectors, spec, ids=slots)
+
+
+def find_near_duplicates(vectors: np.ndarray, live_slots: np.ndarray, threshold: float = DEDUP_THRESHOLD,
+                         neighbors: int = DEDUP_NEIGHBORS) -> np.ndarray:
+    """
+    코사인 유사도 threshold 이상인 근접 중복 슬롯을 대표 슬롯으로 묶습니다.
+
+    슬롯 번호 순서대로 아직 묶이지 않은 슬롯을 대표로 삼고, 그 이웃 중 임계값 이상이면서
+    아직 묶이지 않은 뒤쪽 슬롯을 별칭으로 흡수합니다. (A~B, B~C 연쇄로 A와 C가 묶이지 않도록
+    union-find 대신 대표 기준 그룹핑 사용, 같은 입력이면 항상 같은 결과)
+
+    Args:
+        vectors: L2 정규화된 슬롯 벡터 [슬롯 수, d] (메모리 매핑 배열 가능)
+        live_slots: 대상 슬롯 ID (톰스톤 제외, 오름차순)
+        threshold: 중복으로 볼 코사인 유사도 하한
+        neighbors: 슬롯마다 확인할 이웃 수
+
+    Returns:
+        np.ndarray: int64 [슬롯 수] 슬롯별 대표 슬롯 (대표는 자기 자신, 대상이 아닌 슬롯은 -1)
+    """
+    canonical = np.full(len(vectors), -1, dtype=np.int64)
+    live_slots = np.asarray(live_slots, dtype=np.int64)
+    canonical[live_slots] = live_slots
+    if len(live_slots) < 2:
+        return canonical
+
+    index = _neighbor_index(vectors, live_slots)
+    k = min(neighbors + 1, len(live_slots))  # 자기 자신 포함
+    similar = {}
+    for start in range(0, len(live_slots), ADD_BATCH_ROWS):
+        batch = live_slots[start:start + ADD_BATCH_ROWS]
+        scores, found = index.search(np.ascontiguousarray(vectors[batch], dtype=np.float32), k)
+        hits = (scores >= threshold) & (found > batch[:, None])
+        for row in np.flatnonzero(hits.any(axis=1)):
+            similar[int(batch[row])] = found[row][hits[row]]
+
+    for leader in sorted(similar):
+        if canonical[leader] != leader:
+            continue  # 이미 앞선 대표에 흡수된 슬롯
+        members = similar[leader]
+        members = members[canonical[members] == members]
+        canonical[members] = leader
+    return canonical
+
+
+def dedup_summary(canonical: np.ndarray) -> dict:
+    """대표/별칭 개수 요약"""
+    live = canonical >= 0
+    is_canonical = canonical == np.arange(len(canonical))
+    aliases = canonical[live & ~is_canonical]
+    return {
+        "canonical_rows": int(np.count_nonzero(is_canonical)),
+        "rows_collapsed": int(len(aliases)),
+        "clusters": int(len(np.unique(aliases))),
+    }
@@ -0,0 +1,297 @@
+"""
+임베딩 중심점 폴백 모듈
+메인 검색 엔진(대형 모델 + FAISS)을 쓸 수 없을 때의 저하 모드입니다.
+빌드 시 주요 카테고리 태그마다 경량 다국어 모델(multilingual MiniLM)로 중심점 벡터와 대표 명언 몇 개를 미리 계산해 두고,
+런타임에는 쿼리 하나만 경량 모델로 임베딩해 NumPy 내적으로 고릅니다. (FAISS 불필요, 산출물 로드는 수 ms)
+폴백 모델이 지원하지 않는 언어의 쿼리(예: 영어 전용 모델로 빌드한 산출물 + 한국어 분석)는
+중심점 폴백을 건너뛰고 호출 측의 키워드 기반 상황별 명언을 사용합니다.
+
+디렉토리 구성 (기본값: vectorDB/fallback/):
+    fallback.json      - 포맷 버전, 모델 경로, 지원 언어, 카테고리 목록, 대표 명언 목록
+    centroids.npy      - float32 [카테고리 수, d] 정규화된 카테고리 중심점
+    quote_vectors.npy  - float32 [대표 명언 수, d] 정규화된 대표 명언 벡터
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+
+from .model_registry import MODEL_TIERS, detect_language
+
+FORMAT_VERSION = 1
+FALLBACK_DIR = os.getenv("QUOTE_FALLBACK_DIR", "vectorDB/fallback")
+FALLBACK_MODEL_PATH = "./models/sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+# 폴백 산출물을 읽지 못했을 때 다시 시도하는 간격 (서버 시작 후 빌드한 산출물도 재시작 없이 사용)
+FALLBACK_RETRY_SECONDS = float(os.getenv("QUOTE_FALLBACK_RETRY_SECONDS", "60"))
+
+FALLBACK_CATEGORIES = 64  # 중심점을 만들 상위 태그 수
+MEMBERS_PER_CATEGORY = 256  # 중심점 계산에 쓰는 태그별 표본 명언 수
+QUOTES_PER_CATEGORY = 5  # 태그별로 저장하는 대표 명언 수
+FALLBACK_TOP_CATEGORIES = 3  # 검색 시 대표 명언을 모으는 가까운 카테고리 수
+
+
+def fallback_languages(model_path: str) -> tuple:
+    """폴백 모델의 지원 언어 (모델 티어에 등록된 모델이면 티어의 언어, 그 밖의 모델은 다국어로 간주)"""
+    model_id = os.path.basename(os.path.normpath(model_path))
+    for tier in MODEL_TIERS.values():
+        if tier.model_id == model_id:
+            return tier.languages
+    return ("*",)
+
+
+def _fallback_text(metadata, slot: int) -> str:
+    """중심점 계산용 텍스트 (인사이트가 있으면 인사이트, 없으면 명언)"""
+    return metadata.get(slot, "insight") or metadata.get(slot, "quote")
+
+
+def build_centroid_fallback(metadata, filter_index, out_dir: str = FALLBACK_DIR,
+                            model_path: str = FALLBACK_MODEL_PATH, num_categories: int = FALLBACK_CATEGORIES,
+                            members_per_category: int = MEMBERS_PER_CATEGORY,
+                            quotes_per_category: int = QUOTES_PER_CATEGORY, seed: int = 0) -> dict:
+    """
+    카테고리별 중심점과 대표 명언으로 폴백 산출물을 빌드합니다.
+
+    Args:
+        metadata: QuoteMetadataStore (슬롯 순서)
+        filter_index: QuoteFilterIndex (태그별 슬롯 목록, 대표 슬롯만 포함)
+        out_dir: 저장할 디렉토리 (기존 내용은 교체)
+        model_path: 경량 SentenceTransformer 모델 경로 (한국어 분석에 쓰려면 다국어 모델)
+        num_categories: 중심점을 만들 상위 태그 수
+        members_per_category: 태그별 표본 명언 수
+        quotes_per_category: 태그별 대표 명언 수
+        seed: 표본 추출 시드
+
+    Returns:
+        dict: {'categories': 카테고리 수, 'quotes': 대표 명언 수, 'dim': 차원}
+    """
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_path, device="cpu")
+    rng = np.random.default_rng(seed)
+
+    categories = []
+    centroids = []
+    quotes = []
+    quote_vectors = []
+    for term, _ in filter_index.most_common("tag", num_categories):
+        slots = np.asarray(filter_index.postings("tag", term))
+        if len(slots) > members_per_category:
+            slots = np.sort(rng.choice(slots, size=members_per_category, replace=False))
+        vectors = model.encode([_fallback_text(metadata, int(slot)) for slot in slots], batch_size=64,
+                               convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        centroid = vectors.mean(axis=0)
+        centroid /= max(np.linalg.norm(centroid), 1e-12)
+
+        # 중심점에 가장 가까운 명언부터 (같은 문구는 한 번만) 대표로 선택
+        seen = set()
+        category = len(categories)
+        for i in np.argsort(-(vectors @ centroid)):
+            row = metadata.row(int(slots[i]))
+            if row["quote"] in seen:
+                continue
+            seen.add(row["quote"])
+            quotes.append({"quote": row["quote"], "author": row["author"], "category": row["category"],
+                           "centroid": category})
+            quote_vectors.append(vectors[i])
+            if len(seen) >= quotes_per_category:
+                break
+        categories.append(term)
+        centroids.append(centroid)
+
+    if not categories:
+        raise ValueError("폴백 중심점을 만들 카테고리 태그가 없습니다.")
+
+    tmp_dir = out_dir.rstrip("/\\") + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, "centroids.npy"), np.stack(centroids).astype(np.float32))
+    np.save(os.path.join(tmp_dir, "quote_vectors.npy"), np.stack(quote_vectors).astype(np.float32))
+    with open(os.path.join(tmp_dir, "fallback.json"), "w", encoding="utf-8") as f:
+        json.dump({"version": FORMAT_VERSION, "model_path": model_path,
+                   "languages": list(fallback_languages(model_path)), "categories": categories,
+                   "quotes": quotes}, f, ensure_ascii=False)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return {"categories": len(categories), "quotes": len(quotes), "dim": int(centroids[0].shape[0])}
+
+
+class CentroidFallback:
+    """
+    카테고리 중심점 기반 폴백 검색
+
+    산출물(JSON + 작은 npy)은 생성 시 바로 로드됩니다. 경량 모델은 워밍업(load_model)에서 로드하며,
+    요청 경로에서는 로드하지 않고 백그라운드 로드만 시작합니다. 모델 로드 실패는 한 번만 기록/출력합니다.
+    """
+
+    def __init__(self, path: str = FALLBACK_DIR):
+        """
+        Args:
+            path: build_centroid_fallback으로 만든 디렉토리
+        """
+        with open(os.path.join(path, "fallback.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 폴백 산출물 버전: {meta.get('version')}")
+
+        self.path = path
+        self.model_path = meta["model_path"]
+        self.languages = tuple(meta.get("languages") or fallback_languages(self.model_path))
+        self.categories = meta["categories"]
+        self.quotes = meta["quotes"]
+        self.centroids = np.load(os.path.join(path, "centroids.npy"))
+        self.quote_vectors = np.load(os.path.join(path, "quote_vectors.npy"))
+        self._quote_centroids = np.array([quote["centroid"] for quote in self.quotes])
+
+        self._model = None
+        self._model_loading = False
+        self._model_lock = threading.Lock()
+        self.model_error = None
+
+    @property
+    def is_ready(self) -> bool:
+        """경량 모델이 로드되어 바로 검색할 수 있는지 여부"""
+        return self._model is not None
+
+    def load_model(self) -> bool:
+        """
+        경량 모델을 로드합니다. (실패하면 오류를 한 번만 기록/출력하고 이후 호출은 바로 False)
+
+        Returns:
+            bool: 모델을 사용할 수 있는지 여부
+        """
+        if self._model is None and self.model_error is None:
+            with self._model_lock:
+                if self._model is None and self.model_error is None:
+                    try:
+                        from sentence_transformers import SentenceTransformer
+
+                        self._model = SentenceTransformer(self.model_path, device="cpu")
+                    except Exception as e:
+                        self.model_error = str(e)
+                        print(f"⚠️ 중심점 폴백 모델 로드 실패: {e} (키워드 기반 폴백 명언 사용)")
+        return self._model is not None
+
+    def load_model_in_background(self) -> None:
+        """요청 경로용 - 모델이 아직 없으면 백그라운드 스레드에서 한 번만 로드를 시작합니다."""
+        with self._model_lock:
+            if self._model is not None or self.model_error is not None or self._model_loading:
+                return
+            self._model_loading = True
+        threading.Thread(target=self.load_model, name="centroid-fallback-model", daemon=True).start()
+
+    def _get_model(self):
+        if not self.load_model():
+            raise RuntimeError(f"중심점 폴백 모델을 사용할 수 없습니다: {self.model_error}")
+        return self._model
+
+    def supports(self, text: str) -> bool:
+        """쿼리 언어를 폴백 모델이 지원하는지 여부"""
+        return "*" in self.languages or detect_language(text) in self.languages
+
+    def search(self, chat_analysis: str, top_k: int = 3) -> list:
+        """
+        가까운 카테고리 중심점의 대표 명언 중 쿼리와 가장 비슷한 명언을 고릅니다.
+
+        Args:
+            chat_analysis (str): 대화 분석 결과 텍스트
+            top_k (int): 반환할 명언 개수 (기본값: 3)
+
+        Returns:
+            list: [{'quote': str, 'author': str, 'category': str, 'similarity': float}]
+        """
+        query = self._get_model().encode([chat_analysis], convert_to_numpy=True, normalize_embeddings=True,
+                                         show_progress_bar=False)[0].astype(np.float32)
+
+        top_categories = np.argsort(-(self.centroids @ query))[:FALLBACK_TOP_CATEGORIES]
+        candidates = np.flatnonzero(np.isin(self._quote_centroids, top_categories))
+        scores = self.quote_vectors[candidates] @ query
+        order = candidates[np.argsort(-scores)]
+
+        results = []
+        seen = set()
+        for i, score in zip(order, np.sort(scores)[::-1]):
+            quote = self.quotes[i]
+            if quote["quote"] in seen:
+                continue
+            seen.add(quote["quote"])
+            results.append({"quote": quote["quote"], "author": quote["author"], "category": quote["category"],
+                            "similarity": float(score)})
+            if len(results) >= top_k:
+                break
+        return results
+
+
+# === 프로세스 전역 폴백 ===
+_centroid_fallback = None
+_centroid_fallback_error = None
+_centroid_fallback_failed_at = None
+_centroid_fallback_lock = threading.Lock()
+
+
+def _should_load_fallback() -> bool:
+    return _centroid_fallback is None and (
+        _centroid_fallback_failed_at is None or time.monotonic() - _centroid_fallback_failed_at >= FALLBACK_RETRY_SECONDS)
+
+
+def get_centroid_fallback() -> CentroidFallback | None:
+    """
+    프로세스 전역에서 공유하는 중심점 폴백을 반환합니다.
+
+    산출물을 읽지 못하면 FALLBACK_RETRY_SECONDS가 지난 뒤 다시 시도합니다.
+
+    Returns:
+        CentroidFallback | None: 산출물이 없거나 읽을 수 없으면 None
+    """
+    global _centroid_fallback, _centroid_fallback_error, _centroid_fallback_failed_at
+
+    if _should_load_fallback():
+        with _centroid_fallback_lock:
+            if _should_load_fallback():
+                try:
+                    _centroid_fallback = CentroidFallback()
+                    _centroid_fallback_error = None
+                except Exception as e:
+                    _centroid_fallback_error = str(e)
+                    _centroid_fallback_failed_at = time.monotonic()
+    return _centroid_fallback
+
+
+def warm_up_centroid_fallback() -> bool:
+    """
+    중심점 폴백 산출물과 경량 모델을 미리 로드합니다. (폴백 모드 진입/워밍업 스레드에서 호출)
+
+    Returns:
+        bool: 중심점 폴백을 바로 사용할 수 있는지 여부
+    """
+    fallback = get_centroid_fallback()
+    return fallback is not None and fallback.load_model()
+
+
+def find_centroid_fallback_quotes(chat_analysis: str, top_k: int = 3) -> list:
+    """
+    중심점 폴백으로 명언을 고르는 함수 (사용할 수 없으면 빈 리스트)
+
+    Args:
+        chat_analysis (str): 대화 분석 결과 텍스트
+        top_k (int): 반환할 명언 개수 (기본값: 3)
+
+    Returns:
+        list: 명언 리스트 (폴백 산출물/경량 모델을 쓸 수 없거나 쿼리 언어를 지원하지 않으면 [])
+    """
+    fallback = get_centroid_fallback()
+    if fallback is None or not fallback.supports(chat_analysis):
+        return []
+    if not fallback.is_ready:
+        fallback.load_model_in_background()  # 요청 경로에서는 모델 로드를 기다리지 않음
+        return []
+    try:
+        return fallback.search(chat_analysis, top_k)
+    except Exception as e:
+        print(f"⚠️ 중심점 폴백 검색 실패: {e}")
+        return []
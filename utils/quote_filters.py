@@ -0,0 +1,222 @@
+"""
+명언 필터 인덱스 모듈
+카테고리 태그와 저자별로 해당 슬롯 ID 목록(포스팅 리스트)을 미리 만들어 두고,
+검색 시 필터 조건을 슬롯 비트맵으로 바꿔 FAISS ID 셀렉터로 검색에 직접 넘깁니다.
+(결과를 많이 뽑은 뒤 파이썬에서 걸러내지 않으므로 제한적인 필터에서도 지연 시간이 일정)
+
+디렉토리 구성:
+    meta.json           - 포맷 버전, 슬롯 수, 필드별 어휘 목록
+    live.npy            - 검색 대상 슬롯 표시 (톰스톤 제외)
+    <필드>.offsets.npy  - int64 [어휘 수 + 1] 포스팅 오프셋
+    <필드>.ids.npy      - int32 정렬된 슬롯 ID (오프셋 구간별)
+
+필터 형식 (모든 조건은 AND, 각 목록 안에서는 OR):
+    {"tags": ["hope", "love"], "authors": [...], "exclude_tags": [...], "exclude_authors": [...]}
+"""
+
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .embedding_cache import normalize_text
+
+FORMAT_VERSION = 1
+FILTER_FIELDS = ("tag", "author")
+FILTER_KEYS = {
+    "tags": ("tag", False),
+    "authors": ("author", False),
+    "exclude_tags": ("tag", True),
+    "exclude_authors": ("author", True),
+}
+
+# 필터에 걸리는 슬롯이 이보다 적으면 ANN 대신 해당 슬롯만 exact 스캔 (HNSW/IVF의 recall 저하 방지)
+EXACT_SCAN_MAX_ROWS = 4096
+SELECTION_CACHE_SIZE = 64
+
+
+def normalize_term(text: str) -> str:
+    """필터 비교용 정규화 (유니코드 NFC, 공백 정리, 소문자)"""
+    return normalize_text(text).lower()
+
+
+def split_tags(category: str) -> list:
+    """'humor, knowledge, pleasure' 형태의 카테고리를 정규화된 태그 목록으로 분리합니다."""
+    return [tag for tag in (normalize_term(part) for part in (category or "").split(",")) if tag]
+
+
+def build_filter_index(metadata, out_dir: str, live: np.ndarray | None = None,
+                       canonical: np.ndarray | None = None) -> dict:
+    """
+    메타데이터 저장소로부터 태그/저자 필터 인덱스를 빌드합니다.
+
+    Args:
+        metadata: QuoteMetadataStore (슬롯 순서)
+        out_dir: 저장할 디렉토리 (기존 내용은 교체)
+        live: 검색 대상 슬롯 표시 (bool [슬롯 수], None이면 전체)
+        canonical: 슬롯별 대표 슬롯 (quote_dedup, -1은 제외). 지정하면 대표 슬롯만 검색 대상이며
+                   별칭 슬롯의 태그/저자도 대표 슬롯의 포스팅으로 합쳐집니다. (live보다 우선)
+
+    Returns:
+        dict: 필드별 어휘 수
+    """
+    num_rows = len(metadata)
+    if canonical is None:
+        canonical = np.arange(num_rows) if live is None else np.where(live, np.arange(num_rows), -1)
+    live = canonical == np.arange(num_rows)
+
+    postings = {field: {} for field in FILTER_FIELDS}
+    for slot in np.flatnonzero(canonical >= 0):
+        target = int(canonical[slot])
+        slot = int(slot)
+        for tag in set(split_tags(metadata.get(slot, "category"))):
+            postings["tag"].setdefault(tag, set()).add(target)
+        author = normalize_term(metadata.get(slot, "author"))
+        if author:
+            postings["author"].setdefault(author, set()).add(target)
+
+    tmp_dir = out_dir.rstrip("/\\") + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    vocab = {}
+    for field in FILTER_FIELDS:
+        terms = sorted(postings[field])
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(postings[field][term]) for term in terms])
+        ids = np.fromiter((slot for term in terms for slot in sorted(postings[field][term])),
+                          dtype=np.int32, count=int(offsets[-1]))
+        np.save(os.path.join(tmp_dir, f"{field}.offsets.npy"), offsets)
+        np.save(os.path.join(tmp_dir, f"{field}.ids.npy"), ids)
+        vocab[field] = terms
+
+    np.save(os.path.join(tmp_dir, "live.npy"), np.asarray(live, dtype=bool))
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"version": FORMAT_VERSION, "rows": num_rows, "vocab": vocab}, f, ensure_ascii=False)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return {field: len(terms) for field, terms in vocab.items()}
+
+
+class FilterSelection:
+    """필터 조건 하나를 슬롯 비트맵으로 만든 결과 (FAISS 셀렉터가 비트맵 메모리를 참조하므로 함께 보관)"""
+
+    def __init__(self, mask: np.ndarray):
+        import faiss
+
+        self.count = int(np.count_nonzero(mask))
+        self.bitmap = np.packbits(mask, bitorder="little")
+        # 비트맵 길이는 비트 수가 아니라 바이트 수 (ID가 그 범위를 넘으면 셀렉터가 제외)
+        self.selector = faiss.IDSelectorBitmap(len(self.bitmap), faiss.swig_ptr(self.bitmap))
+        # 적은 수의 슬롯만 남는 필터는 exact 스캔용 슬롯 목록도 준비
+        self.slots = np.flatnonzero(mask) if self.count <= EXACT_SCAN_MAX_ROWS else None
+        self.num_rows = len(mask)
+
+    def mask(self) -> np.ndarray:
+        """허용 슬롯 표시 (bool [슬롯 수], 비트맵에서 복원)"""
+        return np.unpackbits(self.bitmap, count=self.num_rows, bitorder="little").view(bool)
+
+
+class QuoteFilterIndex:
+    """
+    태그/저자 필터 인덱스 (읽기 전용, 포스팅은 메모리 매핑)
+
+    같은 필터 조건의 비트맵은 LRU로 캐시되어 반복 요청 시 다시 계산하지 않습니다.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: build_filter_index로 만든 디렉토리
+        """
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 필터 인덱스 버전: {meta.get('version')}")
+
+        self.path = path
+        self.num_rows = int(meta["rows"])
+        self.live = np.load(os.path.join(path, "live.npy"), mmap_mode="r")
+        self._terms = {field: {term: i for i, term in enumerate(meta["vocab"][field])} for field in FILTER_FIELDS}
+        self._offsets = {field: np.load(os.path.join(path, f"{field}.offsets.npy"), mmap_mode="r")
+                         for field in FILTER_FIELDS}
+        self._ids = {field: np.load(os.path.join(path, f"{field}.ids.npy"), mmap_mode="r") for field in FILTER_FIELDS}
+
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def postings(self, field: str, term: str) -> np.ndarray:
+        """필드/어휘의 슬롯 ID 목록 (없는 어휘면 빈 배열)"""
+        i = self._terms[field].get(normalize_term(term))
+        if i is None:
+            return np.empty(0, dtype=np.int32)
+        return self._ids[field][self._offsets[field][i]:self._offsets[field][i + 1]]
+
+    def most_common(self, field: str, n: int) -> list:
+        """포스팅이 많은 순으로 상위 n개 어휘와 슬롯 수를 반환합니다."""
+        counts = np.diff(self._offsets[field])
+        top = np.argsort(-counts, kind="stable")[:n]
+        terms = list(self._terms[field])
+        return [(terms[i], int(counts[i])) for i in top]
+
+    @staticmethod
+    def normalize_filters(filters: dict) -> tuple:
+        """
+        필터 딕셔너리를 검증하고 캐시 키로 쓸 정규화된 튜플로 바꿉니다.
+
+        Raises:
+            ValueError: 알 수 없는 키이거나 값이 문자열/문자열 목록이 아닌 경우
+        """
+        if not isinstance(filters, dict):
+            raise ValueError("filters는 객체여야 합니다.")
+        key = []
+        for name, values in filters.items():
+            if name not in FILTER_KEYS:
+                raise ValueError(f"알 수 없는 필터: {name} (사용 가능: {', '.join(FILTER_KEYS)})")
+            if isinstance(values, str):
+                values = [values]
+            if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+                raise ValueError(f"{name} 필터는 문자열 또는 문자열 목록이어야 합니다.")
+            terms = tuple(sorted({normalize_term(v) for v in values if v.strip()}))
+            if terms:
+                key.append((name, terms))
+        return tuple(sorted(key))
+
+    def select(self, filters: dict) -> FilterSelection | None:
+        """
+        필터 조건에 맞는 슬롯 비트맵을 반환합니다.
+
+        Args:
+            filters: 필터 딕셔너리 (모듈 설명 참고)
+
+        Returns:
+            FilterSelection | None: 조건이 비어 있으면 None (필터 없이 검색)
+        """
+        key = self.normalize_filters(filters)
+        if not key:
+            return None
+
+        with self._cache_lock:
+            selection = self._cache.get(key)
+            if selection is not None:
+                self._cache.move_to_end(key)
+                return selection
+
+        mask = self.live.copy()
+        for name, terms in key:
+            field, exclude = FILTER_KEYS[name]
+            matched = np.zeros(self.num_rows, dtype=bool)
+            for term in terms:
+                matched[self.postings(field, term)] = True
+            mask &= ~matched if exclude else matched
+        selection = FilterSelection(mask)
+
+        with self._cache_lock:
+            self._cache[key] = selection
+            while len(self._cache) > SELECTION_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return selection
@@ -0,0 +1,216 @@
+"""
+명언 BM25 어휘 검색 모듈
+quote + insight + 카테고리 태그에 대한 역색인을 오프라인에서 만들어 두고,
+검색 시 쿼리 토큰의 포스팅만 읽어 BM25 점수를 계산합니다.
+임베딩 검색이 놓치는 정확한 키워드 일치를 보완하며, 하이브리드 검색에서 RRF로 결합됩니다.
+
+디렉토리 구성:
+    meta.json     - 포맷 버전, 슬롯 수, 문서 수, BM25 파라미터(k1, b), 어휘 목록
+    offsets.npy   - int64 [어휘 수 + 1] 포스팅 오프셋
+    ids.npy       - int32 슬롯 ID (어휘별로 정렬)
+    tfs.npy       - uint16 단어 빈도
+    doc_norm.npy  - float32 [슬롯 수] 문서 길이 정규화 항 k1 * (1 - b + b * 길이 / 평균 길이)
+"""
+
+import json
+import math
+import os
+import re
+import shutil
+from array import array
+
+import numpy as np
+
+from .quote_filters import normalize_term
+
+FORMAT_VERSION = 1
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+
+_WORD_RE = re.compile(r"\w+")
+_HANGUL_RE = re.compile(r"[가-힣]")
+
+# 포스팅이 지나치게 길어지는 영어 불용어 (검색 품질보다 색인 크기/쿼리 비용에 영향)
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have he her his i if in into is it its me my no not of on or our
+she so that the their them they this to was we were what when which who will with you your
+""".split())
+
+
+def tokenize(text: str) -> list:
+    """
+    색인/쿼리 공용 토크나이저
+
+    소문자 단어 단위로 자르고, 한글 단어는 조사·어미 변화에 대응하도록 글자 bigram을 함께 만듭니다.
+    (예: '행복한' → ['행복한', '행복', '복한'])
+    """
+    tokens = []
+    for word in _WORD_RE.findall(normalize_term(text or "")):
+        if word in STOPWORDS or (len(word) == 1 and not _HANGUL_RE.match(word)):
+            continue
+        tokens.append(word)
+        if len(word) > 2 and _HANGUL_RE.search(word):
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def document_tokens(metadata, slot: int) -> list:
+    """메타데이터 한 행의 색인 대상 토큰 (quote + insight + 카테고리 태그)"""
+    return tokenize(" ".join((metadata.get(slot, "quote"), metadata.get(slot, "insight"),
+                              metadata.get(slot, "category").replace(",", " "))))
+
+
+def build_lexical_index(metadata, out_dir: str, live: np.ndarray | None = None,
+                        k1: float = BM25_K1, b: float = BM25_B) -> dict:
+    """
+    메타데이터 저장소로부터 BM25 역색인을 빌드합니다.
+
+    Args:
+        metadata: QuoteMetadataStore (슬롯 순서)
+        out_dir: 저장할 디렉토리 (기존 내용은 교체)
+        live: 색인할 슬롯 표시 (bool [슬롯 수], None이면 전체)
+        k1, b: BM25 파라미터
+
+    Returns:
+        dict: {'terms': 어휘 수, 'postings': 포스팅 수, 'docs': 문서 수}
+    """
+    num_rows = len(metadata)
+    if live is None:
+        live = np.ones(num_rows, dtype=bool)
+
+    # 포스팅을 파이썬 리스트 대신 타입 배열로 모아 대용량 코퍼스에서도 메모리를 적게 사용
+    vocab = {}
+    term_ids = array("i")
+    doc_ids = array("i")
+    tfs = array("H")
+    doc_len = np.zeros(num_rows, dtype=np.float32)
+    for slot in np.flatnonzero(live):
+        slot = int(slot)
+        counts = {}
+        for token in document_tokens(metadata, slot):
+            counts[token] = counts.get(token, 0) + 1
+        doc_len[slot] = sum(counts.values())
+        for token, count in counts.items():
+            term_ids.append(vocab.setdefault(token, len(vocab)))
+            doc_ids.append(slot)
+            tfs.append(min(count, 65535))
+
+    num_docs = int(np.count_nonzero(live))
+    avg_len = float(doc_len[live].mean()) if num_docs else 1.0
+    doc_norm = (k1 * (1 - b + b * doc_len / max(avg_len, 1e-9))).astype(np.float32)
+
+    # 어휘 ID(정렬된 어휘 순서) 기준 CSR로 재배열
+    terms = sorted(vocab)
+    rank = np.empty(len(vocab), dtype=np.int32)
+    rank[[vocab[term] for term in terms]] = np.arange(len(terms), dtype=np.int32)
+    term_ranks = rank[np.frombuffer(term_ids, dtype=np.int32)] if len(term_ids) else np.empty(0, dtype=np.int32)
+    order = np.argsort(term_ranks, kind="stable")
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(term_ranks, minlength=len(terms)))
+
+    tmp_dir = out_dir.rstrip("/\\") + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, "offsets.npy"), offsets)
+    np.save(os.path.join(tmp_dir, "ids.npy"), np.frombuffer(doc_ids, dtype=np.int32)[order])
+    np.save(os.path.join(tmp_dir, "tfs.npy"), np.frombuffer(tfs, dtype=np.uint16)[order])
+    np.save(os.path.join(tmp_dir, "doc_norm.npy"), doc_norm)
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"version": FORMAT_VERSION, "rows": num_rows, "docs": num_docs, "k1": k1, "b": b,
+                   "terms": terms}, f, ensure_ascii=False)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return {"terms": len(terms), "postings": len(doc_ids), "docs": num_docs}
+
+
+class QuoteLexicalIndex:
+    """BM25 역색인 (읽기 전용, 포스팅은 메모리 매핑)"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: build_lexical_index로 만든 디렉토리
+        """
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 BM25 색인 버전: {meta.get('version')}")
+
+        self.path = path
+        self.num_rows = int(meta["rows"])
+        self.num_docs = int(meta["docs"])
+        self.k1 = float(meta["k1"])
+        self._terms = {term: i for i, term in enumerate(meta["terms"])}
+        self._offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+        self._ids = np.load(os.path.join(path, "ids.npy"), mmap_mode="r")
+        self._tfs = np.load(os.path.join(path, "tfs.npy"), mmap_mode="r")
+        self._doc_norm = np.load(os.path.join(path, "doc_norm.npy"), mmap_mode="r")
+
+    def search(self, text: str, top_k: int, keywords: list | None = None,
+               mask: np.ndarray | None = None) -> tuple:
+        """
+        BM25 점수 상위 슬롯을 반환합니다.
+
+        Args:
+            text: 쿼리 텍스트 (대화 분석 결과)
+            top_k: 반환할 개수
+            keywords: 추가 키워드 (텍스트 토큰과 함께 쿼리에 포함, 같은 토큰이면 가중치가 누적됨)
+            mask: 허용 슬롯 표시 (bool [슬롯 수], 필터 적용 시)
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (BM25 점수, 슬롯 ID) - 점수 내림차순
+        """
+        query_weights = {}
+        for token in tokenize(" ".join([text or ""] + list(keywords or []))):
+            query_weights[token] = query_weights.get(token, 0) + 1
+
+        all_ids = []
+        all_scores = []
+        for token, weight in query_weights.items():
+            i = self._terms.get(token)
+            if i is None:
+                continue
+            start, end = self._offsets[i], self._offsets[i + 1]
+            ids = np.asarray(self._ids[start:end])
+            tf = np.asarray(self._tfs[start:end], dtype=np.float32)
+            idf = math.log(1 + (self.num_docs - len(ids) + 0.5) / (len(ids) + 0.5))
+            all_ids.append(ids)
+            all_scores.append(weight * idf * tf * (self.k1 + 1) / (tf + self._doc_norm[ids]))
+
+        if not all_ids:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+
+        # 토큰별 기여도를 슬롯 단위로 합산 (쿼리에 걸린 슬롯만 다루는 희소 합산)
+        slots, inverse = np.unique(np.concatenate(all_ids), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(all_scores)).astype(np.float32)
+        if mask is not None:
+            keep = mask[slots]
+            slots, scores = slots[keep], scores[keep]
+
+        if len(scores) > top_k:
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+            slots, scores = slots[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return scores[order], slots[order].astype(np.int64)
+
+
+def reciprocal_rank_fusion(rankings: list, top_k: int, k: int = RRF_K) -> list:
+    """
+    여러 순위 목록을 RRF(reciprocal rank fusion)로 결합합니다. score(d) = Σ 1 / (k + rank)
+
+    Args:
+        rankings: 슬롯 ID 배열의 리스트 (각각 점수 내림차순)
+        top_k: 반환할 개수
+        k: RRF 상수 (클수록 하위 순위의 영향이 커짐)
+
+    Returns:
+        list[tuple[int, float]]: (슬롯 ID, RRF 점수) - 점수 내림차순
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, slot in enumerate(ranking, start=1):
+            slot = int(slot)
+            fused[slot] = fused.get(slot, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: -item[1])[:top_k]
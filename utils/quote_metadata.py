@@ -0,0 +1,171 @@
+"""
+명언 메타데이터 저장소 모듈
+명언/저자/카테고리/인사이트 문자열을 열(column) 단위의 UTF-8 blob과 오프셋 배열로 저장하고,
+검색 시에는 메모리 매핑으로 행 ID만으로 바로 조회합니다. (요청 처리 시 pandas 불필요)
+
+디렉토리 구성:
+    meta.json     - 포맷 버전, 행 수, 필드 목록
+    offsets.npy   - int64 [필드 수, 행 수 + 1] 오프셋 배열 (길이 = offsets[f, i + 1] - offsets[f, i])
+    strings.bin   - 모든 필드 문자열을 이어 붙인 UTF-8 blob
+"""
+
+import json
+import mmap
+import os
+import shutil
+
+import numpy as np
+
+FORMAT_VERSION = 1
+METADATA_FIELDS = ("quote", "author", "category", "insight")
+DEFAULT_CATEGORY = "일반"
+
+
+def clean_author(author_text: str) -> str:
+    """author가 '작가명, 도서명' 형태일 때 작가명만 추출"""
+    if not author_text:
+        return ""
+    return author_text.split(',')[0].strip()
+
+
+def to_text(value) -> str:
+    """NaN/None을 빈 문자열로 바꾸고 문자열로 변환합니다."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value != value:  # NaN
+        return ""
+    return str(value)
+
+
+def write_quote_metadata(records, out_dir: str) -> int:
+    """
+    명언 레코드를 열 단위 메타데이터 저장소로 기록합니다.
+
+    Args:
+        records: {'quote', 'author', 'category', 'insight'} 딕셔너리의 iterable (행 순서 = 인덱스 ID)
+        out_dir: 저장할 디렉토리 (기존 내용은 교체)
+
+    Returns:
+        int: 기록한 행 수
+    """
+    columns = {field: [] for field in METADATA_FIELDS}
+    for record in records:
+        columns["quote"].append(to_text(record.get("quote")))
+        columns["author"].append(clean_author(to_text(record.get("author"))))
+        columns["category"].append(to_text(record.get("category")) or DEFAULT_CATEGORY)
+        columns["insight"].append(to_text(record.get("insight")))
+
+    num_rows = len(columns["quote"])
+    offsets = np.zeros((len(METADATA_FIELDS), num_rows + 1), dtype=np.int64)
+
+    tmp_dir = out_dir.rstrip("/\\") + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    position = 0
+    with open(os.path.join(tmp_dir, "strings.bin"), "wb") as blob:
+        for f, field in enumerate(METADATA_FIELDS):
+            for i, text in enumerate(columns[field]):
+                encoded = text.encode("utf-8")
+                offsets[f, i] = position
+                blob.write(encoded)
+                position += len(encoded)
+            offsets[f, num_rows] = position
+
+    np.save(os.path.join(tmp_dir, "offsets.npy"), offsets)
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"version": FORMAT_VERSION, "rows": num_rows, "fields": list(METADATA_FIELDS)}, f)
+
+    # 완성된 디렉토리로 교체 (읽는 쪽이 반쯤 쓰인 파일을 보지 않도록)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return num_rows
+
+
+def build_quote_metadata(csv_path: str, out_dir: str) -> int:
+    """
+    명언 CSV로부터 메타데이터 저장소를 빌드합니다. (빌드 시점에만 pandas 사용)
+
+    Args:
+        csv_path: quote, author, category(선택), insight(선택) 컬럼을 가진 CSV 경로
+        out_dir: 저장할 디렉토리
+
+    Returns:
+        int: 기록한 행 수
+    """
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    return write_quote_metadata(df.to_dict("records"), out_dir)
+
+
+class QuoteMetadataStore:
+    """
+    메모리 매핑된 명언 메타데이터 저장소 (읽기 전용)
+
+    여러 스레드가 동시에 조회해도 안전하며, 같은 파일을 여는 프로세스들은 페이지 캐시를 공유합니다.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: write_quote_metadata로 만든 디렉토리
+        """
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 메타데이터 버전: {meta.get('version')}")
+
+        self.path = path
+        self.fields = tuple(meta["fields"])
+        self._field_index = {field: i for i, field in enumerate(self.fields)}
+        self._num_rows = int(meta["rows"])
+        self._offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+
+        blob_path = os.path.join(path, "strings.bin")
+        if os.path.getsize(blob_path) > 0:
+            with open(blob_path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._blob = memoryview(self._mmap)
+        else:
+            self._mmap = None
+            self._blob = memoryview(b"")
+
+    def __len__(self) -> int:
+        return self._num_rows
+
+    def get(self, row_id: int, field: str) -> str:
+        """
+        행 ID의 특정 필드 문자열을 반환합니다.
+
+        Args:
+            row_id: 인덱스 행 ID (FAISS 검색 결과 ID)
+            field: 필드명 (quote, author, category, insight)
+
+        Returns:
+            str: 디코딩된 문자열
+        """
+        f = self._field_index[field]
+        start = int(self._offsets[f, row_id])
+        end = int(self._offsets[f, row_id + 1])
+        # memoryview 슬라이스는 복사 없이 blob을 가리키고, 디코딩 시에만 str이 생성됨
+        return str(self._blob[start:end], "utf-8")
+
+    def row(self, row_id: int) -> dict:
+        """
+        행 ID의 모든 필드를 딕셔너리로 반환합니다.
+
+        Args:
+            row_id: 인덱스 행 ID
+
+        Returns:
+            dict: {'quote', 'author', 'category', 'insight'}
+        """
+        return {field: self.get(row_id, field) for field in self.fields}
+
+    def close(self) -> None:
+        """메모리 매핑을 해제합니다."""
+        self._blob.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
@@ -3,32 +3,73 @@
 대화 분석 결과를 바탕으로 가장 적합한 명언을 찾는 시스템
 """
 
-import pandas as pd
+import importlib.util
+import logging
 import numpy as np
+import os
+import threading
+import time
 import warnings
-import sys
-from io import StringIO
-
-# 조건부 import
-try:
-    import faiss
-    from sentence_transformers import SentenceTransformer
-    EMBEDDING_AVAILABLE = True
-except ImportError:
-    EMBEDDING_AVAILABLE = False
-
-def find_similar_quote_cosine_silent(chat_analysis: str, top_k: int = 3) -> list:
+from concurrent.futures import ThreadPoolExecutor
+
+from .embedding_cache import EmbeddingCache
+from .encode_batcher import EncodeBatcher
+from .encoder_backend import ENCODER_BACKEND, encoder_id, load_encoder, resolve_backend
+from .index_artifacts import ArtifactPaths, artifact_dir_for
+from .index_spec import (apply_search_params, index_slot_count, load_index_spec, mmr_select, read_faiss_index,
+                         rerank_exact, search_params_with_selector, vectors_path_for)
+from .model_registry import DEFAULT_TIER, ENABLED_TIERS, MODEL_TIERS, get_tier, route_tier
+from .quote_fallback import find_centroid_fallback_quotes
+from .quote_filters import QuoteFilterIndex, build_filter_index
+from .quote_lexical import QuoteLexicalIndex, reciprocal_rank_fusion
+from .quote_metadata import QuoteMetadataStore, build_quote_metadata
+from .query_chunking import QueryChunker, chunking_id
+from .stage_timings import StageTimings
+
+# 임베딩 라이브러리 설치 여부만 확인 (faiss/sentence_transformers/torch는 검색 엔진 로드 시점에 import)
+EMBEDDING_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ("faiss", "sentence_transformers"))
+
+# === 검색 엔진 기본 경로 ===
+MODEL_PATH = "./models/sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
+DATASET_PATH = "Dataset/quotes_with_insights_combined.csv"
+# 인덱스를 메모리 매핑으로 열어 같은 호스트의 워커 프로세스들이 페이지 캐시 한 사본을 공유
+INDEX_MMAP = os.getenv("QUOTE_INDEX_MMAP", "1") != "0"
+
+# === 하이브리드 검색 설정 ===
+SEARCH_MODE = os.getenv("QUOTE_SEARCH_MODE", "hybrid")  # hybrid(BM25 + 벡터, RRF) 또는 dense
+HYBRID_CANDIDATES = int(os.getenv("QUOTE_HYBRID_CANDIDATES", "50"))  # 단계별로 RRF에 넘기는 후보 수
+HYBRID_WORKERS = int(os.getenv("QUOTE_HYBRID_WORKERS", "4"))  # 어휘 검색을 병렬로 돌리는 스레드 수
+
+# === MMR 다양화 설정 ===
+MMR_LAMBDA = float(os.getenv("QUOTE_MMR_LAMBDA", "0.7"))  # 관련도 가중치 (1.0이면 다양화 끔)
+MMR_CANDIDATES = int(os.getenv("QUOTE_MMR_CANDIDATES", "50"))  # 다양화 전에 뽑아 두는 후보 수
+
+# 모델 로드 시 로그/경고를 내는 라이브러리 (프로세스 전역 stdout/stderr는 건드리지 않음)
+NOISY_LIBRARIES = ("sentence_transformers", "transformers", "huggingface_hub", "torch", "optimum", "onnxruntime")
+
+# === 워밍업 ===
+WARMUP_QUERY = "사용자는 새로운 도전 앞에서 불안하지만 성장하고 싶어 합니다."
+
+
+def select_fallback_quotes(chat_analysis: str, top_k: int = 3) -> list:
     """
-    대화 분석 텍스트를 바탕으로 유사한 명언을 찾는 함수
-    
+    메인 검색을 쓸 수 없을 때 폴백 명언을 선택하는 함수
+
+    빌드된 임베딩 중심점 폴백(quote_fallback)이 있으면 의미 기반으로 고르고,
+    그마저 없으면 대화 분석 키워드에 따른 상황별 명언을 사용합니다.
+
     Args:
         chat_analysis (str): 대화 분석 결과 텍스트
         top_k (int): 반환할 명언 개수 (기본값: 3)
-    
+
     Returns:
-        list: 유사한 명언들의 리스트 [{'quote': str, 'author': str, 'category': str, 'similarity': float}]
+        list: 폴백 명언 리스트
     """
-    
+    quotes = find_centroid_fallback_quotes(chat_analysis, top_k)
+    if quotes:
+        print(f"🧭 중심점 폴백 명언 사용: {len(quotes)}개")
+        return quotes
+
     # 대화 분석 기반 동적 폴백 명언들 (빅터 위고 제거)
     analysis_lower = chat_analysis.lower()
     
@@ -118,91 +159,705 @@ def find_similar_quote_cosine_silent(chat_analysis: str, top_k: int = 3) -> list
                 "similarity": 0.80
             }
         ]
+
+    return fallback_quotes[:top_k]
+
+
+_quiet_lock = threading.Lock()
+_quieted = False
+
+
+def quiet_library_logs() -> None:
+    """
+    임베딩 라이브러리의 로그/경고를 오류 수준으로 낮춥니다. (프로세스에서 한 번만 설정)
+
+    로드는 백그라운드 워밍업 스레드에서도 실행되므로, 다른 요청 스레드의 출력까지 삼키는
+    sys.stdout/sys.stderr 교체나 warnings.catch_warnings 대신 라이브러리별 로거와 경고 필터만 조정합니다.
+    """
+    global _quieted
+
+    with _quiet_lock:
+        if _quieted:
+            return
+        for name in NOISY_LIBRARIES:
+            logging.getLogger(name).setLevel(logging.ERROR)
+            warnings.filterwarnings("ignore", module=rf"{name}(\.|$)")
+        if importlib.util.find_spec("transformers") is not None:
+            from transformers.utils import logging as transformers_logging
+
+            transformers_logging.set_verbosity_error()
+        _quieted = True
+
+
+class QuoteRetriever:
+    """
+    프로세스 상주 명언 검색 엔진
+
+    임베딩 모델, FAISS 인덱스, 명언 메타데이터를 최초 1회만 로드하고
+    이후 모든 Flask 세션(스레드)이 같은 인스턴스를 공유합니다.
+    로드는 락으로 보호되며, 로드 이후의 검색은 읽기 전용이라 동시에 호출해도 안전합니다.
+    """
+
+    def __init__(self, model_path: str = MODEL_PATH, artifact_dir: str | None = None,
+                 dataset_path: str = DATASET_PATH, embedding_cache: EmbeddingCache | None = None,
+                 encoder_backend: str = ENCODER_BACKEND):
+        """
+        검색 엔진을 초기화합니다. (실제 로드는 load() 또는 첫 검색 시점에 수행)
+
+        Args:
+            model_path: 로컬 SentenceTransformer 모델 경로
+            artifact_dir: build_index.py 산출물 디렉토리 (기본값: vectorDB/FAISS/<모델 ID>)
+            dataset_path: 명언 CSV 경로 (메타데이터 저장소가 없을 때 빌드 원본으로 사용)
+            embedding_cache: 쿼리 임베딩 캐시 (기본값: 인코더 ID 기준 2단계 캐시)
+            encoder_backend: 쿼리 인코더 백엔드 (torch 또는 int8 양자화 onnx, 사용할 수 없으면 torch)
+        """
+        self.model_path = model_path
+        self.model_id = os.path.basename(os.path.normpath(model_path))
+        self.paths = ArtifactPaths(artifact_dir or artifact_dir_for(self.model_id))
+        self.index_path = self.paths.index
+        self.metadata_path = self.paths.metadata
+        self.dataset_path = dataset_path
+        # 인덱스는 같은 모델의 벡터를 공유하지만, 쿼리 임베딩 캐시는 백엔드/청킹 설정별로 분리
+        self.encoder_backend, backend_error = resolve_backend(model_path, encoder_backend)
+        if backend_error:
+            print(f"⚠️ {backend_error} - PyTorch 인코더 사용")
+        self.encoder_id = encoder_id(self.model_id, self.encoder_backend)
+        self.embedding_cache = embedding_cache or EmbeddingCache(f"{self.encoder_id}#{chunking_id()}")
+
+        self.model = None
+        self.query_chunker = None
+        self.index = None
+        self.index_mmap = False
+        self.index_spec = None
+        self.full_vectors = None
+        self.metadata = None
+        self.filter_index = None
+        self.lexical_index = None
+        self.hybrid_timings = StageTimings()
+        self.encode_timings = StageTimings()
+        # 여러 세션의 캐시 미스 쿼리를 모아 한 번에 인코딩
+        self.encode_batcher = EncodeBatcher(self._encode_batch)
+        self._lexical_executor = None
+
+        self.load_error = None
+        self.load_seconds = 0.0
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    @property
+    def is_ready(self) -> bool:
+        """모델, 인덱스, 메타데이터가 모두 메모리에 올라와 있는지 여부"""
+        return self._loaded
+
+    def load(self) -> bool:
+        """
+        모델, FAISS 인덱스, 메타데이터 저장소, 필터 인덱스를 한 번만 로드합니다.
+
+        메타데이터 저장소나 필터 인덱스가 아직 없으면 데이터셋 CSV/메타데이터로부터 한 번 빌드합니다.
+
+        여러 스레드가 동시에 호출해도 실제 로드는 한 번만 일어납니다.
+        실패한 경우 load_error에 사유를 남기고 다음 호출에서 다시 시도합니다.
+
+        Returns:
+            bool: 로드 성공 여부
+        """
+        if self._loaded:
+            return True
+
+        with self._load_lock:
+            if self._loaded:
+                return True
+
+            if not EMBEDDING_AVAILABLE:
+                self.load_error = "임베딩 라이브러리 없음"
+                return False
+
+            has_metadata = os.path.exists(os.path.join(self.metadata_path, "meta.json"))
+            required = [("로컬 모델 경로", self.model_path), ("FAISS 인덱스", self.index_path)]
+            if not has_metadata:
+                required.append(("데이터셋", self.dataset_path))
+            for label, path in required:
+                if not os.path.exists(path):
+                    self.load_error = f"{label} 없음: {path}"
+                    return False
+
+            start_time = time.perf_counter()
+
+            # 모델 로드 시 출력되는 로그/경고 억제
+            quiet_library_logs()
+            try:
+                model = load_encoder(self.model_path, self.encoder_backend)  # CPU 강제 사용으로 안정성 향상
+                # 토크나이저를 노출하지 않는 모델은 청킹 없이 model.encode 사용 (최대 길이에서 잘림)
+                query_chunker = QueryChunker(model) if getattr(model, "tokenizer", None) is not None else None
+                index_spec = self._load_index_spec()
+                index, index_mmap = read_faiss_index(self.index_path, index_spec, INDEX_MMAP)
+                apply_search_params(index, index_spec)
+                full_vectors = self._load_full_vectors(index_spec)
+                if not has_metadata:
+                    build_quote_metadata(self.dataset_path, self.metadata_path)
+                metadata = QuoteMetadataStore(self.metadata_path)
+                filter_index = self._load_filter_index(metadata, rebuild_on_mismatch=not has_metadata)
+                lexical_index = self._load_lexical_index(metadata)
+                self._check_slot_counts(index, full_vectors, metadata, filter_index)
+            except Exception as e:
+                self.load_error = str(e)
+                return False
+
+            self.model = model
+            self.query_chunker = query_chunker
+            self.index = index
+            self.index_mmap = index_mmap
+            self.index_spec = index_spec
+            self.full_vectors = full_vectors
+            self.metadata = metadata
+            self.filter_index = filter_index
+            self.lexical_index = lexical_index
+            self.load_seconds = time.perf_counter() - start_time
+            self.load_error = None
+            self._loaded = True
+
+        print(f"✅ 명언 검색 엔진 로드 완료 ({self.load_seconds:.1f}초, 명언 {self.index.ntotal}개)")
+        return True
+
+    def warm_up(self, text: str = WARMUP_QUERY) -> float:
+        """
+        로드 후 더미 쿼리로 첫 요청과 같은 경로(모델 forward pass, 인덱스 검색)를 한 번 실행합니다.
+
+        임베딩 캐시에 이미 있는 쿼리여도 모델을 한 번 호출하도록 인코딩은 캐시를 거치지 않습니다.
+
+        Args:
+            text: 워밍업 쿼리
+
+        Returns:
+            float: 로드와 더미 쿼리에 걸린 시간 (초)
+
+        Raises:
+            RuntimeError: 검색 엔진 로드에 실패한 경우
+        """
+        start_time = time.perf_counter()
+        if not self.load():
+            raise RuntimeError(f"명언 검색 엔진 로드 실패: {self.load_error}")
+        self.encode_batcher.encode([text])
+        if SEARCH_MODE == "hybrid":
+            self.search_hybrid(text, top_k=1)
+        else:
+            self.search(text, top_k=1)
+        return time.perf_counter() - start_time
+
+    def _load_index_spec(self):
+        """인덱스 옆에 저장된 스펙을 읽고, 환경 변수로 검색 파라미터(nprobe, efSearch)를 덮어씁니다."""
+        spec = load_index_spec(self.index_path)
+        if os.getenv("QUOTE_INDEX_NPROBE"):
+            spec.nprobe = int(os.environ["QUOTE_INDEX_NPROBE"])
+        if os.getenv("QUOTE_INDEX_EF_SEARCH"):
+            spec.ef_search = int(os.environ["QUOTE_INDEX_EF_SEARCH"])
+        if os.getenv("QUOTE_INDEX_RERANK_K"):
+            spec.rerank_k = int(os.environ["QUOTE_INDEX_RERANK_K"])
+        return spec
+
+    def _load_full_vectors(self, spec):
+        """
+        원본 fp32 벡터를 메모리 매핑으로 엽니다. (재정렬/좁은 필터의 exact 스캔에서 필요한 행만 디스크에서 읽음)
+        """
+        vectors_path = vectors_path_for(self.index_path)
+        if not os.path.exists(vectors_path):
+            if spec.rerank_k:
+                print(f"⚠️ 재정렬용 원본 벡터 없음: {vectors_path} - 재정렬 비활성화")
+                spec.rerank_k = 0
+            return None
+        return np.load(vectors_path, mmap_mode="r")
+
+    @staticmethod
+    def _check_slot_counts(index, full_vectors, metadata, filter_index) -> None:
+        """
+        슬롯 단위 산출물이 같은 빌드인지 확인합니다. (빌드가 산출물을 교체하는 도중에 로드하면 실패 후 재시도)
+
+        Raises:
+            ValueError: 인덱스/벡터/필터의 슬롯 수가 메타데이터와 맞지 않는 경우
+        """
+        slots = len(metadata)
+        counts = {"FAISS 인덱스": index_slot_count(index), "필터 인덱스": filter_index.num_rows}
+        if full_vectors is not None:
+            counts["원본 벡터"] = len(full_vectors)
+        for label, count in counts.items():
+            if count > slots or (label != "FAISS 인덱스" and count != slots):
+                raise ValueError(f"{label} 슬롯 수({count})가 메타데이터({slots})와 맞지 않습니다 (빌드 교체 중일 수 있음)")
+
+    def _load_filter_index(self, metadata, rebuild_on_mismatch: bool = False):
+        """
+        태그/저자 필터 인덱스를 엽니다. 없으면 메타데이터로부터 빌드합니다.
+
+        행 수가 메타데이터와 다르면 이 로드에서 메타데이터를 새로 만든 경우(rebuild_on_mismatch)에만 다시 빌드하고,
+        그 밖에는 빌드가 산출물을 교체하는 중일 수 있으므로 덮어쓰지 않고 그대로 반환합니다. (슬롯 수 확인에서 실패)
+        """
+        meta_path = os.path.join(self.paths.filters, "meta.json")
+        if os.path.exists(meta_path):
+            filter_index = QuoteFilterIndex(self.paths.filters)
+            if filter_index.num_rows == len(metadata) or not rebuild_on_mismatch:
+                return filter_index
+
+        live = canonical = None
+        if os.path.exists(self.paths.aliases):
+            canonical = np.load(self.paths.aliases)
+        elif os.path.exists(self.paths.tombstones):
+            live = ~np.load(self.paths.tombstones)
+        build_filter_index(metadata, self.paths.filters, live, canonical)
+        return QuoteFilterIndex(self.paths.filters)
+
+    def _load_lexical_index(self, metadata):
+        """
+        BM25 역색인을 엽니다. 대용량 코퍼스에서는 색인 빌드가 오래 걸리므로 여기서는 만들지 않고,
+        없으면 하이브리드 검색이 벡터 검색만으로 동작합니다. (build_index.py가 함께 빌드)
+        """
+        if not os.path.exists(os.path.join(self.paths.lexical, "meta.json")):
+            return None
+        lexical_index = QuoteLexicalIndex(self.paths.lexical)
+        if lexical_index.num_rows != len(metadata):
+            return None
+        return lexical_index
+
+    def encode_query(self, chat_analysis: str) -> np.ndarray:
+        """
+        대화 분석 텍스트를 정규화된 임베딩으로 변환합니다. 캐시에 있으면 모델을 호출하지 않습니다.
+
+        Args:
+            chat_analysis (str): 대화 분석 결과 텍스트
+
+        Returns:
+            np.ndarray: L2 정규화된 float32 벡터 (1차원)
+        """
+        return self.encode_queries([chat_analysis])[0]
+
+    def encode_queries(self, analyses: list) -> np.ndarray:
+        """
+        여러 분석 텍스트를 한 번의 배치 forward pass로 임베딩합니다. 캐시에 있는 텍스트는 건너뜁니다.
+
+        Args:
+            analyses (list[str]): 대화 분석 결과 텍스트 목록
+
+        Returns:
+            np.ndarray: L2 정규화된 float32 행렬 [len(analyses), d]
+        """
+        vectors = [self.embedding_cache.get(text) for text in analyses]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+
+        if missing:
+            encoded = self.encode_batcher.encode([analyses[i] for i in missing])
+            for i, vector in zip(missing, encoded):
+                self.embedding_cache.put(analyses[i], vector)
+                vectors[i] = vector
+
+        return np.ascontiguousarray(np.stack(vectors), dtype=np.float32)
+
+    def _encode_batch(self, texts: list) -> np.ndarray:
+        """
+        모델 forward pass 한 번으로 텍스트 목록을 정규화된 임베딩으로 변환합니다. (EncodeBatcher가 호출)
+
+        최대 시퀀스 길이를 넘는 분석은 겹치는 청크로 나눠 같은 배치에서 인코딩한 뒤 풀링합니다.
+        """
+        start = time.perf_counter()
+        if self.query_chunker is not None:
+            encoded = self.query_chunker.encode(texts)
+        else:
+            encoded = self.model.encode(texts, batch_size=max(1, len(texts)), convert_to_tensor=False, device='cpu')
+            encoded = np.asarray(encoded, dtype=np.float32)
+            encoded /= np.linalg.norm(encoded, axis=1, keepdims=True)  # 정규화
+        self.encode_timings.record({"encode_ms": (time.perf_counter() - start) * 1000})
+        return encoded
+
+    def stats(self) -> dict:
+        """
+        검색 엔진 상태와 캐시 카운터를 반환합니다. (/api/health 노출용)
+
+        Returns:
+            dict: 로드 상태와 임베딩 캐시 통계
+        """
+        return {
+            "ready": self._loaded,
+            "model_id": self.model_id,
+            "encoder_backend": self.encoder_backend,
+            "index": self.index_spec.label() if self.index_spec else None,
+            "index_mmap": self.index_mmap,
+            "load_seconds": round(self.load_seconds, 3),
+            "load_error": self.load_error,
+            "embedding_cache": self.embedding_cache.stats(),
+            "search_mode": SEARCH_MODE,
+            "lexical_index": self.lexical_index is not None,
+            "hybrid_timings": self.hybrid_timings.stats(),
+            "encode_timings": self.encode_timings.stats(),
+            "encode_batcher": self.encode_batcher.stats(),
+            "query_tokens": self.query_chunker.stats() if self.query_chunker else None,
+        }
+
+    def search(self, chat_analysis: str, top_k: int = 3, filters: dict | None = None,
+               mmr_lambda: float = MMR_LAMBDA) -> list:
+        """
+        대화 분석 텍스트와 가장 유사한 명언을 검색합니다.
+
+        Args:
+            chat_analysis (str): 대화 분석 결과 텍스트
+            top_k (int): 반환할 명언 개수 (기본값: 3)
+            filters (dict): 태그/저자 필터 (예: {'tags': ['hope'], 'exclude_authors': ['...']}, quote_filters 참고)
+            mmr_lambda (float): MMR 관련도 가중치 (1.0이면 유사도 순 그대로, 작을수록 서로 다른 명언 우선)
+
+        Returns:
+            list: [{'quote': str, 'author': str, 'category': str, 'similarity': float}]
+
+        Raises:
+            RuntimeError: 검색 엔진을 로드할 수 없는 경우
+            ValueError: 필터 형식이 잘못된 경우
+        """
+        return self.search_batch([chat_analysis], top_k=top_k, filters=filters, mmr_lambda=mmr_lambda)[0]
+
+    def search_batch(self, analyses: list, top_k: int = 3, filters: dict | None = None,
+                     mmr_lambda: float = MMR_LAMBDA) -> list:
+        """
+        여러 분석 텍스트를 한 번에 검색합니다. (배치 임베딩 1회 + 쿼리 행렬 FAISS 검색 1회)
+
+        필터는 슬롯 비트맵 ID 셀렉터로 FAISS 검색에 직접 전달되며,
+        조건에 맞는 명언이 적으면 ANN 대신 해당 명언만 exact 스캔합니다.
+        MMR을 쓰는 경우 후보를 MMR_CANDIDATES개까지 넉넉히 뽑은 뒤 서로 비슷한 명언을 걸러냅니다.
+
+        Args:
+            analyses (list[str]): 대화 분석 결과 텍스트 목록
+            top_k (int): 분석별 반환할 명언 개수 (기본값: 3)
+            filters (dict): 모든 분석에 공통으로 적용할 태그/저자 필터
+            mmr_lambda (float): MMR 관련도 가중치 (search() 참고)
+
+        Returns:
+            list: 입력 순서대로의 검색 결과 리스트 (각 원소는 search()의 반환 형식)
+
+        Raises:
+            RuntimeError: 검색 엔진을 로드할 수 없는 경우
+            ValueError: 필터 형식이 잘못된 경우
+        """
+        if not analyses:
+            return []
+        if not self.load():
+            raise RuntimeError(f"명언 검색 엔진 로드 실패: {self.load_error}")
+
+        selection = self.filter_index.select(filters) if filters else None
+        if selection is not None and selection.count == 0:
+            return [[] for _ in analyses]
+
+        # 분석 텍스트를 임베딩으로 변환 (캐시 우선)
+        query_embeddings = self.encode_queries(analyses)
+
+        fetch_k = max(top_k, MMR_CANDIDATES) if self._mmr_enabled(mmr_lambda) else top_k
+        results = []
+        for scores, ids in self._search_vectors(query_embeddings, fetch_k, selection):
+            keep = self._diversify(scores, ids, top_k, mmr_lambda)
+            results.append(self._build_results(scores[keep], ids[keep]))
+        return results
+
+    def _mmr_enabled(self, mmr_lambda: float) -> bool:
+        return mmr_lambda < 1.0 and self.full_vectors is not None
+
+    def _diversify(self, relevance: np.ndarray, ids: np.ndarray, top_k: int, mmr_lambda: float) -> np.ndarray:
+        """
+        후보 중 top_k개를 MMR로 고릅니다. 후보 벡터는 메모리 매핑된 원본 벡터에서 후보 행만 읽습니다.
+
+        Returns:
+            np.ndarray: 선택된 후보의 위치 (MMR을 쓰지 않으면 앞에서부터 top_k개)
+        """
+        if not self._mmr_enabled(mmr_lambda) or len(ids) <= 1:
+            return np.arange(min(top_k, len(ids)))
+        order = np.argsort(ids)  # 슬롯 순서로 읽어야 파일 접근이 순차적
+        vectors = np.empty((len(ids), self.full_vectors.shape[1]), dtype=np.float32)
+        vectors[order] = self.full_vectors[ids[order]]
+        return mmr_select(relevance, vectors, top_k, mmr_lambda)
+
+    def _search_vectors(self, query_embeddings: np.ndarray, top_k: int, selection=None) -> list:
+        """
+        쿼리 행렬로 벡터 검색을 수행합니다.
+
+        Returns:
+            list[tuple[np.ndarray, np.ndarray]]: 쿼리별 (유사도, 슬롯 ID) - 유사도 내림차순
+        """
+        # 좁은 필터: 조건에 맞는 슬롯만 원본 벡터로 exact 스캔
+        if selection is not None and selection.slots is not None and self.full_vectors is not None:
+            return [rerank_exact(query, selection.slots, self.full_vectors, top_k) for query in query_embeddings]
+
+        params = None
+        if selection is not None:
+            params = search_params_with_selector(self.index_spec, selection.selector)
+
+        # FAISS 검색 (양자화 인덱스는 후보를 넉넉히 뽑아 fp32 벡터로 재정렬)
+        if self.index_spec.rerank_k and self.full_vectors is not None:
+            fetch_k = max(top_k, self.index_spec.rerank_k)
+            _, candidates = self.index.search(query_embeddings, fetch_k, params=params)
+            return [rerank_exact(query, row, self.full_vectors, top_k)
+                    for query, row in zip(query_embeddings, candidates)]
+
+        distances, indices = self.index.search(query_embeddings, top_k, params=params)
+        return [(d[i >= 0], i[i >= 0]) for d, i in zip(distances, indices)]
+
+    def search_hybrid(self, chat_analysis: str, top_k: int = 3, keywords: list | None = None,
+                      filters: dict | None = None, mmr_lambda: float = MMR_LAMBDA) -> list:
+        """
+        BM25 어휘 검색과 벡터 검색을 동시에 수행하고 RRF로 결합한 뒤 MMR로 다양화합니다.
+
+        어휘 검색은 전용 스레드 풀에서, 벡터 검색(임베딩 + FAISS)은 호출 스레드에서 실행되며
+        단계별 지연 시간(dense/lexical/fusion/mmr/total)은 hybrid_timings에 누적됩니다.
+        BM25 색인이 없으면 벡터 검색 결과만 다양화해 반환합니다.
+
+        Args:
+            chat_analysis (str): 대화 분석 결과 텍스트
+            top_k (int): 반환할 명언 개수 (기본값: 3)
+            keywords (list[str]): 조언 체인이 뽑은 대화 키워드 (어휘 검색 쿼리에 추가)
+            filters (dict): 태그/저자 필터 (search() 참고)
+            mmr_lambda (float): MMR 관련도 가중치 (search() 참고, 관련도는 정규화된 RRF 점수)
+
+        Returns:
+            list: [{'quote': str, 'author': str, 'category': str, 'similarity': float}]
+                  (similarity는 쿼리와의 코사인 유사도, 순서는 RRF/MMR 선택 순)
+
+        Raises:
+            RuntimeError: 검색 엔진을 로드할 수 없는 경우
+            ValueError: 필터 형식이 잘못된 경우
+        """
+        if not self.load():
+            raise RuntimeError(f"명언 검색 엔진 로드 실패: {self.load_error}")
+
+        start_time = time.perf_counter()
+        selection = self.filter_index.select(filters) if filters else None
+        if selection is not None and selection.count == 0:
+            return []
+        num_candidates = max(top_k, HYBRID_CANDIDATES, MMR_CANDIDATES if self._mmr_enabled(mmr_lambda) else 0)
+
+        lexical_future = None
+        if self.lexical_index is not None:
+            mask = selection.mask() if selection is not None else None
+            lexical_future = self._get_lexical_executor().submit(
+                self._timed, self.lexical_index.search, chat_analysis, num_candidates, keywords, mask)
+
+        dense_start = time.perf_counter()
+        query = self.encode_queries([chat_analysis])
+        dense_scores, dense_ids = self._search_vectors(query, num_candidates, selection)[0]
+        timings = {"dense_ms": (time.perf_counter() - dense_start) * 1000}
+
+        if lexical_future is None:
+            mmr_start = time.perf_counter()
+            keep = self._diversify(dense_scores, dense_ids, top_k, mmr_lambda)
+            timings["mmr_ms"] = (time.perf_counter() - mmr_start) * 1000
+            timings["total_ms"] = (time.perf_counter() - start_time) * 1000
+            self.hybrid_timings.record(timings)
+            return self._build_results(dense_scores[keep], dense_ids[keep])
+
+        (_, lexical_ids), timings["lexical_ms"] = lexical_future.result()
+
+        fusion_start = time.perf_counter()
+        fused = reciprocal_rank_fusion([dense_ids, lexical_ids], max(top_k, MMR_CANDIDATES))
+        fused_ids = np.array([slot for slot, _ in fused], dtype=np.int64)
+        fused_scores = np.array([score for _, score in fused], dtype=np.float32)
+        timings["fusion_ms"] = (time.perf_counter() - fusion_start) * 1000
+
+        mmr_start = time.perf_counter()
+        if len(fused_scores):
+            keep = self._diversify(fused_scores / fused_scores[0], fused_ids, top_k, mmr_lambda)
+            fused_ids = fused_ids[keep]
+        timings["mmr_ms"] = (time.perf_counter() - mmr_start) * 1000
+
+        similarity = dict(zip(dense_ids.tolist(), dense_scores.tolist()))
+        missing = [slot for slot in fused_ids.tolist() if slot not in similarity]
+        if missing and self.full_vectors is not None:
+            # 어휘 검색에서만 나온 명언은 원본 벡터로 코사인 유사도를 계산
+            similarity.update(zip(missing, (np.asarray(self.full_vectors[missing]) @ query[0]).tolist()))
+        scores = np.array([similarity.get(slot, 0.0) for slot in fused_ids.tolist()], dtype=np.float32)
+        timings["total_ms"] = (time.perf_counter() - start_time) * 1000
+
+        self.hybrid_timings.record(timings)
+        return self._build_results(scores, fused_ids)
+
+    @staticmethod
+    def _timed(func, *args):
+        """함수 실행 결과와 소요 시간(ms)을 함께 반환합니다."""
+        start = time.perf_counter()
+        result = func(*args)
+        return result, (time.perf_counter() - start) * 1000
+
+    def _get_lexical_executor(self) -> ThreadPoolExecutor:
+        if self._lexical_executor is None:
+            with self._load_lock:
+                if self._lexical_executor is None:
+                    self._lexical_executor = ThreadPoolExecutor(max_workers=HYBRID_WORKERS,
+                                                                thread_name_prefix="quote-lexical")
+        return self._lexical_executor
+
+    def _build_results(self, distances: np.ndarray, indices: np.ndarray) -> list:
+        """FAISS 검색 결과(행 ID)를 메타데이터 저장소에서 바로 조회해 결과 딕셔너리로 만듭니다."""
+        metadata = self.metadata
+        results = []
+        for similarity, idx in zip(distances, indices):
+            if idx < 0:
+                continue
+            results.append({
+                "quote": metadata.get(idx, "quote"),
+                "author": metadata.get(idx, "author"),
+                "category": metadata.get(idx, "category"),
+                "similarity": float(similarity)
+            })
+        return results
+
+
+# === 프로세스 전역 검색 엔진 (모델 티어별 1개) ===
+_quote_retrievers = {}
+_quote_retriever_lock = threading.Lock()
+
+
+def get_quote_retriever(tier: str | None = None) -> QuoteRetriever:
+    """
+    프로세스 전역에서 공유하는 티어별 QuoteRetriever 인스턴스를 반환합니다.
+
+    Args:
+        tier (str): 모델 티어 이름 (기본값: DEFAULT_TIER)
+
+    Returns:
+        QuoteRetriever: 공유 검색 엔진 (로드는 첫 검색 시점에 수행)
+
+    Raises:
+        ValueError: 등록되지 않은 티어인 경우
+    """
+    tier = get_tier(tier or DEFAULT_TIER)
+
+    retriever = _quote_retrievers.get(tier.name)
+    if retriever is None:
+        with _quote_retriever_lock:
+            retriever = _quote_retrievers.get(tier.name)
+            if retriever is None:
+                retriever = _quote_retrievers[tier.name] = QuoteRetriever(model_path=tier.model_path)
+    return retriever
+
+
+def _observed_encode_ms() -> dict:
+    """로드된 티어별 실측 인코딩 지연 시간 p50 (ms)"""
+    observed = {}
+    for name, retriever in list(_quote_retrievers.items()):
+        encode = retriever.encode_timings.stats().get("encode_ms")
+        if retriever.is_ready and encode:
+            observed[name] = encode["p50_ms"]
+    return observed
+
+
+def route_quote_retriever(chat_analysis: str, language: str | None = None,
+                          latency_budget_ms: float | None = None) -> QuoteRetriever:
+    """
+    언어/지연 시간 예산에 맞는 티어의 검색 엔진을 반환합니다. (model_registry.route_tier 참고)
+
+    Args:
+        chat_analysis (str): 대화 분석 결과 텍스트 (언어 추정용)
+        language (str): 요청이 지정한 언어 코드
+        latency_budget_ms (float): 쿼리 인코딩 지연 시간 예산 (ms)
+
+    Returns:
+        QuoteRetriever: 선택된 티어의 공유 검색 엔진
+    """
+    return get_quote_retriever(route_tier(chat_analysis, language, latency_budget_ms, _observed_encode_ms()))
+
+
+def tier_stats() -> dict:
+    """
+    티어별 상태 (/api/health 노출용)
+
+    Returns:
+        dict: {티어 이름: {'model_id', 'languages', 'built', 'warm', 'encode_p50_ms'}}
+    """
+    observed = _observed_encode_ms()
+    stats = {}
+    for name in ENABLED_TIERS:
+        tier = MODEL_TIERS[name]
+        retriever = _quote_retrievers.get(name)
+        stats[name] = {
+            "model_id": tier.model_id,
+            "languages": list(tier.languages),
+            "built": tier.is_built(),
+            "warm": retriever is not None and retriever.is_ready,
+            "encode_p50_ms": observed.get(name),
+        }
+    return stats
+
+
+def search_batch(analyses: list, top_k: int = 3, filters: dict | None = None, tier: str | None = None,
+                 language: str | None = None, latency_budget_ms: float | None = None) -> list:
+    """
+    여러 대화 분석 텍스트에 대한 명언을 한 번에 검색하는 함수 (백필/오프라인 재추천용)
+
+    단건 검색과 달리 폴백 명언으로 대체하지 않고, 검색 엔진을 쓸 수 없으면 예외를 발생시킵니다.
+
+    Args:
+        analyses (list[str]): 대화 분석 결과 텍스트 목록
+        top_k (int): 분석별 반환할 명언 개수 (기본값: 3)
+        filters (dict): 태그/저자 필터 (QuoteRetriever.search 참고)
+        tier (str): 모델 티어 이름 (없으면 language/latency_budget_ms와 분석 텍스트로 라우팅,
+                    language도 없으면 분석마다 언어를 추정해 티어별로 나누어 검색)
+        language (str): 모델 티어 선택용 언어 코드
+        latency_budget_ms (float): 모델 티어 선택용 쿼리 인코딩 지연 시간 예산 (ms)
+
+    Returns:
+        list: 입력 순서대로의 명언 리스트의 리스트
+
+    Raises:
+        RuntimeError: 임베딩 라이브러리 또는 검색 엔진을 사용할 수 없는 경우
+        ValueError: 필터 형식이 잘못되었거나 등록되지 않은 티어인 경우
+    """
+    if not EMBEDDING_AVAILABLE:
+        raise RuntimeError("임베딩 라이브러리 없음")
+    if tier:
+        return get_quote_retriever(tier).search_batch(analyses, top_k=top_k, filters=filters)
+
+    # 분석마다 티어를 골라(한국어 분석이 영어 전용 티어로 가지 않도록) 티어별로 한 번씩 배치 검색
+    observed = _observed_encode_ms()
+    groups = {}
+    for i, analysis in enumerate(analyses):
+        groups.setdefault(route_tier(analysis, language, latency_budget_ms, observed), []).append(i)
+
+    results = [None] * len(analyses)
+    for name, indices in groups.items():
+        tier_results = get_quote_retriever(name).search_batch([analyses[i] for i in indices], top_k=top_k,
+                                                              filters=filters)
+        for i, result in zip(indices, tier_results):
+            results[i] = result
+    return results
+
+
+def find_similar_quote_cosine_silent(chat_analysis: str, top_k: int = 3, keywords: list | None = None,
+                                     language: str | None = None, latency_budget_ms: float | None = None) -> list:
+    """
+    대화 분석 텍스트를 바탕으로 유사한 명언을 찾는 함수
+    
+    Args:
+        chat_analysis (str): 대화 분석 결과 텍스트
+        top_k (int): 반환할 명언 개수 (기본값: 3)
+        keywords (list[str]): 대화 키워드 (하이브리드 검색 모드에서 BM25 쿼리에 추가)
+        language (str): 모델 티어 선택용 언어 코드 (없으면 텍스트로 추정)
+        latency_budget_ms (float): 모델 티어 선택용 쿼리 인코딩 지연 시간 예산 (ms)
+    
+    Returns:
+        list: 유사한 명언들의 리스트 [{'quote': str, 'author': str, 'category': str, 'similarity': float}]
+    """
     
     if not EMBEDDING_AVAILABLE:
         print("⚠️ 임베딩 라이브러리 없음 - 상황별 폴백 명언 사용")
-        return fallback_quotes[:top_k]
+        return select_fallback_quotes(chat_analysis, top_k)
     
     try:
-        # 출력 억제
-        old_stdout = sys.stdout
-        old_stderr = sys.stderr
-        
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            sys.stdout = StringIO()
-            sys.stderr = StringIO()
-            
-            try:
-                # 로컬 모델 경로 수정 (직접 모델 디렉토리 지정)
-                model_path = "./models/sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
-                
-                # 임베딩 모델 로드 (안전한 방식)
-                import os
-                if os.path.exists(model_path):
-                    model = SentenceTransformer(model_path, device='cpu')  # CPU 강제 사용으로 안정성 향상
-                else:
-                    print(f"⚠️ 로컬 모델 경로 없음: {model_path}")
-                    return fallback_quotes[:top_k]
-                
-                # FAISS 인덱스 로드
-                faiss_path = "vectorDB/FAISS/quotes_cosine_faiss.index"
-                if not os.path.exists(faiss_path):
-                    print(f"⚠️ FAISS 인덱스 없음: {faiss_path}")
-                    return fallback_quotes[:top_k]
-                    
-                index = faiss.read_index(faiss_path)
-                
-                # 데이터셋 로드
-                dataset_path = "Dataset/quotes_with_insights_combined.csv"
-                if not os.path.exists(dataset_path):
-                    print(f"⚠️ 데이터셋 없음: {dataset_path}")
-                    return fallback_quotes[:top_k]
-                    
-                quotes_df = pd.read_csv(dataset_path)
-                
-                # 분석 텍스트를 임베딩으로 변환
-                query_embedding = model.encode([chat_analysis], convert_to_tensor=False, device='cpu')
-                query_embedding = query_embedding / np.linalg.norm(query_embedding)  # 정규화
-                
-                # FAISS 검색
-                distances, indices = index.search(np.array(query_embedding), top_k)
-                
-                # 결과 구성
-                results = []
-                for i in range(top_k):
-                    if i < len(indices[0]):
-                        idx = indices[0][i]
-                        similarity = float(distances[0][i])
-                        
-                        quote_data = {
-                            "quote": str(quotes_df["quote"].iloc[idx]),
-                            "author": str(quotes_df["author"].iloc[idx]),
-                            "category": str(quotes_df.get("category", pd.Series(["일반"] * len(quotes_df))).iloc[idx]),
-                            "similarity": similarity
-                        }
-                        results.append(quote_data)
-                
-                if results:
-                    print(f"✅ 임베딩 기반 명언 검색 성공: {len(results)}개")
-                    return results
-                else:
-                    print("⚠️ 임베딩 검색 결과 없음 - 폴백 사용")
-                    return fallback_quotes[:top_k]
-                
-            finally:
-                # 출력 복원
-                sys.stdout = old_stdout
-                sys.stderr = old_stderr
+        retriever = route_quote_retriever(chat_analysis, language, latency_budget_ms)
+        if SEARCH_MODE == "hybrid":
+            results = retriever.search_hybrid(chat_analysis, top_k=top_k, keywords=keywords)
+        else:
+            results = retriever.search(chat_analysis, top_k=top_k)
+
+        if results:
+            print(f"✅ 임베딩 기반 명언 검색 성공: {len(results)}개")
+            return results
+        else:
+            print("⚠️ 임베딩 검색 결과 없음 - 폴백 사용")
+            return select_fallback_quotes(chat_analysis, top_k)
                 
     except Exception as e:
-        # 출력 복원 (에러 시)
-        sys.stdout = old_stdout
-        sys.stderr = old_stderr
-        
         print(f"⚠️ 명언 검색 실패: {e}")
         print(f"📝 분석 내용: {chat_analysis[:100]}...")
-        return fallback_quotes[:top_k]
+        return select_fallback_quotes(chat_analysis, top_k)
 
 def get_quote_by_emotion(emotion: str, top_k: int = 3) -> list:
     """
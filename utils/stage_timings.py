@@ -0,0 +1,37 @@
+"""
+단계별 지연 시간 통계 모듈
+검색 단계(인코딩, 벡터/어휘 검색)와 대화 그래프 분기처럼 여러 스레드가 기록하는 지연 시간을
+최근 구간 기준 평균/p50/p99로 요약합니다.
+"""
+
+import threading
+from collections import deque
+
+import numpy as np
+
+
+class StageTimings:
+    """단계별 지연 시간(ms)의 최근 구간 통계 (/api/health 노출용, 스레드 안전)"""
+
+    def __init__(self, window: int = 1024):
+        self._samples = {}
+        self._window = window
+        self._lock = threading.Lock()
+
+    def record(self, timings: dict) -> None:
+        with self._lock:
+            for stage, ms in timings.items():
+                self._samples.setdefault(stage, deque(maxlen=self._window)).append(ms)
+
+    def stats(self) -> dict:
+        with self._lock:
+            samples = {stage: np.array(values) for stage, values in self._samples.items()}
+        return {
+            stage: {
+                "count": len(values),
+                "mean_ms": round(float(values.mean()), 3),
+                "p50_ms": round(float(np.percentile(values, 50)), 3),
+                "p99_ms": round(float(np.percentile(values, 99)), 3),
+            }
+            for stage, values in samples.items()
+        }
@@ -0,0 +1,101 @@
+"""
+구조화 분석 응답 모듈
+대화 분석, 조언, 키워드를 한 번의 LLM 호출에서 JSON 스키마 응답으로 받아 한 번에 검증/파싱합니다.
+
+기존 분석 턴은 분석 체인과 조언 체인을 순서대로 호출하고(조언 체인이 ANALYSIS_PROMPT를 다시 전송),
+조언 응답 텍스트를 줄 단위로 파싱합니다. 구조화 모드(LLM_STRUCTURED_ANALYSIS=1)는 이를 한 번의 왕복으로 줄이며,
+응답이 스키마에 맞지 않거나 호출이 실패하면 호출 측에서 기존 두 번 호출 경로로 폴백합니다.
+"""
+
+import json
+import os
+import threading
+from typing import List
+
+from .analysis_prompt import ANALYSIS_PROMPT
+
+STRUCTURED_ANALYSIS = os.getenv("LLM_STRUCTURED_ANALYSIS", "0") == "1"  # 분석+조언+키워드 단일 호출 사용 여부
+STRUCTURED_MAX_TOKENS = int(os.getenv("LLM_STRUCTURED_MAX_TOKENS", "600"))  # 분석/조언/키워드를 모두 담을 응답 길이
+MAX_KEYWORDS = 5
+
+STRUCTURED_ANALYSIS_PROMPT = ANALYSIS_PROMPT + """
+분석 결과를 바탕으로 다음 세 가지를 JSON 객체 하나로만 답해줘요. (JSON 밖의 설명이나 코드 블록 표시는 쓰지 않아요.)
+- analysis: 위 결과 형식에 따른 대화 분석 (최대 80자)
+- advice: 사용자에게 적절한 조언. 사용자에게는 '당신, 그대'라는 2인칭 표현을 사용해요. (최대 세 문장이며 80자 이내로, 문학적이고 감성적인 어투를 사용하여 친절하게 제공해줘요.)
+- keywords: 대화 내용의 키워드 문자열 배열 (최대 5개. 각 키워드의 글자 수는 최대 4자 이내이다. 5자 초과는 금지이다.)
+"""
+
+# OpenAI 호환 response_format (Solar 구조화 출력)
+ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "chat_analysis",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "analysis": {"type": "string"},
+                "advice": {"type": "string"},
+                "keywords": {"type": "array", "items": {"type": "string"}},
+            },
+            "required": ["analysis", "advice", "keywords"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+_status_lock = threading.Lock()
+structured_status = {"calls": 0, "parsed": 0, "fallbacks": 0, "last_error": None}
+
+
+def parse_structured_analysis(response_text: str) -> tuple[str, str, List[str]]:
+    """
+    구조화 응답(JSON)을 검증하고 분석, 조언, 키워드로 파싱합니다.
+
+    Args:
+        response_text: LLM 응답 본문 (코드 블록으로 감싼 JSON도 허용)
+
+    Returns:
+        tuple[str, str, list[str]]: (분석, 조언, 키워드 최대 5개)
+
+    Raises:
+        ValueError: JSON이 아니거나 필수 필드가 비었거나 타입이 맞지 않는 경우
+    """
+    text = response_text.strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"구조화 응답이 JSON이 아닙니다: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError("구조화 응답이 JSON 객체가 아닙니다")
+
+    analysis, advice, keywords = data.get("analysis"), data.get("advice"), data.get("keywords")
+    for name, value in (("analysis", analysis), ("advice", advice)):
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"구조화 응답의 {name} 필드가 비어 있거나 문자열이 아닙니다")
+    if not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords):
+        raise ValueError("구조화 응답의 keywords 필드가 문자열 배열이 아닙니다")
+
+    keywords = list(dict.fromkeys(k.strip() for k in keywords if k.strip()))[:MAX_KEYWORDS]
+    if not keywords:
+        raise ValueError("구조화 응답에 키워드가 없습니다")
+    return analysis.strip(), advice.strip(), keywords
+
+
+def record_structured_result(parsed: bool, error: str = None) -> None:
+    """구조화 호출 결과를 기록합니다. (파싱 실패/호출 오류는 폴백으로 집계)"""
+    with _status_lock:
+        structured_status["calls"] += 1
+        if parsed:
+            structured_status["parsed"] += 1
+        else:
+            structured_status["fallbacks"] += 1
+            structured_status["last_error"] = error
+
+
+def structured_analysis_stats() -> dict:
+    """구조화 모드 설정과 호출/폴백 횟수 (/api/health 노출용)"""
+    with _status_lock:
+        return {"enabled": STRUCTURED_ANALYSIS, **structured_status}